@@ -0,0 +1,31 @@
+import argparse
+import resource
+import tempfile
+import time
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.augment import augment
+from pipeline.metrics import Metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time prompt augmentation.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--variants", type=int, default=100)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            write_catalogs(args.root, root, scale, raw_limit=0)
+            metrics = Metrics()
+            start = time.perf_counter()
+            augment(root, variants=args.variants, metrics=metrics)
+            elapsed = time.perf_counter() - start
+            records = metrics.counters["rows_out"]
+            # ru_maxrss is in kilobytes on Linux
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(
+                f"x{scale:<4} {metrics.counters['rows_in']:>8,} rows "
+                f"{records:>10,} records {elapsed:7.2f}s "
+                f"{records / elapsed:>9,.0f} records/s, max RSS {rss:,.0f}MB"
+            )
@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from benchmarks.enrichment import build_prompt, make_rows
+from pipeline.enrichment import EnrichmentEngine
+from pipeline.stub_llm import StubChain
+
+
+def benchmark(rows, batch_size, args):
+    chain = StubChain(
+        latency=args.latency,
+        token_latency=args.token_latency,
+        drop_every=args.drop_every,
+    )
+    engine = EnrichmentEngine(
+        chain,
+        build_prompt,
+        max_concurrency=args.concurrency,
+        batch_size=batch_size,
+        key_column="model",
+        label="RAM",
+    )
+    start = time.perf_counter()
+    output = list(engine.run(rows))
+    elapsed = time.perf_counter() - start
+    assert [row["model"] for row in output] == [row["model"] for row in rows]
+    assert all(row["Form Factor"] == "stub" for row in output)
+    tokens = chain.prompt_tokens + chain.completion_tokens
+    return {
+        "tokens_per_row": tokens / len(rows),
+        "rows_per_sec": len(rows) / elapsed,
+        "llm_calls": engine.llm_calls,
+        "fallbacks": engine.fallbacks,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark multi-row prompts.")
+    parser.add_argument("--rows", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--token-latency", type=float, default=0.0005)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--drop-every", type=int, default=0)
+    parser.add_argument(
+        "--batch-size", type=int, nargs="+", default=[1, 4, 16, 32]
+    )
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    for batch_size in args.batch_size:
+        result = benchmark([dict(row) for row in rows], batch_size, args)
+        print(
+            f"batch_size={batch_size:<3} "
+            f"{result['tokens_per_row']:7.1f} tokens/row "
+            f"{result['rows_per_sec']:8.1f} rows/sec "
+            f"{result['llm_calls']:4d} LLM calls "
+            f"{result['fallbacks']:4d} fallbacks"
+        )
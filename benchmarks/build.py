@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pipeline.build import build_all
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import load_csv_to_dict
+from pipeline.csv_sink import CsvSink
+
+
+def write_scaled(source_root, root, scale):
+    """Copy every complete catalog ``scale`` times under fresh keys.
+
+    Rows the tier functions cannot classify (see the data defects in
+    data/ram_complete.csv and data/motherboard_complete.csv) are dropped so
+    every component builds.
+    """
+    os.makedirs(os.path.join(root, "data"))
+    os.makedirs(os.path.join(root, "training_data"))
+    total = dropped = 0
+    for component in COMPONENTS.values():
+        data = load_csv_to_dict(
+            component.complete_path(source_root), component.key_column
+        )
+        rows = []
+        for key, info in data.items():
+            try:
+                component.tier(info)
+            except (TypeError, ValueError, AttributeError):
+                dropped += 1
+                continue
+            rows.append((key, info))
+        fieldnames = list(rows[0][1])
+        path = component.complete_path(root)
+        with CsvSink(path, fieldnames, flush_every=10000) as sink:
+            sink.write(dict(zip(fieldnames, fieldnames)))
+            for copy in range(scale):
+                suffix = f" #{copy}" if copy else ""
+                for key, info in rows:
+                    sink.write({**info, component.key_column: key + suffix})
+                    total += 1
+    return total, dropped
+
+
+def read_all(root):
+    contents = {}
+    for directory, _, files in os.walk(os.path.join(root, "training_data")):
+        for name in files:
+            with open(os.path.join(directory, name), "rb") as f:
+                contents[name] = f.read()
+    return contents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the parallel build.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        total, dropped = write_scaled(args.root, root, args.scale)
+        print(f"{total} rows (x{args.scale}, {dropped} unbuildable rows dropped)")
+        merged = os.path.join(root, "training_data", "merged_data.csv")
+        expected = None
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            build_all(
+                root, jobs=jobs, chunk_size=args.chunk_size, merged_path=merged
+            )
+            elapsed = time.perf_counter() - start
+            contents = read_all(root)
+            if expected is None:
+                expected, baseline = contents, elapsed
+            assert contents == expected, f"output differs with --jobs {jobs}"
+            print(
+                f"jobs={jobs:<3} {elapsed:.2f}s  {total / elapsed:,.0f} rows/s "
+                f"({baseline / elapsed:.1f}x)"
+            )
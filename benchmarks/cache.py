@@ -0,0 +1,43 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.resume import build_prompt
+from pipeline.enrichment import enrich_csv
+from pipeline.llm_cache import CachedChain, LLMCache
+from pipeline.stub_llm import StubChain
+
+
+def run(input_csv_path, key_column, latency, concurrency):
+    with tempfile.TemporaryDirectory() as directory:
+        output_csv_path = os.path.join(directory, "complete.csv")
+        cache = LLMCache(os.path.join(directory, "llm_cache.sqlite"))
+        for attempt in ("cold", "warm"):
+            stub = StubChain(latency=latency)
+            chain = CachedChain(stub, cache, "stub", '{Prompt} "{text}"')
+            start = time.perf_counter()
+            enrich_csv(
+                input_csv_path,
+                output_csv_path,
+                key_column,
+                chain,
+                build_prompt,
+                max_concurrency=concurrency,
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{attempt}: {stub.calls} LLM calls in {elapsed:.2f}s")
+        cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run enrichment twice through the response cache."
+    )
+    parser.add_argument("--input", default="test/raw_data/ram.csv")
+    parser.add_argument("--key-column", default="model")
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.input, args.key_column, args.latency, args.concurrency)
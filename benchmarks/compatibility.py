@@ -0,0 +1,69 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pipeline.compatibility import KEY_COLUMNS, NORMALIZERS, PAIRS, CompatibilityIndex
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import load_csv_to_dict
+
+
+def scan(catalogs, component, row, other):
+    """What pairing took without the index: normalize every other row."""
+    join = PAIRS[component, other]
+    keys = NORMALIZERS[component, join](
+        *(row.get(column) for column in KEY_COLUMNS[component][join])
+    )
+    columns = KEY_COLUMNS[other][join]
+    return [
+        name
+        for name, candidate in catalogs[other].items()
+        if keys & NORMALIZERS[other, join](*(candidate.get(c) for c in columns))
+    ]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time compatibility lookups.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument(
+        "--scan-rows", type=int, default=20, help="Rows per pair to also scan for"
+    )
+    args = parser.parse_args()
+
+    index, seconds = timed(CompatibilityIndex.build, args.root)
+    print(f"build {seconds * 1000:.1f}ms")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "compatibility.json")
+        _, seconds = timed(index.save, path)
+        print(f"save  {seconds * 1000:.1f}ms ({os.path.getsize(path):,} bytes)")
+        index, seconds = timed(CompatibilityIndex.load, path)
+        print(f"load  {seconds * 1000:.1f}ms")
+
+    catalogs = {
+        name: load_csv_to_dict(
+            COMPONENTS[name].complete_path(args.root), COMPONENTS[name].key_column
+        )
+        for name in KEY_COLUMNS
+    }
+    for component, other in PAIRS:
+        names = list(catalogs[component])
+        start = time.perf_counter()
+        found = sum(len(index.compatible(component, name, other)) for name in names)
+        lookup = (time.perf_counter() - start) / len(names)
+        sample = names[: args.scan_rows]
+        start = time.perf_counter()
+        for name in sample:
+            expected = scan(catalogs, component, catalogs[component][name], other)
+            assert set(index.compatible(component, name, other)) == set(expected)
+        scanned = (time.perf_counter() - start) / len(sample)
+        print(
+            f"{component:>11} -> {other:<11} {lookup * 1e6:8.1f}us per lookup "
+            f"({found / len(names):7.1f} matches), scan {scanned * 1e6:9.1f}us "
+            f"({scanned / lookup:,.0f}x)"
+        )
@@ -0,0 +1,33 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.build import build_all
+from pipeline.dedup import find_duplicates
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time deduplication at scale.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            write_catalogs(args.root, root, scale, raw_limit=0)
+            merged = os.path.join(root, "training_data", "merged_data.csv")
+            build_all(root, merged_path=merged, component_files=False)
+            for near in (False, True):
+                start = time.perf_counter()
+                kept, report = find_duplicates(
+                    [merged], near=near, threshold=args.threshold
+                )
+                elapsed = time.perf_counter() - start
+                removed = len(kept) - sum(kept)
+                print(
+                    f"x{scale:<4} {'near' if near else 'exact':<5} "
+                    f"{len(kept):>9,} records {elapsed:7.2f}s "
+                    f"{len(kept) / elapsed:>9,.0f} records/s {removed:>9,} removed"
+                )
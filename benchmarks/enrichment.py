@@ -0,0 +1,52 @@
+import argparse
+import time
+
+from pipeline.enrichment import EnrichmentEngine
+from pipeline.stub_llm import StubChain
+
+def build_prompt(row):
+    fields = "\n".join(f"{key}: {value}" for key, value in row.items())
+    return (
+        f"Given the following RAM data:\n{fields}\n\n"
+        f"Please fill in the missing values in this format:\n\n{fields}\n"
+    )
+
+
+def make_rows(count):
+    """Synthetic RAM rows with the last two columns missing, like raw_data/ram.csv."""
+    return [
+        {
+            "model": f"Kit {i} 16GB",
+            "type": "DDR4",
+            "speed": "3200",
+            "Capacity (GB)": "16",
+            "Form Factor": "",
+            "DRAM Configuration": "",
+        }
+        for i in range(count)
+    ]
+
+
+def benchmark(rows, latency, concurrency):
+    chain = StubChain(latency=latency)
+    engine = EnrichmentEngine(chain, build_prompt, max_concurrency=concurrency)
+    start = time.perf_counter()
+    output = list(engine.run(rows))
+    elapsed = time.perf_counter() - start
+    assert [row["model"] for row in output] == [row["model"] for row in rows]
+    assert all(row["Form Factor"] == "stub" for row in output)
+    return len(output) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark enrichment rows/sec.")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16]
+    )
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        rate = benchmark(make_rows(args.rows), args.latency, concurrency)
+        print(f"concurrency={concurrency:<3} {rate:8.1f} rows/sec")
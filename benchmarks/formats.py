@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pipeline.formats import iter_records, open_outputs, render
+
+
+def load_pairs(path, scale):
+    records = list(iter_records(path))
+    return [
+        {"Prompt": prompt, "Response": response}
+        for _ in range(scale)
+        for prompt, response in records
+    ]
+
+
+def write(pairs, csv_path, name, chunk_rows=10000, **options):
+    outputs = open_outputs(csv_path, [name], merged=True, **options)
+    kinds = [output.kind for output in outputs]
+    for start in range(0, len(pairs), chunk_rows):
+        rendered = render(pairs[start : start + chunk_rows], kinds)
+        for output in outputs:
+            output.write(rendered[output.kind])
+    for output in outputs:
+        output.close()
+    return [path for output in outputs for path in output.paths]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare training data formats.")
+    parser.add_argument("--input", default="training_data/merged_data.csv")
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument(
+        "--compression", nargs="+", default=["snappy", "zstd", "gzip"]
+    )
+    parser.add_argument("--row-group-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.input, args.scale)
+    print(f"{len(pairs)} records (x{args.scale} {args.input})")
+    runs = [("csv", {}), ("jsonl", {})]
+    runs += [
+        ("parquet", {"compression": codec, "row_group_size": args.row_group_size})
+        for codec in args.compression
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "merged_data.csv")
+        try:
+            # Load pyarrow and its writer first, so the first Parquet run is
+            # not charged for it
+            write(pairs[:1], csv_path, "parquet")
+        except ImportError:
+            pass
+        for name, options in runs:
+            label = f"{name} {options.get('compression', '')}".strip()
+            try:
+                start = time.perf_counter()
+                paths = write(pairs, csv_path, name, **options)
+                written = time.perf_counter() - start
+            except ImportError as error:
+                print(f"{label:<16} skipped ({error})")
+                continue
+            start = time.perf_counter()
+            count = sum(1 for path in paths for _ in iter_records(path))
+            read = time.perf_counter() - start
+            assert count == len(pairs)
+            size = sum(os.path.getsize(path) for path in paths) / (1 << 20)
+            print(
+                f"{label:<16} {size:8.1f} MB  write {written:6.2f}s  "
+                f"read {read:6.2f}s ({count / read:,.0f} records/s)"
+            )
@@ -0,0 +1,55 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from benchmarks.build import read_all, write_scaled
+from pipeline.build import build_all
+from pipeline.components import COMPONENTS
+from pipeline.incremental import incremental_build
+
+
+def edit_one_row(root, name="cpu"):
+    """Bump one number in the first row of a component's complete catalog."""
+    path = COMPONENTS[name].complete_path(root)
+    with open(path, newline="") as file:
+        rows = list(csv.reader(file))
+    row = rows[1]
+    for column, value in enumerate(row):
+        if value.isdigit():
+            row[column] = str(int(value) + 1)
+            break
+    with open(path, "w", newline="") as file:
+        csv.writer(file).writerows(rows)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time incremental rebuilds.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            total, _ = write_scaled(args.root, root, scale)
+            merged = os.path.join(root, "training_data", "merged_data.csv")
+            first, _ = timed(incremental_build, root, merged_path=merged)
+            unchanged, _ = timed(incremental_build, root, merged_path=merged)
+            edit_one_row(root)
+            edited, report = timed(incremental_build, root, merged_path=merged)
+            assert report["cpu"]["changed"] == 1
+            patched = read_all(root)
+            full, _ = timed(build_all, root, merged_path=merged)
+            assert patched == read_all(root), "incremental output differs"
+            print(
+                f"x{scale:<4} {total:>8} rows  full build {full:6.2f}s  "
+                f"first incremental {first:6.2f}s  no-op {unchanged:6.3f}s  "
+                f"one-row edit {edited:6.3f}s ({full / edited:.0f}x)"
+            )
@@ -0,0 +1,60 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from pipeline.csv_io import CsvIndex, load_csv_to_dict
+
+
+def write_scaled(source, path, scale):
+    with open(source, "rb") as file:
+        header = file.readline()
+        body = file.read()
+    with open(path, "wb") as file:
+        file.write(header)
+        for _ in range(scale):
+            file.write(body)
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def iterate_dict(path, key_column):
+    return sum(1 for _ in load_csv_to_dict(path, key_column).items())
+
+
+def iterate_index(path, key_column, duplicates):
+    with CsvIndex(path, key_column, duplicates) as index:
+        return sum(1 for _ in index.items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare catalog loaders.")
+    parser.add_argument("--input", default="data/motherboard_complete.csv")
+    parser.add_argument("--key-column", default="Name")
+    parser.add_argument("--scale", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        # Every copy repeats every key, so the policies have work to do
+        write_scaled(args.input, path, args.scale)
+        print(f"{args.input} x{args.scale}")
+        rows, elapsed, peak = measure(iterate_dict, path, args.key_column)
+        print(f"dict of rows      {rows:>7} rows  {elapsed:6.2f}s  peak {peak:6.1f} MB")
+        for duplicates in ("first", "last", "merge"):
+            rows, elapsed, peak = measure(
+                iterate_index, path, args.key_column, duplicates
+            )
+            print(
+                f"CsvIndex {duplicates:<8} {rows:>7} rows  {elapsed:6.2f}s  "
+                f"peak {peak:6.1f} MB"
+            )
@@ -0,0 +1,76 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pipeline.components import COMPONENTS
+from pipeline.merge import merge_csv_files
+
+
+def merge_pandas(file_list, output_file):
+    """The original scripts/merger.py path."""
+    import pandas as pd
+
+    dataframes = [pd.read_csv(file) for file in file_list]
+    pd.concat(dataframes, ignore_index=True).to_csv(output_file, index=False)
+
+
+def write_inputs(root, directory, megabytes):
+    """Tile each component's training data until the inputs reach ``megabytes``."""
+    sources = [component.training_path(root) for component in COMPONENTS.values()]
+    per_file = megabytes * (1 << 20) // len(sources)
+    paths = []
+    for source in sources:
+        with open(source, "rb") as file:
+            header = file.readline()
+            body = file.read()
+        path = os.path.join(directory, os.path.basename(source))
+        with open(path, "wb") as file:
+            file.write(header)
+            for _ in range(max(per_file // len(body), 1)):
+                file.write(body)
+        paths.append(path)
+    return paths
+
+
+def run(mode, file_list, output_file):
+    """Merge in this (fresh) process and report time and peak RSS in MB."""
+    start = time.perf_counter()
+    if mode == "pandas":
+        merge_pandas(file_list, output_file)
+    else:
+        merge_csv_files(file_list, output_file, mode=mode)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CSV merge paths.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--megabytes", type=int, default=2048)
+    parser.add_argument(
+        "--modes", nargs="+", default=["pandas", "records", "bytes"]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_list = write_inputs(args.root, directory, args.megabytes)
+        size = sum(os.path.getsize(path) for path in file_list) / (1 << 20)
+        print(f"merging {len(file_list)} files, {size:,.0f} MB")
+        output_file = os.path.join(directory, "merged.csv")
+        for mode in args.modes:
+            # A fresh process per mode so peak RSS is not shared between them
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                try:
+                    elapsed, peak = executor.submit(
+                        run, mode, file_list, output_file
+                    ).result()
+                except ImportError as error:
+                    print(f"{mode:<8} skipped ({error})")
+                    continue
+            print(
+                f"{mode:<8} {elapsed:6.2f}s  {size / elapsed:7.1f} MB/s  "
+                f"peak RSS {peak:,.0f} MB"
+            )
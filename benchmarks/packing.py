@@ -0,0 +1,45 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.build import build_all
+from pipeline.packing import PackingReport, TokenIndex, WordTokenizer, pack_sequences
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time tokenizing and packing.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--max-length", type=int, default=2048)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            write_catalogs(args.root, root, scale, raw_limit=0)
+            merged = os.path.join(root, "training_data", "merged_data.csv")
+            build_all(root, merged_path=merged, component_files=False)
+            start = time.perf_counter()
+            index = TokenIndex.build([merged], WordTokenizer())
+            tokenized = time.perf_counter() - start
+            path = os.path.join(root, "merged_data.tokens.json")
+            index.save(path)
+            start = time.perf_counter()
+            index = TokenIndex.load(path)
+            loaded = time.perf_counter() - start
+            lengths = index.lengths()
+            start = time.perf_counter()
+            sequences = pack_sequences(lengths, args.max_length)
+            packed = time.perf_counter() - start
+            placed = sorted(i for sequence in sequences for i in sequence)
+            assert placed == list(range(len(lengths)))
+            loads = [sum(lengths[i] for i in sequence) for sequence in sequences]
+            assert max(loads) <= max(args.max_length, max(lengths))
+            padded = [max(load, args.max_length) for load in loads]
+            report = PackingReport(lengths, args.max_length, padded, "packed")
+            print(
+                f"x{scale:<4} {len(lengths):>9,} records: tokenize {tokenized:6.2f}s "
+                f"({len(lengths) / tokenized:,.0f}/s), index load {loaded:5.2f}s, "
+                f"pack {packed:5.2f}s ({len(lengths) / packed:,.0f}/s)"
+            )
+            print(report)
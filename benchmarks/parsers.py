@@ -0,0 +1,60 @@
+import argparse
+import random
+import re
+import time
+
+from pipeline.batch_tiers import capacity_range_columns, read_write_columns
+from pipeline.csv_io import read_csv
+from pipeline.parsers import parse_capacity_range, parse_read_write
+
+CATALOG = "data/ssd_complete.csv"
+
+
+def legacy_capacity(capacity_str):
+    """The parser this replaced, which only read the first size."""
+    match = re.search(r"(\d+\.?\d*)\s*(GB|TB)", capacity_str, re.IGNORECASE)
+    if match:
+        value = float(match.group(1))
+        if match.group(2).upper() == "TB":
+            value *= 1024
+        return int(value)
+    return 0
+
+
+def legacy_rw_speed(rw_speed_str):
+    """The parser this replaced, which only read "<n> MB/s"."""
+    match = re.search(r"(\d+\.?\d*)\s*MB/s", rw_speed_str, re.IGNORECASE)
+    if match:
+        return int(float(match.group(1)))
+    return 0
+
+
+def timed(function, values):
+    start = time.perf_counter()
+    function(values)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the SSD parsers.")
+    parser.add_argument("--values", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, _ = read_csv(CATALOG)
+    rng = random.Random(args.seed)
+    for column, legacy, parse, columns in (
+        ("Capacities", legacy_capacity, parse_capacity_range, capacity_range_columns),
+        ("R/W", legacy_rw_speed, parse_read_write, read_write_columns),
+    ):
+        values = [rng.choice(rows)[column] for _ in range(args.values)]
+        runs = [
+            ("legacy regex", lambda values: [legacy(v) for v in values]),
+            ("uncached", lambda values: [parse.__wrapped__(v) for v in values]),
+            ("cached", lambda values: [parse(v) for v in values]),
+            ("column", columns),
+        ]
+        for name, function in runs:
+            elapsed = timed(function, values)
+            rate = len(values) / elapsed / 1e6
+            print(f"{column:<10} {name:<12} {rate:6.2f}M values/s")
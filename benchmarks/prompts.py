@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from pipeline.csv_io import read_csv
+from pipeline.enrichment import EnrichmentEngine, missing_fields
+from pipeline.prompts import SSD_DEPENDENCIES, missing_field_prompt
+from pipeline.stub_llm import StubChain
+
+
+def full_row_prompt(row):
+    """The original SSD prompt, asking the model to restate every column."""
+    fields = "\n".join(f"        {key}: {value}" for key, value in row.items())
+    return (
+        f"Given the following SSD data:\n{fields}\n        \n"
+        "        Please fill in the missing values in this format:\n\n"
+        f"{fields}\n        "
+    )
+
+
+def benchmark(rows, build_prompt, args):
+    chain = StubChain(latency=args.latency, token_latency=args.token_latency)
+    engine = EnrichmentEngine(chain, build_prompt, max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    output = list(engine.run(rows))
+    elapsed = time.perf_counter() - start
+    assert all(all(row.values()) for row in output)
+    return chain, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare full-row and missing-field-only prompts."
+    )
+    parser.add_argument("--input", default="raw_data/ssd.csv")
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--token-latency", type=float, default=0.001)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    data, _ = read_csv(args.input)
+    incomplete = [row for row in data if missing_fields(row)]
+    groups = len({tuple(missing_fields(row)) for row in incomplete})
+    print(
+        f"{len(incomplete)} incomplete rows in {args.input}, "
+        f"{groups} missing-field sets"
+    )
+    modes = [
+        ("full row    ", full_row_prompt),
+        ("missing only", missing_field_prompt("SSD", SSD_DEPENDENCIES)),
+    ]
+    for name, build_prompt in modes:
+        rows = [dict(row) for row in incomplete]
+        chain, elapsed = benchmark(rows, build_prompt, args)
+        print(
+            f"{name}: {chain.completion_tokens / chain.calls:6.1f} output tokens/call "
+            f"{chain.prompt_tokens / chain.calls:6.1f} prompt tokens/call "
+            f"{elapsed:6.2f}s"
+        )
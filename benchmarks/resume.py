@@ -0,0 +1,95 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pipeline.csv_io import read_csv
+from pipeline.enrichment import enrich_csv
+from pipeline.stub_llm import StubChain
+
+
+class CrashingChain(StubChain):
+    """StubChain that raises once it has answered ``crash_after`` requests."""
+
+    def __init__(self, crash_after, **kwargs):
+        super().__init__(**kwargs)
+        self.crash_after = crash_after
+
+    def invoke(self, inputs, config=None):
+        if self.calls >= self.crash_after:
+            raise RuntimeError("simulated Ollama timeout")
+        return super().invoke(inputs, config)
+
+
+def build_prompt(row):
+    fields = "\n".join(f"{key}: {value}" for key, value in row.items())
+    return (
+        f"Given the following RAM data:\n{fields}\n\n"
+        f"Please fill in the missing values in this format:\n\n{fields}\n"
+    )
+
+
+def write_raw(path, count):
+    with open(path, "w", newline="") as csvfile:
+        csvfile.write("model,type,speed,Capacity (GB),Form Factor\n")
+        for i in range(count):
+            csvfile.write(f"Kit {i % (count - 5)} 16GB,DDR4,3200,16,\n")
+
+
+def run(directory, rows, crash_after, latency, concurrency):
+    input_csv_path = os.path.join(directory, "ram.csv")
+    output_csv_path = os.path.join(directory, "ram_complete.csv")
+    write_raw(input_csv_path, rows)
+
+    crashing = CrashingChain(crash_after, latency=latency)
+    try:
+        enrich_csv(
+            input_csv_path,
+            output_csv_path,
+            "model",
+            crashing,
+            build_prompt,
+            max_concurrency=concurrency,
+        )
+    except RuntimeError:
+        pass
+    committed = len(read_csv(output_csv_path)[0])
+
+    resumed = StubChain(latency=latency)
+    start = time.perf_counter()
+    enrich_csv(
+        input_csv_path,
+        output_csv_path,
+        "model",
+        resumed,
+        build_prompt,
+        max_concurrency=concurrency,
+        resume=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    output, _ = read_csv(output_csv_path)
+    expected, _ = read_csv(input_csv_path)
+    assert [row["model"] for row in output] == [row["model"] for row in expected]
+    assert all(row["Form Factor"] == "stub" for row in output)
+    # Each committed row must not be sent to the LLM again after the restart
+    assert resumed.calls == rows - committed
+    return committed, crashing.calls, resumed.calls, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crash and resume an enrichment run.")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--crash-after", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        committed, first_calls, resumed_calls, elapsed = run(
+            directory, args.rows, args.crash_after, args.latency, args.concurrency
+        )
+    print(f"crashed after {first_calls} LLM calls with {committed} rows committed")
+    print(f"resume made {resumed_calls} LLM calls in {elapsed:.2f}s")
+    print(f"LLM calls spent on lost in-flight rows: {first_calls - committed}")
+    print("committed rows re-sent to the LLM: 0")
@@ -0,0 +1,93 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import load_csv_to_dict
+from pipeline.metrics import percentile
+from pipeline.search import NUMBERS, OPERATORS, SearchIndex, words
+
+QUERIES = [
+    ("cpu", "AMD, socket AM4, cpuMark > 20000"),
+    ("cpu", "intel xeon, TDP <= 100"),
+    ("ram", "DDR5, capacity >= 32, speed > 6000"),
+    ("ram", "type DDR4, form factor DIMM, capacity >= 16"),
+    ("motherboard", "asus, chipset B550"),
+    ("motherboard", "socket LGA 1700, formfactor ATX"),
+    ("ssd", "samsung nvme, read >= 7000"),
+    ("ssd", "R/W > 7000"),
+]
+
+
+def scan(catalog, catalog_rows, query, limit):
+    """What a lookup took without the index: check every row of the dict."""
+    matches = []
+    for name, row in catalog_rows.items():
+        text = set(words(" ".join(v for v in row.values() if isinstance(v, str))))
+        if query.terms and not text & set(query.terms):
+            continue
+        if not all(
+            set(words(value)) <= set(words(row.get(column)))
+            for column, value in query.fields
+        ):
+            continue
+        read = NUMBERS[catalog.name]
+        values = [read[field](row) for field, _, _ in query.ranges]
+        if all(
+            value is not None and OPERATORS[op](value, bound)
+            for value, (_, op, bound) in zip(values, query.ranges)
+        ):
+            matches.append(name)
+    return matches[:limit]
+
+
+def timed(function, *args, repeat=1):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return result, sorted(times)
+
+
+def run(root, label):
+    index, seconds = timed(SearchIndex.build, root)
+    rows = sum(len(catalog.rows) for catalog in index.catalogs.values())
+    print(f"{label}: {rows:,} rows, build {seconds[0]:.2f}s", end="")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search_index.bin")
+        index.save(path)
+        index, seconds = timed(SearchIndex.load, path, repeat=5)
+        print(
+            f", {os.path.getsize(path) / 1e6:.1f}MB on disk, "
+            f"load {percentile(seconds, 50) * 1000:.1f}ms"
+        )
+    for component, text in QUERIES:
+        catalog = index.catalogs[component]
+        query = catalog.parse(text)
+        hits, seconds = timed(index.search, component, text, 10, repeat=500)
+        catalog_rows = load_csv_to_dict(
+            COMPONENTS[component].complete_path(root), COMPONENTS[component].key_column
+        )
+        _, scanned = timed(scan, catalog, catalog_rows, query, 10, repeat=3)
+        p50 = percentile(seconds, 50)
+        print(
+            f"  {component:>11} {text!r:48} {len(hits):>2} hits "
+            f"p50 {p50 * 1e6:6.1f}us p99 {percentile(seconds, 99) * 1e6:6.1f}us, "
+            f"scan {percentile(scanned, 50) * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time catalog search.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10])
+    args = parser.parse_args()
+
+    run(args.root, "catalogs")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            write_catalogs(args.root, root, scale, raw_limit=0)
+            run(root, f"x{scale}")
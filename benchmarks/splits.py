@@ -0,0 +1,42 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.build import build_all
+from pipeline.splits import split_records
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time train/val/test sharding.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            write_catalogs(args.root, root, scale, raw_limit=0)
+            merged = os.path.join(root, "training_data", "merged_data.csv")
+            build_all(root, merged_path=merged, component_files=False)
+            output_dir = os.path.join(root, "splits")
+            start = time.perf_counter()
+            paths, report = split_records([merged], output_dir, shards=args.shards)
+            elapsed = time.perf_counter() - start
+            records = sum(sum(counts.values()) for counts in report.strata.values())
+            sizes = {}
+            for path in paths:
+                split = os.path.basename(path).split("-")[0]
+                sizes.setdefault(split, []).append(os.path.getsize(path))
+            spread = max(
+                (max(split_sizes) - min(split_sizes)) / max(split_sizes)
+                for split_sizes in sizes.values()
+            )
+            # ru_maxrss is in kilobytes on Linux
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(
+                f"x{scale:<4} {records:>9,} records {elapsed:7.2f}s "
+                f"{records / elapsed:>9,.0f} records/s, shard sizes within "
+                f"{spread:.2%}, max RSS {rss:,.0f}MB"
+            )
@@ -0,0 +1,62 @@
+import argparse
+import time
+
+from benchmarks.enrichment import build_prompt, make_rows
+from pipeline.enrichment import EnrichmentEngine
+from pipeline.stub_llm import StubChain
+
+
+class MarkdownStub(StubChain):
+    """StubChain that answers "key: value" prompts the way chat models often do.
+
+    Answers carry chatter, bullets and bold upper-case keys, and like the JSON
+    answers every ``drop_every``-th one forgets its last field.
+    """
+
+    def _answer_format(self, prompt_text):
+        lines = super()._answer_format(prompt_text).split("\n")
+        if self.drop_every and self.calls % self.drop_every == 0:
+            lines = lines[:-1]
+        return "Sure! Here you go:\n\n" + "\n".join(
+            f"- **{line.split(':', 1)[0].upper()}:** {line.split(':', 1)[1]}"
+            for line in lines
+        )
+
+
+def benchmark(rows, structured, args):
+    chain = MarkdownStub(latency=args.latency, drop_every=args.drop_every)
+    engine = EnrichmentEngine(
+        chain,
+        build_prompt,
+        max_concurrency=args.concurrency,
+        structured=structured,
+        max_retries=args.max_retries,
+    )
+    start = time.perf_counter()
+    output = list(engine.run(rows))
+    elapsed = time.perf_counter() - start
+    complete = sum(all(row.values()) for row in output)
+    tokens = chain.prompt_tokens + chain.completion_tokens
+    return engine, complete, tokens, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare line and JSON parsing.")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--drop-every", type=int, default=3)
+    parser.add_argument("--max-retries", type=int, default=2)
+    args = parser.parse_args()
+
+    for structured in (False, True):
+        engine, complete, tokens, elapsed = benchmark(
+            make_rows(args.rows), structured, args
+        )
+        mode = "json " if structured else "lines"
+        print(
+            f"{mode}: {complete}/{args.rows} rows complete in {elapsed:.2f}s, "
+            f"{engine.llm_calls / max(complete, 1):.2f} LLM calls and "
+            f"{tokens / max(complete, 1):.0f} tokens per completed row"
+        )
+        print(f"       {engine.stats()}")
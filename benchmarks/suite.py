@@ -0,0 +1,294 @@
+"""Time every pipeline stage on synthetic catalogs and save the timings as JSON.
+
+For each scale the raw and complete catalogs are regenerated at that many
+times their real size (see benchmarks/synthetic.py), then each stage is
+timed on them:
+
+    load     reading every complete catalog into a key index
+    enrich   enriching every raw catalog against the stub LLM
+    build    generating the training data of every component
+    merge    merging the training data, once per merge mode
+
+Results go to benchmarks/results/<commit>.json. Comparing two of them shows
+which stages got slower between commits:
+
+    python -m benchmarks.suite --scales 10 100 1000 --latency 0.001
+    python -m benchmarks.suite --compare benchmarks/results/<old>.json
+    python -m benchmarks.suite --compare <old>.json <new>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import write_catalogs
+from pipeline.build import build_all
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import CsvIndex
+from pipeline.enrichment import enrich_csv
+from pipeline.merge import MODES, merge_csv_files
+from pipeline.prompts import missing_field_prompt
+from pipeline.stub_llm import StubChain
+
+STAGES = ("load", "enrich", "build", "merge")
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _git(*args):
+    try:
+        output = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+def result(stage, scale, rows, seconds, component=None, **extra):
+    return {
+        "stage": stage,
+        "component": component,
+        "scale": scale,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        **extra,
+    }
+
+
+def time_load(root, scale):
+    for name, component in COMPONENTS.items():
+        start = time.perf_counter()
+        with CsvIndex(component.complete_path(root), component.key_column) as index:
+            rows = sum(1 for _ in index.items())
+        yield result("load", scale, rows, time.perf_counter() - start, name)
+
+
+def time_enrich(root, scale, counts, args):
+    for name, component in COMPONENTS.items():
+        chain = StubChain(latency=args.latency, token_latency=args.token_latency)
+        output_path = os.path.join(root, "data", f"{name}_enriched.csv")
+        start = time.perf_counter()
+        # enrich_csv reports its progress, which would drown the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            enrich_csv(
+                component.raw_path(root),
+                output_path,
+                component.key_column,
+                chain,
+                missing_field_prompt(component.label, component.dependencies),
+                max_concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                label=component.label,
+                rules=component.rules,
+                flush_every=1000,
+            )
+        yield result(
+            "enrich",
+            scale,
+            counts[f"{name} raw"],
+            time.perf_counter() - start,
+            name,
+            llm_calls=chain.calls,
+            prompt_tokens=chain.prompt_tokens,
+            completion_tokens=chain.completion_tokens,
+        )
+
+
+def time_build(root, scale, rows, args):
+    start = time.perf_counter()
+    paths = build_all(root, jobs=args.jobs, chunk_size=args.chunk_size)
+    seconds = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in paths)
+    return result("build", scale, rows, seconds, bytes=size)
+
+
+def time_merge(root, scale, rows, mode):
+    paths = [component.training_path(root) for component in COMPONENTS.values()]
+    merged_path = os.path.join(root, "training_data", "merged_data.csv")
+    start = time.perf_counter()
+    merge_csv_files(paths, merged_path, mode=mode)
+    seconds = time.perf_counter() - start
+    return result(
+        f"merge {mode}", scale, rows, seconds, bytes=os.path.getsize(merged_path)
+    )
+
+
+def run(args):
+    results = []
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory(dir=args.workdir) as root:
+            start = time.perf_counter()
+            counts = write_catalogs(
+                args.root, root, scale, raw_limit=args.raw_rows, seed=args.seed
+            )
+            seconds = time.perf_counter() - start
+            total = sum(counts.values())
+            print(f"x{scale}: {total:,} rows generated in {seconds:.1f}s")
+            # Synthetic keys are unique, so every catalog row is one record
+            records = sum(counts[f"{name} complete"] for name in COMPONENTS)
+            if "load" in args.stages:
+                results.extend(time_load(root, scale))
+            if "enrich" in args.stages:
+                results.extend(time_enrich(root, scale, counts, args))
+            if "build" in args.stages:
+                results.append(time_build(root, scale, records, args))
+            elif "merge" in args.stages:
+                build_all(root, jobs=args.jobs, chunk_size=args.chunk_size)
+            if "merge" in args.stages:
+                for mode in sorted(MODES):
+                    results.append(time_merge(root, scale, records, mode))
+        for entry in results:
+            if entry["scale"] == scale:
+                print(format_result(entry))
+    return results
+
+
+def format_result(entry):
+    name = entry["stage"]
+    if entry["component"]:
+        name += f" {entry['component']}"
+    return (
+        f"x{entry['scale']:<5} {name:<20} {entry['rows']:>10,} rows "
+        f"{entry['seconds']:>9.3f}s {entry['rows_per_second'] or 0:>12,.0f} rows/s"
+    )
+
+
+def summary(args, results):
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "scales": args.scales,
+            "stages": args.stages,
+            "raw_rows": args.raw_rows,
+            "seed": args.seed,
+            "latency": args.latency,
+            "token_latency": args.token_latency,
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "jobs": args.jobs,
+            "chunk_size": args.chunk_size,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold):
+    """Print the change of every result both runs have, and return how many
+    got slower by more than ``threshold``."""
+
+    def keyed(run):
+        return {
+            (entry["stage"], entry["component"], entry["scale"]): entry
+            for entry in run["results"]
+        }
+
+    print(f"{(old['commit'] or '?')[:12]} -> {(new['commit'] or '?')[:12]}")
+    before = keyed(old)
+    regressions = 0
+    for key, entry in keyed(new).items():
+        if key not in before or not before[key]["rows_per_second"]:
+            continue
+        ratio = (entry["rows_per_second"] or 0) / before[key]["rows_per_second"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  slower"
+            regressions += 1
+        print(f"{format_result(entry)} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every pipeline stage on synthetic catalogs."
+    )
+    parser.add_argument(
+        "--root", default=".", help="Tree whose catalogs are scaled up"
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, default=list(STAGES)
+    )
+    parser.add_argument(
+        "--raw-rows",
+        type=int,
+        default=20000,
+        help="Maximum rows of each raw catalog to enrich (default: 20000)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stub LLM seconds per call"
+    )
+    parser.add_argument(
+        "--token-latency",
+        type=float,
+        default=0.0,
+        help="Stub LLM seconds per generated token",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument(
+        "--workdir", help="Where to generate the catalogs (default: system temp)"
+    )
+    parser.add_argument(
+        "--output", help="Results file (default: benchmarks/results/<commit>.json)"
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        metavar="RESULTS",
+        help="Compare this run, or a second results file, against a results file",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown that counts as a regression (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes one or two results files")
+    if args.compare and len(args.compare) == 2:
+        old, new = map(load, args.compare)
+    else:
+        new = summary(args, run(args))
+        output = args.output
+        if output is None:
+            os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+            name = (new["commit"] or "unknown")[:12]
+            if new["dirty"]:
+                name += "-dirty"
+            output = os.path.join(RESULTS_DIRECTORY, f"{name}.json")
+        with open(output, "w") as file:
+            json.dump(new, file, indent=2)
+        print(f"Results saved to {output}")
+        if not args.compare:
+            return
+        old = load(args.compare[0])
+    if compare(old, new, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Synthetic catalogs with the real column schemas, at any multiple of their size.
+
+Rows are drawn at random, with a fixed seed, from the real raw and complete
+catalogs and given fresh keys, so values, gaps and their mix stay realistic
+while the files grow. Complete rows the tier functions cannot classify (see
+the data defects in data/ram_complete.csv and data/motherboard_complete.csv)
+are never drawn, so every component builds.
+"""
+
+import csv
+import os
+import random
+
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import CsvIndex, read_csv, strip_bom
+
+
+def complete_rows(source_root, component):
+    """The rows of a complete catalog that can be turned into training data."""
+    rows = []
+    with CsvIndex(component.complete_path(source_root), component.key_column) as index:
+        for _, row in index.items():
+            if None in row.values():
+                continue
+            try:
+                component.tier(row)
+            except (TypeError, ValueError, AttributeError):
+                continue
+            rows.append(row)
+    return rows
+
+
+def raw_rows(source_root, component):
+    data, _ = read_csv(component.raw_path(source_root))
+    strip_bom(data)
+    return data
+
+
+def write_rows(path, rows, key_column, count, rng):
+    """Write ``count`` rows drawn from ``rows``, each under a unique key."""
+    fieldnames = [name for name in rows[0] if name is not None]
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(
+            file, fieldnames=fieldnames, restval="", extrasaction="ignore"
+        )
+        writer.writeheader()
+        for number in range(count):
+            row = rng.choice(rows)
+            writer.writerow({**row, key_column: f"{row[key_column]} #{number}"})
+
+
+def write_catalogs(source_root, root, scale, raw_limit=None, seed=0):
+    """Write raw and complete catalogs ``scale`` times the size of those under
+    ``source_root`` into ``root``, and return the row counts per file.
+
+    ``raw_limit`` caps the rows of each raw catalog, since enriching is far
+    slower than every other stage.
+    """
+    rng = random.Random(seed)
+    for directory in ("raw_data", "data", "training_data"):
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    counts = {}
+    for name, component in COMPONENTS.items():
+        rows = raw_rows(source_root, component)
+        count = scale * len(rows)
+        if raw_limit is not None:
+            count = min(count, raw_limit)
+        write_rows(component.raw_path(root), rows, component.key_column, count, rng)
+        counts[f"{name} raw"] = count
+
+        rows = complete_rows(source_root, component)
+        count = scale * len(rows)
+        path = component.complete_path(root)
+        write_rows(path, rows, component.key_column, count, rng)
+        counts[f"{name} complete"] = count
+    return counts
@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+
+from pipeline.batch_tiers import BATCH_TIERS
+from pipeline.components import COMPONENTS
+from pipeline.csv_io import read_csv
+
+
+def classifiable(component, root):
+    """The rows of a complete catalog that the row-by-row classifier accepts."""
+    data, _ = read_csv(component.complete_path(root))
+    rows = []
+    for row in data:
+        try:
+            component.tier(row)
+        except (TypeError, ValueError):
+            continue
+        rows.append(row)
+    return rows
+
+
+def synthetic_rows(component, root, count, rng):
+    """Rows with every classified column drawn independently from the catalog.
+
+    CPU marks are drawn uniformly instead, so that column is almost all
+    distinct values.
+    """
+    rows = classifiable(component, root)
+    columns = {field: [row[field] for row in rows] for field in rows[0]}
+    if component.name == "cpu":
+        columns["cpuMark"] = [str(mark) for mark in range(100000)]
+    return [
+        {field: rng.choice(values) for field, values in columns.items()}
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare tier classifiers.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for name, component in COMPONENTS.items():
+        rows = synthetic_rows(component, args.root, args.rows, rng)
+        start = time.perf_counter()
+        expected = [component.tier(row) for row in rows]
+        per_row = time.perf_counter() - start
+        start = time.perf_counter()
+        tiers = BATCH_TIERS[name](rows)
+        batch = time.perf_counter() - start
+        assert tiers == expected
+        print(
+            f"{name:<12} {len(rows)} rows  per row {per_row:6.2f}s  "
+            f"batch {batch:6.2f}s ({per_row / batch:.1f}x)"
+        )
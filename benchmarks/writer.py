@@ -0,0 +1,54 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from pipeline.csv_sink import CsvSink
+from pipeline.csv_io import read_csv
+
+
+def write_csv_per_row(path, fieldnames, data):
+    """The original path: reopen the file and build a DictWriter for every row."""
+    for row in data:
+        with open(path, "a", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writerows([row])
+
+
+def write_csv_sink(path, fieldnames, data, flush_every):
+    with CsvSink(path, fieldnames, flush_every=flush_every) as sink:
+        for row in data:
+            sink.write(row)
+
+
+def timed(write, *args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out.csv")
+        start = time.perf_counter()
+        write(path, *args)
+        elapsed = time.perf_counter() - start
+        with open(path, "rb") as csvfile:
+            content = csvfile.read()
+    return elapsed, content
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CSV write paths.")
+    parser.add_argument("--input", default="raw_data/ram.csv")
+    parser.add_argument(
+        "--flush-every", type=int, nargs="+", default=[1, 100, 1000]
+    )
+    args = parser.parse_args()
+
+    data, fieldnames = read_csv(args.input)
+    baseline, expected = timed(write_csv_per_row, fieldnames, data)
+    print(f"{len(data)} rows from {args.input}")
+    print(f"per-row append:          {baseline:.3f}s")
+    for flush_every in args.flush_every:
+        elapsed, content = timed(write_csv_sink, fieldnames, data, flush_every)
+        assert content == expected
+        print(
+            f"CsvSink flush_every={flush_every:<5} {elapsed:.3f}s "
+            f"({baseline / elapsed:.1f}x)"
+        )
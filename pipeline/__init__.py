@@ -0,0 +1,7 @@
+"""Schema-driven pipeline from raw hardware catalogs to LLM training data.
+
+Run ``python -m pipeline --help`` from the repository root for the commands.
+"""
+
+from .components import COMPONENTS, Component
+from .training import build_training_data, generate_prompt_and_response
@@ -0,0 +1,308 @@
+"""Many prompt phrasings per product, for more varied training data.
+
+Each component has a library of prompt patterns. ``{field}`` is filled from
+the row like the component's own prompt, and ``[a|b|c]`` picks one of the
+alternatives. A library is compiled once, by expanding every alternative,
+into a flat list of ``str.format_map`` templates. The first template is
+always the component's own prompt.
+
+Every product gets its own prompt plus ``variants - 1`` distinct templates
+sampled with a random generator seeded by ``seed`` and the product's key, so
+a product's prompts do not depend on the rest of the catalog. Templates with
+a field the product leaves empty are not sampled for it, and "a {field}"
+becomes "an" before a value that starts with a vowel sound. Records are
+generated and written a chunk at a time, so memory use does not grow with
+the catalog or the number of variants.
+"""
+
+import os
+import random
+import re
+import string
+from itertools import islice, product
+
+from .components import COMPONENTS
+from .csv_io import CsvIndex
+from .formats import (
+    COMPONENT_LINETERMINATOR,
+    discard_outputs,
+    open_outputs,
+    render,
+)
+from .metrics import Metrics
+from .tiers import tier_column
+from .training import describe, row_context
+
+ALTERNATIVES = re.compile(r"\[([^\[\]]*)\]")
+# "a {field}", compiled to "{a field}": the value with its article
+ARTICLE = re.compile(r"\ba \{([^{}]+)\}")
+ARTICLE_PREFIX = "a "
+# Letters whose names start with a vowel sound, for "an M.2", "an NVMe",
+# "an x4" and "an mSATA"
+VOWEL_LETTERS = frozenset("AEFHILMNORSX")
+# Initialisms read as words
+WORD_INITIALISMS = frozenset({"SATA"})
+# The leading run of letters and digits a value is read by
+LEADING_WORD = re.compile(r"[A-Za-z0-9]+")
+# Characters csv.writer's default dialect quotes a field for
+NEEDS_QUOTES = re.compile(r'[,"\r\n]')
+
+PROMPT_PATTERNS = {
+    "cpu": [
+        "[I need|I'm looking for|I want|Find me|Show me|Recommend] a CPU "
+        "[of|from|made by] {company} - {tier} power range",
+        "[Which|What] {company} [CPU|processor] [should I get|would you "
+        "recommend|fits best] for [a|the] {tier} [power range|performance "
+        "tier|budget]?",
+        "[Recommend|Suggest|Pick] a {tier}[-end| power| tier] {company} "
+        "[CPU|processor][| for my build| for a new PC]",
+        "[I need|I'm looking for|Looking for] a {company} [CPU|processor] with "
+        "{cores} cores[| in the {tier} range| for a {tier} power build]",
+        "[Give me|Show me|Find] a {tier} power {company} [CPU|processor] for "
+        "the {socket} socket",
+    ],
+    "ram": [
+        "[I need|I'm looking for|I want|Find me|Recommend] {Capacity (GB)}GB "
+        "[of RAM|of memory|RAM kit|memory kit] [with|at|running at] {speed} "
+        "speed[| in the {tier} range| - {tier} range]",
+        "[Which|What] {Capacity (GB)}GB {type} [RAM|memory|kit] [should I "
+        "buy|would you recommend] for [a|the] {tier} [range|budget|tier]?",
+        "[Suggest|Recommend|Show me] a {tier}[-range| tier] {type} "
+        "{Form Factor} [kit|module] [with|of] {Capacity (GB)}GB",
+    ],
+    "motherboard": [
+        "[I need|I'm looking for|I want|Find me|Recommend] a "
+        "[motherboard|mainboard|board] [of|from|made by] {company} - {tier} "
+        "power range",
+        "[Which|What] {company} [motherboard|board] [should I get|would you "
+        "recommend] for [a|the] {tier} [power range|build|budget]?",
+        "[Suggest|Recommend|Show me] a {tier} power {Formfactor} "
+        "[motherboard|board] [with|using] the {Chipset} chipset",
+        "[I need|Find me|Looking for] a {company} [motherboard|board] for the "
+        "{Socket} socket[| in the {tier} range]",
+    ],
+    "ssd": [
+        "[I need|I'm looking for|I want|Find me|Recommend] an SSD with "
+        "{Capacities} [capacities|capacity options] and {R/W} [speed|read/write "
+        "speed] - {tier} range",
+        "[Which|What] {tier}[-range| tier] SSD [offers|comes in|has] "
+        "{Capacities} [capacities|capacity options][| and {R/W} speeds]?",
+        "[Suggest|Recommend|Show me] a {tier} range {FormFactor} SSD "
+        "[with|using] a {Interface} interface",
+        "[Suggest|Recommend|Show me] a {tier} range {Interface} SSD with "
+        "{NANDType} NAND",
+        "[Give me|Show me|Find] a[| fast| reliable] {FormFactor} SSD [in|from] "
+        "the {tier} range with {R/W} [speed|read/write speeds]",
+    ],
+}
+
+
+def article(value):
+    """``value`` with "a" or "an" in front.
+
+    A word whose first letter is alone or followed by a capital or a digit
+    ("M.2", "NVMe", "x4", "mSATA") is read letter by letter, unless it is
+    one of the ``WORD_INITIALISMS``.
+    """
+    match = LEADING_WORD.match(value)
+    if match is None:
+        return "a " + value
+    first = match.group()
+    if first[0].isdigit():
+        vowel = first[0] == "8" or first in ("11", "18")
+    elif not first[1:2].islower() and first.upper() not in WORD_INITIALISMS:
+        vowel = first[0].upper() in VOWEL_LETTERS
+    else:
+        vowel = first[0].lower() in "aeiou"
+    return ("an " if vowel else "a ") + value
+
+
+def _filled(value):
+    return value is not None and str(value).strip() != ""
+
+
+def expand_pattern(pattern):
+    """Every string ``pattern`` stands for, one per choice of alternatives."""
+    pieces = ALTERNATIVES.split(pattern)
+    # Odd pieces are the insides of [...]
+    options = [
+        piece.split("|") if index % 2 else [piece]
+        for index, piece in enumerate(pieces)
+    ]
+    return ["".join(choice) for choice in product(*options)]
+
+
+class PromptLibrary:
+    """The prompt patterns of one component, compiled to format templates."""
+
+    def __init__(self, component, patterns):
+        known = {field for _, field in component.description}
+        known.update(("company", "tier", component.key_column))
+        templates = [component.prompt]
+        for pattern in patterns:
+            templates.extend(
+                ARTICLE.sub(r"{" + ARTICLE_PREFIX + r"\1}", template)
+                for template in expand_pattern(pattern)
+            )
+        self.component = component
+        self.templates = list(dict.fromkeys(templates))
+        # Template indices by the fields they use, and the fields used with
+        # an article
+        self._groups = {}
+        self._articles = set()
+        for index, template in enumerate(self.templates):
+            fields = set()
+            for _, field, _, _ in string.Formatter().parse(template):
+                if field is None:
+                    continue
+                if field.startswith(ARTICLE_PREFIX):
+                    field = field[len(ARTICLE_PREFIX) :]
+                    self._articles.add(field)
+                if field not in known:
+                    raise ValueError(
+                        f"unknown {component.name} field {field!r} in {template!r}"
+                    )
+                fields.add(field)
+            if index:
+                self._groups.setdefault(frozenset(fields), []).append(index)
+        self._fields = set().union(*self._groups)
+        self._choices = {}
+
+    def __len__(self):
+        return len(self.templates)
+
+    def choices(self, context):
+        """Indices of the templates besides the first with every field filled
+        in ``context``."""
+        empty = frozenset(
+            field for field in self._fields if not _filled(context.get(field))
+        )
+        choices = self._choices.get(empty)
+        if choices is None:
+            choices = self._choices[empty] = sorted(
+                index
+                for fields, indices in self._groups.items()
+                if not fields & empty
+                for index in indices
+            )
+        return choices
+
+    def prompts(self, context, count, rng):
+        """The component's own prompt and ``count - 1`` sampled others, or all
+        of them if fewer have their fields filled."""
+        choices = self.choices(context)
+        count = min(count, len(choices) + 1)
+        if count < 1:
+            return []
+        context = dict(context)
+        for field in self._articles:
+            if _filled(context.get(field)):
+                context[ARTICLE_PREFIX + field] = article(str(context[field]))
+        indices = [0] + rng.sample(choices, count - 1)
+        return [self.templates[index].format_map(context) for index in indices]
+
+
+def augmented_path(component, root):
+    return os.path.join(root, "training_data", f"{component.name}_augmented_data.csv")
+
+
+def augment_component(
+    component, root, variants=100, seed=0, duplicates="last", chunk_size=2000
+):
+    """Yield ``(prompts, response)`` for every catalog row, with ``variants``
+    prompts each."""
+    library = PromptLibrary(component, PROMPT_PATTERNS.get(component.name, ()))
+    path = component.complete_path(root)
+    with CsvIndex(path, component.key_column, duplicates) as index:
+        items = index.items()
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+            tiers = tier_column(component, [info for _, info in chunk])
+            for (key, info), tier in zip(chunk, tiers):
+                context = row_context(component, key, info, tier)
+                response = describe(component, context)
+                rng = random.Random(f"{seed}:{component.name}:{key}")
+                yield library.prompts(context, variants, rng), response
+
+
+def augment(
+    root,
+    names=None,
+    variants=100,
+    seed=0,
+    formats=("csv",),
+    duplicates="last",
+    chunk_records=10000,
+    metrics=None,
+    **output_options,
+):
+    """Write ``training_data/<component>_augmented_data.csv`` (and the other
+    ``formats``) for each component, and return the paths written."""
+    names = names or list(COMPONENTS)
+    metrics = metrics or Metrics()
+    written = []
+    for name in names:
+        component = COMPONENTS[name]
+        outputs = open_outputs(
+            augmented_path(component, root), formats, **output_options
+        )
+        kinds = [output.kind for output in outputs]
+        try:
+            with metrics.stage(f"augment {name}"):
+                chunk = []
+                records = 0
+                for prompts, response in augment_component(
+                    component, root, variants, seed, duplicates
+                ):
+                    metrics.count("rows_in")
+                    chunk.append((prompts, response))
+                    records += len(prompts)
+                    if records >= chunk_records:
+                        _write(outputs, chunk, kinds, metrics)
+                        chunk = []
+                        records = 0
+                _write(outputs, chunk, kinds, metrics)
+        except BaseException:
+            discard_outputs(outputs)
+            raise
+        for output in outputs:
+            output.close()
+            written.extend(output.paths)
+    metrics.count("bytes_written", sum(os.path.getsize(path) for path in written))
+    return written
+
+
+def csv_field(text):
+    """``text`` as csv.writer writes it in a row of more than one field."""
+    if NEEDS_QUOTES.search(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def render_csv(chunk):
+    """Component CSV records of ``(prompts, response)`` groups, like
+    ``formats.render_csv`` but quoting each response once for all its prompts."""
+    lines = []
+    for prompts, response in chunk:
+        tail = "," + csv_field(response) + COMPONENT_LINETERMINATOR
+        lines.extend(csv_field(prompt) + tail for prompt in prompts)
+    return "".join(lines)
+
+
+def _write(outputs, chunk, kinds, metrics):
+    rendered = {}
+    others = [kind for kind in kinds if kind != "csv"]
+    if others:
+        pairs = [
+            {"Prompt": prompt, "Response": response}
+            for prompts, response in chunk
+            for prompt in prompts
+        ]
+        rendered = render(pairs, others)
+    if "csv" in kinds:
+        rendered["csv"] = render_csv(chunk)
+    for output in outputs:
+        output.write(rendered[output.kind])
+    metrics.count("rows_out", sum(len(prompts) for prompts, _ in chunk))
@@ -0,0 +1,130 @@
+"""Tier classification for whole tables at once.
+
+Each column is parsed into a typed array once, parsing every distinct value
+only once, and tiers are assigned with ``searchsorted`` over the thresholds
+in ``pipeline.tiers``. The results are the same as classifying row by row,
+and so are the errors for values that cannot be parsed, though when a table
+has several bad values the one reported may differ.
+"""
+
+import numpy as np
+
+from .parsers import parse_capacity_range, parse_read_write
+from .tiers import (
+    CPU_MARK_THRESHOLDS,
+    MOTHERBOARD_PATTERNS,
+    RAM_THRESHOLDS,
+    SSD_THRESHOLDS,
+    TIERS,
+    determine_motherboard_power_range,
+)
+
+LABELS = np.array(TIERS, dtype=object)
+INVALID = -1
+
+
+def _factorize(values):
+    distinct = {}
+    inverse = np.fromiter(
+        (distinct.setdefault(value, len(distinct)) for value in values),
+        dtype=np.intp,
+        count=len(values),
+    )
+    return distinct, inverse
+
+
+def parse_column(values, parse, dtype=np.int64):
+    """Parse a column into an array, calling ``parse`` once per distinct value."""
+    distinct, inverse = _factorize(values)
+    parsed = np.fromiter(map(parse, distinct), dtype=dtype, count=len(distinct))
+    return parsed[inverse]
+
+
+def _pair_columns(values, parse):
+    distinct, inverse = _factorize(values)
+    pairs = [parse(value) or (None, None) for value in distinct]
+    # None becomes NaN
+    parsed = np.array(pairs, dtype=np.float64).reshape(len(pairs), 2)[inverse]
+    return parsed[:, 0], parsed[:, 1]
+
+
+def capacity_range_columns(values):
+    """Smallest and largest capacity in GB of each value, NaN where unknown."""
+    return _pair_columns(values, parse_capacity_range)
+
+
+def read_write_columns(values):
+    """Read and write speed in MB/s of each value, NaN where unknown."""
+    return _pair_columns(values, parse_read_write)
+
+
+def int_column(values, parse=int):
+    """Parse a column of integers in one pass, or with ``parse`` if one of
+    them is not an integer."""
+    try:
+        return np.fromiter(map(int, values), dtype=np.int64, count=len(values))
+    except (TypeError, ValueError, OverflowError):
+        return parse_column(values, parse)
+
+
+def _int_or_invalid(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return INVALID
+
+
+def tier_codes(values, thresholds):
+    """0, 1 or 2 for values below, from the first and from the second bound."""
+    return np.searchsorted(np.asarray(thresholds), values, side="right")
+
+
+def labels(codes):
+    return LABELS[codes].tolist()
+
+
+def cpu_tiers(rows, thresholds=CPU_MARK_THRESHOLDS):
+    marks = int_column([row.get("cpuMark", 0) for row in rows])
+    return labels(tier_codes(marks, thresholds))
+
+
+def motherboard_tiers(rows, patterns=MOTHERBOARD_PATTERNS):
+    def code(max_ram_speed):
+        tier = determine_motherboard_power_range(max_ram_speed, patterns)
+        return TIERS.index(tier)
+
+    column = [row["MaxRAMSpeed"] for row in rows]
+    return labels(parse_column(column, code, np.int8))
+
+
+def ram_tiers(rows, thresholds=RAM_THRESHOLDS):
+    speed = int_column([row["speed"] for row in rows])
+    capacities = [row["Capacity (GB)"] for row in rows]
+    capacity = int_column(capacities, _int_or_invalid)
+    speed_codes = tier_codes(speed, [bound[0] for bound in thresholds])
+    # Row by row, the capacity is only read once the speed reaches the mid
+    # tier, so a bad capacity is only an error there
+    unreadable = (capacity == INVALID) & (speed_codes > 0)
+    if unreadable.any():
+        int(capacities[int(np.argmax(unreadable))])
+    capacity_codes = tier_codes(capacity, [bound[1] for bound in thresholds])
+    return labels(np.minimum(speed_codes, capacity_codes))
+
+
+def ssd_tiers(rows, thresholds=SSD_THRESHOLDS):
+    # The largest capacity and the read speed, as parse_capacity and
+    # parse_rw_speed read them
+    capacity = capacity_range_columns([row["Capacities"] for row in rows])[1]
+    speed = read_write_columns([row["R/W"] for row in rows])[0]
+    capacity, speed = np.nan_to_num(capacity), np.nan_to_num(speed)
+    capacity_codes = tier_codes(capacity, [bound[0] for bound in thresholds])
+    speed_codes = tier_codes(speed, [bound[1] for bound in thresholds])
+    return labels(np.minimum(capacity_codes, speed_codes))
+
+
+BATCH_TIERS = {
+    "cpu": cpu_tiers,
+    "ram": ram_tiers,
+    "motherboard": motherboard_tiers,
+    "ssd": ssd_tiers,
+}
@@ -0,0 +1,55 @@
+import json
+
+# Batches go out and come back as {"records": [...]}, a JSON object, so they
+# also work with a model restricted to answering JSON objects
+RECORDS = "records"
+
+
+def build_batch_prompt(rows, key_column, label):
+    """Pack several incomplete rows into one JSON-object prompt."""
+    items = ",\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+    return (
+        f'Below is a JSON object whose "{RECORDS}" array holds {label} records '
+        "with some values missing. Reply with only a JSON object of the same "
+        f'shape, with one object per record in "{RECORDS}" containing the '
+        f'record\'s unchanged "{key_column}" and every field that was an '
+        "empty string, filled in with the correct value.\n\n"
+        f'{{"{RECORDS}": [\n{items}\n]}}'
+    )
+
+
+def _load(response, opening, closing):
+    start = response.find(opening)
+    end = response.rfind(closing)
+    if start == -1 or end < start:
+        return None
+    try:
+        return json.loads(response[start : end + 1])
+    except ValueError:
+        return None
+
+
+def parse_batch_response(response, key_column):
+    """Map each record key in a batch response to its filled-in values.
+
+    The records are read from a ``{"records": [...]}`` object, or from a
+    bare JSON array. Anything around the outermost braces or brackets
+    (markdown fences, chatter) is ignored. Records that are not objects or
+    lack the key column are dropped, so their rows fall back to a single-row
+    request.
+    """
+    items = _load(response, "{", "}")
+    items = items.get(RECORDS) if isinstance(items, dict) else None
+    if items is None:
+        items = _load(response, "[", "]")
+    if not isinstance(items, list):
+        return {}
+    answers = {}
+    for item in items:
+        if isinstance(item, dict) and key_column in item:
+            answers[str(item[key_column])] = {
+                key: str(value)
+                for key, value in item.items()
+                if value is not None and value != ""
+            }
+    return answers
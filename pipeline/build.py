@@ -0,0 +1,145 @@
+import os
+from collections import deque
+from itertools import islice
+
+from .components import COMPONENTS
+from .csv_io import CsvIndex
+from .formats import discard_outputs, open_outputs, render
+from .metrics import Metrics
+from .training import generate_prompt_and_response
+
+
+def render_chunk(name, items, kinds):
+    """Render the training records of one chunk for each kind of output."""
+    pairs = generate_prompt_and_response(COMPONENTS[name], dict(items))
+    return render(pairs, kinds)
+
+
+def _chunks(names, root, chunk_size, duplicates, metrics):
+    for name in names:
+        component = COMPONENTS[name]
+        path = component.complete_path(root)
+        with metrics.timer("read"):
+            index = CsvIndex(path, component.key_column, duplicates)
+        if index.collisions:
+            print(index.describe_collisions())
+        yield name, []  # marks the start of the component
+        items = index.items()
+        while True:
+            with metrics.timer("read"):
+                chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+            metrics.count("rows_in", len(chunk))
+            yield name, chunk
+
+
+class _Completed:
+    """A finished future, for chunks rendered without a worker process."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+def build_all(
+    root,
+    names=None,
+    jobs=1,
+    chunk_size=2000,
+    merged_path=None,
+    component_files=True,
+    formats=("csv",),
+    duplicates="last",
+    metrics=None,
+    **output_options,
+):
+    """Build the training data of several components in one pass.
+
+    Each component's catalog is cut into chunks of ``chunk_size`` rows that
+    ``jobs`` worker processes render in parallel. The parent writes the
+    rendered chunks back in order, into each component's training data and,
+    when ``merged_path`` is given, straight into the merged data without
+    reading the component files again. Every output is written in each of
+    ``formats`` (see ``pipeline.formats.open_outputs``, which also takes the
+    ``output_options``). Catalog rows sharing a key are resolved with the
+    ``duplicates`` policy of ``pipeline.csv_io.CsvIndex``, and rows are only
+    read a chunk at a time. The CSV output is byte-identical to building the
+    components one after another and merging them. Returns the paths written.
+
+    Outputs are written to temporary files that replace a component's files
+    once the component is done, and the merged data once every component is,
+    so a failed build keeps the outputs it did not finish.
+
+    Time spent reading, rendering (or waiting for the workers to) and writing
+    goes to ``metrics``, with the rows read and written and the bytes written.
+    """
+    names = names or list(COMPONENTS)
+    metrics = metrics or Metrics()
+    executor = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    window = deque()
+    written = []
+    merged = []
+    current = []
+
+    def submit(name, items, kinds):
+        if not items:
+            return _Completed(None)
+        if executor is None:
+            with metrics.timer("render"):
+                return _Completed(render_chunk(name, items, kinds))
+        return executor.submit(render_chunk, name, items, kinds)
+
+    def drain():
+        nonlocal current
+        name, rows, future = window.popleft()
+        with metrics.timer("wait"):
+            result = future.result()
+        if result is None:
+            _close(current, written)
+            if component_files:
+                path = COMPONENTS[name].training_path(root)
+                current = open_outputs(path, formats, **output_options)
+            return
+        with metrics.timer("write"):
+            for output in current + merged:
+                output.write(result[output.kind])
+        metrics.count("rows_out", rows)
+
+    try:
+        if merged_path is not None:
+            merged = open_outputs(merged_path, formats, merged=True, **output_options)
+        kinds = {output.kind for output in merged}
+        if component_files:
+            kinds.update(formats)
+        chunks = _chunks(names, root, chunk_size, duplicates, metrics)
+        for name, items in chunks:
+            window.append((name, len(items), submit(name, items, kinds)))
+            if len(window) > 2 * jobs:
+                drain()
+        while window:
+            drain()
+    except BaseException:
+        discard_outputs(current)
+        discard_outputs(merged)
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    _close(current, written)
+    _close(merged, written)
+    metrics.count("bytes_written", sum(os.path.getsize(path) for path in written))
+    return written
+
+
+def _close(outputs, written):
+    for output in outputs:
+        output.close()
+        written.extend(output.paths)
+    outputs.clear()
@@ -0,0 +1,622 @@
+import argparse
+import os
+
+from .components import COMPONENTS
+from .csv_io import DUPLICATE_POLICIES, DuplicateKeyError
+from .enrichment import add_enrich_arguments
+from .formats import add_output_arguments, output_options
+from .merge import MODES
+from .metrics import Metrics, add_metrics_arguments, finish
+
+# Each command imports what it needs when it runs, so that a command, and
+# --help, only pays for its own imports
+
+# pipeline.dedup.KEEP_POLICIES, without importing dedup's hashing
+KEEP_POLICIES = ("first", "last", "longest", "shortest")
+TEMPLATE = '{Prompt} "{text}"'
+
+
+def build(args, metrics):
+    from .build import build_all
+    from .incremental import incremental_build
+
+    merged_path = args.merge
+    if merged_path == "":
+        merged_path = os.path.join(args.root, "training_data", "merged_data.csv")
+    if args.incremental:
+        if args.formats != ["csv"] or args.merged_only:
+            raise SystemExit("error: --incremental only updates the CSV outputs")
+        try:
+            with metrics.stage("build"):
+                report = incremental_build(
+                    args.root, args.components, merged_path, duplicates=args.duplicates
+                )
+        except ValueError as error:
+            raise SystemExit(f"error: {error}")
+        for name, counts in report.items():
+            metrics.count("rows_out", counts["added"] + counts["changed"])
+            metrics.count("rows_reused", counts["reused"])
+            print(
+                f"{name}: {counts['added']} added, {counts['changed']} changed, "
+                f"{counts['deleted']} deleted, {counts['reused']} reused"
+                + ("" if counts["rewritten"] else " (output unchanged)")
+            )
+        return
+    try:
+        with metrics.stage("build"):
+            paths = build_all(
+                args.root,
+                args.components,
+                jobs=args.jobs,
+                chunk_size=args.chunk_size,
+                merged_path=merged_path,
+                component_files=not args.merged_only,
+                formats=args.formats,
+                duplicates=args.duplicates,
+                metrics=metrics,
+                **output_options(args),
+            )
+    except DuplicateKeyError as error:
+        raise SystemExit(f"error: {error}")
+    for path in paths:
+        print(f"Training data generated and saved to {os.path.basename(path)}")
+
+
+def merge(args, metrics):
+    from .merge import export_records, merge_csv_files
+
+    files = args.files or [
+        component.training_path(args.root) for component in COMPONENTS.values()
+    ]
+    output = args.output or os.path.join(
+        args.root, "training_data", "merged_data.csv"
+    )
+    others = [name for name in args.formats if name != "csv"]
+    try:
+        paths = []
+        if "csv" in args.formats:
+            paths.append(
+                merge_csv_files(files, output, mode=args.mode, metrics=metrics)
+            )
+        if others:
+            paths += export_records(
+                files, output, others, metrics=metrics, **output_options(args)
+            )
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
+    for path in paths:
+        print(f"Merged data saved to {path}")
+
+
+def dedup(args, metrics):
+    from .dedup import dedup_records
+
+    training_data = os.path.join(args.root, "training_data")
+    files = args.files or [os.path.join(training_data, "merged_data.csv")]
+    output = args.output or os.path.join(training_data, "deduped_data.csv")
+    try:
+        paths, report = dedup_records(
+            files,
+            output,
+            formats=args.formats,
+            metrics=metrics,
+            options=output_options(args),
+            keep=args.keep,
+            near=not args.exact_only,
+            threshold=args.threshold,
+            num_perm=args.num_perm,
+            shingle_size=args.shingle_size,
+        )
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
+    print(report)
+    for path in paths:
+        print(f"Deduplicated data saved to {path}")
+
+
+def augment(args, metrics):
+    from .augment import augment as augment_components
+
+    try:
+        paths = augment_components(
+            args.root,
+            args.components,
+            variants=args.variants,
+            seed=args.seed,
+            formats=args.formats,
+            duplicates=args.duplicates,
+            chunk_records=args.chunk_records,
+            metrics=metrics,
+            **output_options(args),
+        )
+    except DuplicateKeyError as error:
+        raise SystemExit(f"error: {error}")
+    for path in paths:
+        print(f"Augmented data saved to {os.path.basename(path)}")
+
+
+def pack(args, metrics):
+    from .packing import default_buckets, pack_records
+
+    training_data = os.path.join(args.root, "training_data")
+    files = args.files or [os.path.join(training_data, "merged_data.csv")]
+    output = args.output or os.path.join(training_data, "packed_data.jsonl")
+    buckets = args.buckets
+    if buckets == []:
+        buckets = default_buckets(args.max_length)
+    try:
+        report = pack_records(
+            files,
+            output,
+            tokenizer=args.tokenizer,
+            max_length=args.max_length,
+            separator=args.separator_tokens,
+            buckets=buckets,
+            index_path=args.index,
+            rebuild=args.rebuild,
+            metrics=metrics,
+        )
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
+    print(report)
+    print(f"Packed data saved to {output}")
+
+
+def split(args, metrics):
+    from .splits import split_records
+
+    training_data = os.path.join(args.root, "training_data")
+    files = args.files or [os.path.join(training_data, "merged_data.csv")]
+    output_dir = args.output_dir or os.path.join(training_data, "splits")
+    try:
+        paths, report = split_records(
+            files,
+            output_dir,
+            ratios=args.ratios,
+            shards=args.shards,
+            seed=args.seed,
+            formats=args.formats,
+            metrics=metrics,
+            options=output_options(args),
+        )
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
+    print(report)
+    print(f"{len(paths)} shards saved to {output_dir}")
+
+
+def compatible(args, metrics):
+    from .compatibility import PAIRS, load_index
+
+    if (args.component, args.other) not in PAIRS:
+        pairs = ", ".join(f"{a} {b}" for a, b in PAIRS)
+        raise SystemExit(f"error: components that can be matched: {pairs}")
+    try:
+        with metrics.stage("index"):
+            index = load_index(
+                args.root, args.index, duplicates=args.duplicates, rebuild=args.rebuild
+            )
+    except DuplicateKeyError as error:
+        raise SystemExit(f"error: {error}")
+    try:
+        with metrics.stage("lookup"):
+            names = index.compatible(args.component, args.name, args.other)
+    except KeyError as error:
+        raise SystemExit(f"error: {error.args[0]}")
+    metrics.count("rows_out", len(names))
+    for name in names:
+        print(name)
+    print(f"{len(names)} compatible {COMPONENTS[args.other].label} rows")
+
+
+def search(args, metrics):
+    import json
+
+    from .search import load_search_index
+
+    try:
+        with metrics.stage("index"):
+            index = load_search_index(
+                args.root, args.index, duplicates=args.duplicates, rebuild=args.rebuild
+            )
+    except DuplicateKeyError as error:
+        raise SystemExit(f"error: {error}")
+    try:
+        with metrics.stage("query"):
+            hits = index.search(args.component, args.query, args.limit)
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
+    metrics.count("rows_out", len(hits))
+    for hit in hits:
+        if args.rows:
+            print(json.dumps(hit.row, ensure_ascii=False))
+        else:
+            print(f"{hit.score:7.2f}  {hit.name}")
+
+
+def enrich(args, metrics):
+    from .enrichment import LazyChain, enrich_csv
+    from .prompts import missing_field_prompt
+
+    component = COMPONENTS[args.component]
+    if args.cache is None:
+        args.cache = os.path.join(args.root, "data", "llm_cache.sqlite")
+
+    def make_chain():
+        # Only runs once a row needs the LLM: dry runs and catalogs with no
+        # gaps left after prefill never import langchain or open the cache
+        from langchain_community.chat_models import ChatOllama
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
+        from .llm_cache import cached
+
+        llm = ChatOllama(model=args.model, format="json" if args.json else "")
+        prompt = ChatPromptTemplate.from_template(TEMPLATE)
+        return cached(prompt | llm | StrOutputParser(), args, args.model, TEMPLATE)
+
+    progress = None
+    if not args.dry_run:
+        try:
+            from tqdm import tqdm as progress
+        except ImportError:
+            pass
+
+    enrich_csv(
+        component.raw_path(args.root),
+        component.complete_path(args.root),
+        component.key_column,
+        LazyChain(make_chain),
+        missing_field_prompt(component.label, component.dependencies),
+        max_concurrency=args.concurrency,
+        max_pending=args.max_pending,
+        resume=args.resume,
+        batch_size=args.batch_size,
+        label=component.label,
+        structured=args.json,
+        max_retries=args.max_retries,
+        rules=None if args.no_prefill else component.rules,
+        flush_every=args.flush_every,
+        flush_seconds=args.flush_seconds,
+        progress=progress,
+        dry_run=args.dry_run,
+        metrics=metrics,
+    )
+    if not args.dry_run:
+        print(f"{component.label} data processing complete.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline",
+        description="Enrich hardware catalogs and build LLM training data.",
+    )
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Directory holding raw_data/, data/ and training_data/ (default: .)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build", help="Generate training data from the complete catalogs"
+    )
+    build_parser.add_argument(
+        "components",
+        nargs="*",
+        metavar="component",
+        help=f"Components to build: {', '.join(COMPONENTS)} (default: all)",
+    )
+    build_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render chunks of rows in this many worker processes (default: 1)",
+    )
+    build_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=2000,
+        help="Rows handed to a worker at a time (default: 2000)",
+    )
+    build_parser.add_argument(
+        "--merge",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="Also stream every record into one merged CSV "
+        "(default PATH: training_data/merged_data.csv under the root)",
+    )
+    build_parser.add_argument(
+        "--merged-only",
+        action="store_true",
+        help="With --merge, skip writing the per-component training data",
+    )
+    build_parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default="last",
+        help="Which row to use when a catalog repeats a key: the first, the "
+        "last, a merge of them or an error (default: last)",
+    )
+    build_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate rows that changed since the last incremental "
+        "build, tracked in training_data/manifest.json",
+    )
+    add_output_arguments(build_parser)
+    add_metrics_arguments(build_parser)
+    build_parser.set_defaults(func=build)
+
+    merge_parser = commands.add_parser(
+        "merge", help="Concatenate training data CSVs that share a header"
+    )
+    merge_parser.add_argument(
+        "files",
+        nargs="*",
+        help="CSV files to merge (default: every component's training data)",
+    )
+    merge_parser.add_argument(
+        "--output",
+        help="Merged CSV to write (default: training_data/merged_data.csv)",
+    )
+    merge_parser.add_argument(
+        "--mode",
+        choices=list(MODES),
+        default="records",
+        help="records: re-write rows with \\n line endings like the old pandas "
+        "merger; bytes: copy the raw bytes after each header (default: records)",
+    )
+    add_output_arguments(merge_parser)
+    add_metrics_arguments(merge_parser)
+    merge_parser.set_defaults(func=merge)
+
+    dedup_parser = commands.add_parser(
+        "dedup", help="Remove exact and near-duplicate training records"
+    )
+    dedup_parser.add_argument(
+        "files",
+        nargs="*",
+        help="Record files to deduplicate, as one dataset "
+        "(default: training_data/merged_data.csv)",
+    )
+    dedup_parser.add_argument(
+        "--output", help="Default: training_data/deduped_data.csv under the root"
+    )
+    dedup_parser.add_argument(
+        "--keep",
+        choices=KEEP_POLICIES,
+        default="first",
+        help="Record kept from each cluster of duplicates: the first or last "
+        "in file order, or the longest or shortest (default: first)",
+    )
+    dedup_parser.add_argument(
+        "--exact-only",
+        action="store_true",
+        help="Only remove records whose prompt and response are identical",
+    )
+    dedup_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.8,
+        help="Estimated Jaccard similarity of word shingles from which records "
+        "are near duplicates (default: 0.8)",
+    )
+    dedup_parser.add_argument(
+        "--num-perm",
+        type=int,
+        default=64,
+        help="MinHash signature length (default: 64)",
+    )
+    dedup_parser.add_argument(
+        "--shingle-size",
+        type=int,
+        default=3,
+        help="Words per shingle (default: 3)",
+    )
+    add_output_arguments(dedup_parser)
+    add_metrics_arguments(dedup_parser)
+    dedup_parser.set_defaults(func=dedup)
+
+    augment_parser = commands.add_parser(
+        "augment", help="Generate many prompt phrasings per catalog row"
+    )
+    augment_parser.add_argument(
+        "components",
+        nargs="*",
+        metavar="component",
+        help=f"Components to augment: {', '.join(COMPONENTS)} (default: all)",
+    )
+    augment_parser.add_argument(
+        "--variants",
+        type=int,
+        default=100,
+        help="Prompts per row, the row's usual prompt included, or all of a "
+        "component's patterns if it has fewer (default: 100)",
+    )
+    augment_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the phrasings each row gets (default: 0)",
+    )
+    augment_parser.add_argument(
+        "--chunk-records",
+        type=int,
+        default=10000,
+        help="Records rendered and written at a time (default: 10000)",
+    )
+    augment_parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default="last",
+        help="Which row to use when a catalog repeats a key (default: last)",
+    )
+    add_output_arguments(augment_parser)
+    add_metrics_arguments(augment_parser)
+    augment_parser.set_defaults(func=augment)
+
+    pack_parser = commands.add_parser(
+        "pack", help="Pack training records into fixed-length token sequences"
+    )
+    pack_parser.add_argument(
+        "files",
+        nargs="*",
+        help="Record files to pack, as one dataset "
+        "(default: training_data/merged_data.csv)",
+    )
+    pack_parser.add_argument(
+        "--output", help="Default: training_data/packed_data.jsonl under the root"
+    )
+    pack_parser.add_argument(
+        "--tokenizer",
+        default="words",
+        help="words, bytes or the path of a HuggingFace tokenizer.json "
+        "(default: words)",
+    )
+    pack_parser.add_argument(
+        "--max-length",
+        type=int,
+        default=2048,
+        help="Tokens per packed sequence (default: 2048)",
+    )
+    pack_parser.add_argument(
+        "--separator-tokens",
+        type=int,
+        default=1,
+        help="Tokens added to every record, e.g. for EOS (default: 1)",
+    )
+    pack_parser.add_argument(
+        "--buckets",
+        type=int,
+        nargs="*",
+        metavar="SIZE",
+        help="Sort records into length buckets of these sizes instead of "
+        "packing them (default sizes: doubling from 64 up to --max-length)",
+    )
+    pack_parser.add_argument(
+        "--index",
+        help="Saved token counts (default: the first file's name with "
+        ".tokens.json), recounted whenever an input or the tokenizer changes",
+    )
+    pack_parser.add_argument(
+        "--rebuild", action="store_true", help="Recount tokens even if current"
+    )
+    add_metrics_arguments(pack_parser)
+    pack_parser.set_defaults(func=pack)
+
+    split_parser = commands.add_parser(
+        "split", help="Split training records into train/val/test shards"
+    )
+    split_parser.add_argument(
+        "files",
+        nargs="*",
+        help="Record files to split, as one dataset "
+        "(default: training_data/merged_data.csv)",
+    )
+    split_parser.add_argument(
+        "--output-dir", help="Default: training_data/splits under the root"
+    )
+    split_parser.add_argument(
+        "--ratios",
+        type=float,
+        nargs=3,
+        default=[0.8, 0.1, 0.1],
+        metavar=("TRAIN", "VAL", "TEST"),
+        help="Share of the records in each split (default: 0.8 0.1 0.1)",
+    )
+    split_parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Files of about equal size per split (default: 1)",
+    )
+    split_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Hash seed; another seed gives other, equally stable splits "
+        "(default: 0)",
+    )
+    add_output_arguments(split_parser)
+    add_metrics_arguments(split_parser)
+    split_parser.set_defaults(func=split)
+
+    compatible_parser = commands.add_parser(
+        "compatible", help="List the parts of one kind that fit a given part"
+    )
+    compatible_parser.add_argument("component", choices=list(COMPONENTS))
+    compatible_parser.add_argument(
+        "name", help="Catalog key of the part, e.g. a cpuName or board Name"
+    )
+    compatible_parser.add_argument(
+        "other", choices=list(COMPONENTS), help="Kind of part to list"
+    )
+    compatible_parser.add_argument(
+        "--index",
+        help="Saved compatibility index (default: data/compatibility.json under "
+        "the root), rebuilt whenever a catalog changes",
+    )
+    compatible_parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the index even if current"
+    )
+    compatible_parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default="last",
+        help="Which row to use when a catalog repeats a key (default: last)",
+    )
+    add_metrics_arguments(compatible_parser)
+    compatible_parser.set_defaults(func=compatible)
+
+    search_parser = commands.add_parser(
+        "search", help="Look up catalog rows by text, column value and number"
+    )
+    search_parser.add_argument("component", choices=list(COMPONENTS))
+    search_parser.add_argument(
+        "query",
+        help='Comma-separated clauses, e.g. "AMD, socket AM5, cpuMark > 40000"',
+    )
+    search_parser.add_argument(
+        "--limit", type=int, default=10, help="Rows to list (default: 10)"
+    )
+    search_parser.add_argument(
+        "--rows", action="store_true", help="Print every matching row as JSON"
+    )
+    search_parser.add_argument(
+        "--index",
+        help="Saved search index (default: data/search_index.bin under the "
+        "root), rebuilt whenever a catalog changes",
+    )
+    search_parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the index even if current"
+    )
+    search_parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default="last",
+        help="Which row to use when a catalog repeats a key (default: last)",
+    )
+    add_metrics_arguments(search_parser)
+    search_parser.set_defaults(func=search)
+
+    enrich_parser = commands.add_parser(
+        "enrich", help="Fill in missing catalog fields with an LLM"
+    )
+    enrich_parser.add_argument("component", choices=list(COMPONENTS))
+    enrich_parser.add_argument(
+        "--model", default="llama3", help="Ollama model to use (default: llama3)"
+    )
+    add_enrich_arguments(enrich_parser)
+    add_metrics_arguments(enrich_parser)
+    enrich_parser.set_defaults(func=enrich)
+
+    args = parser.parse_args(argv)
+    unknown = set(getattr(args, "components", ())) - set(COMPONENTS)
+    if unknown:
+        parser.error(f"unknown component: {', '.join(sorted(unknown))}")
+    metrics = Metrics(profile_dir=args.profile)
+    args.func(args, metrics)
+    finish(metrics, args)
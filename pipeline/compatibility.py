@@ -0,0 +1,255 @@
+"""Which CPUs, motherboards, RAM kits and SSDs fit together.
+
+Every catalog row is reduced to normalized join keys:
+
+    socket   "FCLGA-3647", "LGA 3647" and "2x LGA 3647" are all "LGA3647"
+    memory   the DDR generations named in the memory type and speed columns
+    storage  the slots a board offers and a drive needs: "SATA" (2.5" drives),
+             "M.2 SATA", "M.2 NVMe", "mSATA", "U.2" and "PCIe" (add-in cards)
+
+and each component's rows are grouped by key once, so a lookup is a union of
+a few precomputed lists instead of a scan of the other catalog. CPUs and
+boards pair on socket, CPUs or boards and RAM on DDR generation, boards and
+SSDs on storage slot. RAM speed never rules a kit out, since faster memory
+runs at the board's speed. External USB and Thunderbolt drives fit any board
+and are left out.
+"""
+
+import json
+import os
+import re
+
+from .components import COMPONENTS
+from .csv_io import CsvIndex
+from .prefill import normalize_socket
+
+INDEX_VERSION = 1
+
+# (component, column) pairs each join key is read from
+KEY_COLUMNS = {
+    "cpu": {"socket": ["socket"], "memory": ["MemoryType", "MaxRAMSpeed"]},
+    "motherboard": {
+        "socket": ["Socket"],
+        "memory": ["MemoryType", "MaxRAMSpeed"],
+        "storage": ["SupportedStorageInterfaces", "SupportedFormFactors"],
+    },
+    "ram": {"memory": ["type"]},
+    "ssd": {"storage": ["Interface", "FormFactor"]},
+}
+# The key two components are joined on
+PAIRS = {
+    ("cpu", "motherboard"): "socket",
+    ("cpu", "ram"): "memory",
+    ("motherboard", "ram"): "memory",
+    ("motherboard", "ssd"): "storage",
+}
+PAIRS.update({(b, a): key for (a, b), key in list(PAIRS.items())})
+
+# "DDR4" but not the "DDR4" of "DDR400"
+DDR = re.compile(r"(?<!LP)DDR(?:(\d)(?!\d))?", re.IGNORECASE)
+M2_SLOT = re.compile(r"M\.2[^,]*")
+SATA_PORT = re.compile(r"\bSATA|2\.5|3\.5|HDD")
+M2_SATA = re.compile(r"M\.2[^,]*SATA|SATA[^,]*M\.2")
+NVME = re.compile(r"NVME|PCIE|KEY\s*M")
+
+
+def socket_keys(*texts):
+    """Sockets as ``pipeline.prefill.normalize_socket`` spells them."""
+    return {normalize_socket(text) for text in texts} - {""}
+
+
+def memory_keys(*texts):
+    """DDR generations, "DDR3" for "DDR3L" but nothing for soldered LPDDR.
+
+    A bare "DDR" (as in "DDR-1866" or "DDR400") only means the first
+    generation when no other one is named.
+    """
+    generations = {
+        generation for text in texts for generation in DDR.findall(text or "")
+    }
+    if generations == {""}:
+        return {"DDR1"}
+    return {f"DDR{generation}" for generation in generations if generation}
+
+
+def board_storage_keys(interfaces, form_factors):
+    text = f"{interfaces or ''}, {form_factors or ''}".upper()
+    keys = set()
+    # SATA ports, as opposed to M.2 slots that take SATA drives
+    if SATA_PORT.search(M2_SLOT.sub("", text)):
+        keys.add("SATA")
+    if "M.2" in text:
+        nvme = NVME.search(text)
+        sata = M2_SATA.search(text)
+        # A slot whose bus is not given is taken to accept either
+        if nvme or not sata:
+            keys.add("M.2 NVMe")
+        if sata or not nvme:
+            keys.add("M.2 SATA")
+    elif "NVME" in text:
+        # "PCIe NVMe" boards take NVMe drives in their M.2 slots
+        keys.add("M.2 NVMe")
+    if "MSATA" in text:
+        keys.add("mSATA")
+    if "U.2" in text:
+        keys.add("U.2")
+    if "PCIE" in text:
+        keys.add("PCIe")
+    return keys
+
+
+def ssd_storage_keys(interface, form_factor):
+    interface = (interface or "").upper()
+    form_factor = (form_factor or "").upper()
+    keys = set()
+    sata = "SATA" in interface
+    nvme = "NVME" in interface or "PCIE" in interface
+    m2 = "M.2" in form_factor or "M.2" in interface
+    if sata and "MSATA" in form_factor:
+        keys.add("mSATA")
+    if sata and "2.5" in form_factor:
+        keys.add("SATA")
+    if sata and m2:
+        keys.add("M.2 SATA")
+    if nvme and m2:
+        keys.add("M.2 NVMe")
+    if nvme and "U.2" in form_factor:
+        keys.add("U.2")
+    if nvme and ("AIC" in form_factor or "HHHL" in form_factor):
+        keys.add("PCIe")
+    return keys
+
+
+NORMALIZERS = {
+    ("cpu", "socket"): socket_keys,
+    ("cpu", "memory"): memory_keys,
+    ("motherboard", "socket"): socket_keys,
+    ("motherboard", "memory"): memory_keys,
+    ("motherboard", "storage"): board_storage_keys,
+    ("ram", "memory"): memory_keys,
+    ("ssd", "storage"): ssd_storage_keys,
+}
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def default_index_path(root):
+    return os.path.join(root, "data", "compatibility.json")
+
+
+class CompatibilityIndex:
+    """Join keys of every catalog row, and the rows grouped by each key.
+
+    ``keys[component][join][name]`` lists the keys of one row and
+    ``postings[component][join][key]`` the names of the rows with that key,
+    in catalog order.
+    """
+
+    def __init__(self, keys, postings, sources=None, duplicates="last"):
+        self.keys = keys
+        self.postings = postings
+        self.sources = sources or {}
+        self.duplicates = duplicates
+
+    @classmethod
+    def build(cls, root, duplicates="last"):
+        """Read the complete catalogs under ``root`` and join them."""
+        keys = {}
+        postings = {}
+        sources = {}
+        for name, joins in KEY_COLUMNS.items():
+            component = COMPONENTS[name]
+            path = component.complete_path(root)
+            sources[name] = _stat(path)
+            keys[name] = {join: {} for join in joins}
+            postings[name] = {join: {} for join in joins}
+            with CsvIndex(path, component.key_column, duplicates) as index:
+                for key, row in index.items():
+                    for join, columns in joins.items():
+                        values = [row.get(column) for column in columns]
+                        row_keys = sorted(NORMALIZERS[name, join](*values))
+                        keys[name][join][key] = row_keys
+                        for row_key in row_keys:
+                            postings[name][join].setdefault(row_key, []).append(key)
+        return cls(keys, postings, sources, duplicates)
+
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "duplicates": self.duplicates,
+            "sources": self.sources,
+            "keys": self.keys,
+            "postings": self.postings,
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or return None if it is missing or unreadable."""
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["keys"], data["postings"], data["sources"], data["duplicates"])
+
+    def is_current(self, root, duplicates="last"):
+        """Whether the index was built from the catalogs now under ``root``."""
+        return self.duplicates == duplicates and all(
+            self.sources.get(name) == _stat(COMPONENTS[name].complete_path(root))
+            for name in KEY_COLUMNS
+        )
+
+    def compatible(self, component, name, other):
+        """Names of the ``other`` rows that fit the ``component`` row ``name``."""
+        join = PAIRS.get((component, other))
+        if join is None:
+            raise ValueError(f"{component} and {other} are not matched directly")
+        try:
+            row_keys = self.keys[component][join][name]
+        except KeyError:
+            raise KeyError(f"no {component} named {name!r}") from None
+        postings = self.postings[other][join]
+        if len(row_keys) == 1:
+            return list(postings.get(row_keys[0], ()))
+        names = {}
+        for row_key in row_keys:
+            names.update(dict.fromkeys(postings.get(row_key, ())))
+        return list(names)
+
+    def motherboards_for_cpu(self, name):
+        return self.compatible("cpu", name, "motherboard")
+
+    def cpus_for_motherboard(self, name):
+        return self.compatible("motherboard", name, "cpu")
+
+    def ram_for_motherboard(self, name):
+        return self.compatible("motherboard", name, "ram")
+
+    def ssds_for_motherboard(self, name):
+        return self.compatible("motherboard", name, "ssd")
+
+
+def load_index(root, path=None, duplicates="last", rebuild=False):
+    """The compatibility index of the catalogs under ``root``.
+
+    It is saved to ``path`` (by default ``data/compatibility.json``) and only
+    rebuilt when a catalog changed since, or when ``rebuild`` is set.
+    """
+    path = path or default_index_path(root)
+    index = None if rebuild else CompatibilityIndex.load(path)
+    if index is None or not index.is_current(root, duplicates):
+        index = CompatibilityIndex.build(root, duplicates)
+        index.save(path)
+    return index
@@ -0,0 +1,144 @@
+import os
+
+from .prefill import CPU_RULES, MOTHERBOARD_RULES, RAM_RULES, SSD_RULES
+from .prompts import (
+    CPU_DEPENDENCIES,
+    MOTHERBOARD_DEPENDENCIES,
+    RAM_DEPENDENCIES,
+    SSD_DEPENDENCIES,
+)
+from .tiers import cpu_tier, motherboard_tier, ram_tier, ssd_tier
+
+
+class Component:
+    """Schema of one hardware component, from raw catalog to training pairs.
+
+    ``prompt`` is a ``str.format_map`` template and ``description`` a list of
+    ``(label, field)`` pairs for the markdown response. Both are rendered
+    against the row's columns plus ``company`` (first word of the key) and
+    ``tier`` (the result of the ``tier`` classifier).
+    """
+
+    def __init__(
+        self,
+        name,
+        label,
+        key_column,
+        tier,
+        prompt,
+        description,
+        rules=(),
+        dependencies=None,
+    ):
+        self.name = name
+        self.label = label
+        self.key_column = key_column
+        self.tier = tier
+        self.prompt = prompt
+        self.description = description
+        self.rules = list(rules)
+        self.dependencies = dependencies or {}
+
+    def raw_path(self, root):
+        return os.path.join(root, "raw_data", f"{self.name}.csv")
+
+    def complete_path(self, root):
+        return os.path.join(root, "data", f"{self.name}_complete.csv")
+
+    def training_path(self, root):
+        return os.path.join(root, "training_data", f"{self.name}_training_data.csv")
+
+
+CPU = Component(
+    name="cpu",
+    label="CPU",
+    key_column="cpuName",
+    tier=cpu_tier,
+    prompt="I need a CPU of {company} - {tier} power range",
+    description=[
+        ("CPU Name", "cpuName"),
+        ("Company", "company"),
+        ("Socket", "socket"),
+        ("Supported Chipsets", "SupportedChipsets"),
+        ("Max RAM Speed", "MaxRAMSpeed"),
+        ("Memory Type", "MemoryType"),
+        ("CPU Mark", "cpuMark"),
+        ("CPU Value", "cpuValue"),
+        ("Thread Mark", "threadMark"),
+        ("Thread Value", "threadValue"),
+        ("TDP", "TDP"),
+        ("Power Performance", "powerPerf"),
+        ("Cores", "cores"),
+    ],
+    rules=CPU_RULES,
+    dependencies=CPU_DEPENDENCIES,
+)
+
+RAM = Component(
+    name="ram",
+    label="RAM",
+    key_column="model",
+    tier=ram_tier,
+    prompt="I need {Capacity (GB)}GB RAM with {speed} speed - {tier} range",
+    description=[
+        ("Model", "model"),
+        ("Type", "type"),
+        ("Speed", "speed"),
+        ("Capacity (GB)", "Capacity (GB)"),
+        ("Form Factor", "Form Factor"),
+        ("DRAM Configuration", "DRAM Configuration"),
+    ],
+    rules=RAM_RULES,
+    dependencies=RAM_DEPENDENCIES,
+)
+
+MOTHERBOARD = Component(
+    name="motherboard",
+    label="motherboard",
+    key_column="Name",
+    tier=motherboard_tier,
+    prompt="I need a motherboard of {company} - {tier} power range",
+    description=[
+        ("Motherboard Name", "Name"),
+        ("Company", "company"),
+        ("Socket", "Socket"),
+        ("Chipset", "Chipset"),
+        ("Max RAM Speed", "MaxRAMSpeed"),
+        ("Memory Type", "MemoryType"),
+        ("Supported Storage Interfaces", "SupportedStorageInterfaces"),
+        ("Supported Form Factors", "SupportedFormFactors"),
+        ("Form Factor", "Formfactor"),
+    ],
+    rules=MOTHERBOARD_RULES,
+    dependencies=MOTHERBOARD_DEPENDENCIES,
+)
+
+SSD = Component(
+    name="ssd",
+    label="SSD",
+    key_column="Model",
+    tier=ssd_tier,
+    prompt="I need an SSD with {Capacities} capacities and {R/W} speed - {tier} range",
+    description=[
+        ("Model", "Model"),
+        ("Interface", "Interface"),
+        ("Form Factor", "FormFactor"),
+        ("Capacities", "Capacities"),
+        ("Controller", "Controller"),
+        ("Configuration", "Configuration"),
+        ("DRAM", "DRAM"),
+        ("HMB", "HMB"),
+        ("NAND Brand", "NAND Brand"),
+        ("NAND Type", "NANDType"),
+        ("Layers", "Layers"),
+        ("R/W Speed", "R/W"),
+        ("Categories", "Categories"),
+    ],
+    rules=SSD_RULES,
+    dependencies=SSD_DEPENDENCIES,
+)
+
+# In the order the training sets are merged
+COMPONENTS = {
+    component.name: component for component in (CPU, RAM, MOTHERBOARD, SSD)
+}
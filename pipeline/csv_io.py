@@ -0,0 +1,182 @@
+import csv
+from collections import Counter
+
+
+def read_csv(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.DictReader(csvfile)
+        data = [row for row in reader]
+        return data, reader.fieldnames
+
+
+def strip_bom(data):
+    """Remove BOM character from the first column name if it exists."""
+    if not data:
+        return
+    first_column = list(data[0].keys())[0]
+    if first_column.startswith("\ufeff"):
+        new_first_column = first_column.lstrip("\ufeff")
+        for row in data:
+            row[new_first_column] = row.pop(first_column)
+
+
+DUPLICATE_POLICIES = ("first", "last", "merge", "error")
+
+
+class DuplicateKeyError(ValueError):
+    def __init__(self, path, key_column, collisions):
+        self.collisions = collisions
+        sample = ", ".join(repr(key) for key in list(collisions)[:3])
+        super().__init__(
+            f"{path}: {len(collisions)} {key_column} values appear more than "
+            f"once, e.g. {sample}"
+        )
+
+
+def _decode(line):
+    # Match the universal newlines of a text-mode reader
+    return line.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+class CsvIndex:
+    """Rows of a CSV file indexed by one column, read from disk on demand.
+
+    One pass over the file maps every key to the byte offset of its row, in
+    the order keys first appear. ``duplicates`` decides what a repeated key
+    maps to: the ``first`` or ``last`` row (``last`` is what a dict of rows
+    ends up with), a ``merge`` of all of them in which the first non-empty
+    value of each field wins, or an ``error``. Repeated keys are counted in
+    ``collisions`` whatever the policy. Rows are only parsed into dicts, the
+    way csv.DictReader does, when they are looked up or iterated over.
+    """
+
+    def __init__(self, path, key_column, duplicates="last"):
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"unknown duplicate key policy: {duplicates}")
+        self.path = path
+        self.key_column = key_column
+        self.duplicates = duplicates
+        self.collisions = Counter()
+        self._offsets = {}
+        self._file = None
+        with open(path, "rb") as file:
+            records = self._records(file)
+            self.fieldnames = next(records, (0, []))[1]
+            if key_column not in self.fieldnames:
+                raise ValueError(f"{path} has no {key_column} column")
+            column = self.fieldnames.index(key_column)
+            for offset, row in records:
+                self._add(row[column], offset)
+        if duplicates == "error" and self.collisions:
+            raise DuplicateKeyError(path, key_column, self.collisions)
+
+    def describe_collisions(self):
+        rows = sum(self.collisions.values())
+        outcome = {"merge": "merged them"}.get(
+            self.duplicates, f"kept the {self.duplicates} row"
+        )
+        return (
+            f"{self.path}: {len(self.collisions)} {self.key_column} values "
+            f"repeated in {rows} more rows, {outcome}"
+        )
+
+    def _add(self, key, offset):
+        offsets = self._offsets
+        if key not in offsets:
+            offsets[key] = offset
+            return
+        self.collisions[key] += 1
+        if self.duplicates == "last":
+            offsets[key] = offset
+        elif self.duplicates == "merge":
+            if isinstance(offsets[key], int):
+                offsets[key] = [offsets[key]]
+            offsets[key].append(offset)
+
+    @staticmethod
+    def _records(file):
+        """Yield (byte offset, parsed row) for every non-empty row of ``file``."""
+        position = [file.tell()]
+
+        def lines():
+            for line in file:
+                start = position[0]
+                position[0] += len(line)
+                if start == 0 and line.startswith(b"\xef\xbb\xbf"):
+                    line = line[3:]
+                yield _decode(line)
+
+        reader = csv.reader(lines())
+        start = position[0]
+        for row in reader:
+            if row:
+                yield start, row
+            start = position[0]
+
+    def _row(self, file, offset):
+        if not isinstance(offset, int):
+            rows = [self._row(file, single) for single in offset]
+            merged = rows[0]
+            for row in rows[1:]:
+                for field, value in row.items():
+                    if merged.get(field) in (None, "") and value not in (None, ""):
+                        merged[field] = value
+            return merged
+        file.seek(offset)
+        _, row = next(self._records(file))
+        fieldnames = self.fieldnames
+        data = dict(zip(fieldnames, row))
+        if len(row) > len(fieldnames):
+            data[None] = row[len(fieldnames) :]
+        elif len(row) < len(fieldnames):
+            for field in fieldnames[len(row) :]:
+                data[field] = None
+        return data
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def keys(self):
+        return self._offsets.keys()
+
+    def __getitem__(self, key):
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        return self._row(self._file, self._offsets[key])
+
+    def items(self):
+        """Yield (key, row) pairs in key order, parsing one row at a time."""
+        with open(self.path, "rb") as file:
+            for key, offset in self._offsets.items():
+                yield key, self._row(file, offset)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_csv_to_dict(filename, key_column, duplicates="last"):
+    """Load CSV data into a dictionary with specified key column."""
+    return dict(CsvIndex(filename, key_column, duplicates).items())
+
+
+def write_training_csv(filename, training_data):
+    """Save prompt/response pairs to a training data CSV."""
+    with open(filename, "w", newline="") as csvfile:
+        fieldnames = ["Prompt", "Response"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(training_data)
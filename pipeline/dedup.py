@@ -0,0 +1,360 @@
+"""Exact and near-duplicate removal for merged training records.
+
+Records are read twice, streaming. The first pass keeps a few hundred bytes
+per record: a hash of its exact text, its length, its component (recognized
+from the prompt template) and a MinHash signature of its word shingles. The
+signatures are banded for locality-sensitive hashing. Records that share a
+band and whose signatures agree on at least ``threshold`` of their values
+(an estimate of the Jaccard similarity of their shingles) are clustered
+with union-find, together with exact duplicates. One record per cluster is
+kept according to the ``keep`` policy, and the second pass writes those
+records in their original order.
+
+Sorting the band hashes is the only step that is not linear, so millions of
+records take seconds to minutes. Clusters are connected components, so a
+chain of near-duplicates is collapsed even when its ends are further apart.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from functools import lru_cache
+from itertools import chain
+
+from .components import COMPONENTS
+from .formats import discard_outputs, iter_records, open_outputs, render
+from .metrics import Metrics
+
+KEEP_POLICIES = ("first", "last", "longest", "shortest")
+# Words are runs of ASCII letters, digits and underscores
+TOKEN = re.compile(rb"\w+")
+PLACEHOLDER = re.compile(r"\{[^}]*\}")
+SIGNATURE_CHUNK = 1000
+PERMUTATION_BLOCK = 16
+VERIFY_CHUNK = 100000
+
+
+@lru_cache(maxsize=None)
+def _prompt_patterns():
+    patterns = []
+    for name, component in COMPONENTS.items():
+        parts = PLACEHOLDER.split(component.prompt)
+        pattern = ".*?".join(re.escape(part) for part in parts)
+        patterns.append((name, re.compile(pattern, re.DOTALL)))
+    return patterns
+
+
+def component_of(prompt):
+    """The component whose prompt template ``prompt`` was rendered from."""
+    for name, pattern in _prompt_patterns():
+        if pattern.fullmatch(prompt):
+            return name
+    return None
+
+
+def exact_hash(prompt, response):
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(response.encode("utf-8"))
+    return int.from_bytes(digest.digest(), "little")
+
+
+def token_hashes(text):
+    """CRC32 hashes of the lower-cased words of ``text``."""
+    return list(map(zlib.crc32, TOKEN.findall(text.lower().encode("utf-8"))))
+
+
+def lsh_bands(num_perm, threshold):
+    """Bands and rows per band, dividing ``num_perm``, that make two records
+    of Jaccard similarity ``threshold`` about even odds of sharing a band."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """MinHash signatures of word ``shingle_size``-grams, over ``num_perm``
+    multiply-shift hash functions ``(a * x + b) mod 2**64 >> 32`` for random
+    odd ``a``. Needs NumPy.
+
+    Records shorter than ``shingle_size`` words make one shingle of them all.
+    """
+
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        import numpy as np
+
+        self.np = np
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        top = np.iinfo(np.uint64).max
+        self.a = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)
+        self.a |= np.uint64(1)
+        self.b = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)
+        self.positions = rng.integers(
+            0, top, shingle_size, dtype=np.uint64, endpoint=True
+        )
+        self.positions |= np.uint64(1)
+
+    def shingles(self, records):
+        """The shingle hashes of records given as ``token_hashes`` lists, all
+        in one array, and how many belong to each record."""
+        np = self.np
+        size = self.shingle_size
+        lengths = np.fromiter(map(len, records), dtype=np.intp, count=len(records))
+        counts = np.maximum(lengths - size + 1, np.minimum(lengths, 1))
+        # Every record is followed by size - 1 zeros, so no shingle spans two
+        # records and short records still make one
+        padding = (0,) * (size - 1)
+        tokens = np.fromiter(
+            chain.from_iterable(chain(hashes, padding) for hashes in records),
+            dtype=np.uint64,
+            count=int(lengths.sum()) + len(records) * (size - 1),
+        )
+        windows = len(tokens) - size + 1
+        combined = np.zeros(max(windows, 0), dtype=np.uint64)
+        for offset, factor in enumerate(self.positions):
+            combined += tokens[offset : offset + windows] * factor
+        starts = np.concatenate(([0], np.cumsum(lengths + size - 1)[:-1]))
+        firsts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        index = np.arange(counts.sum()) + np.repeat(starts - firsts, counts)
+        return combined[index], counts
+
+    def signatures(self, records):
+        """Signatures of records given as ``token_hashes`` lists, as a
+        (records, num_perm) uint32 array. Records without words get all-ones
+        signatures."""
+        np = self.np
+        values, counts = self.shingles(records)
+        signatures = np.full((len(records), self.num_perm), 0xFFFFFFFF, np.uint32)
+        present = counts > 0
+        if not present.any():
+            return signatures
+        starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+        for first in range(0, self.num_perm, PERMUTATION_BLOCK):
+            block = slice(first, first + PERMUTATION_BLOCK)
+            # uint64 arithmetic wraps around, which is the "mod 2**64"
+            product = values[:, None] * self.a[block] + self.b[block]
+            hashed = (product >> np.uint64(32)).astype(np.uint32)
+            signatures[present, block] = np.minimum.reduceat(hashed, starts, axis=0)
+        return signatures
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # The smaller index stays the root, so roots are cluster minima
+            if second < first:
+                first, second = second, first
+            self.parent[second] = first
+
+
+class DedupReport:
+    """Records read, kept and removed as exact or near duplicates, per component."""
+
+    def __init__(self):
+        self.components = {}
+
+    def add(self, component, field, amount):
+        counts = self.components.setdefault(
+            component or "unknown", {"records": 0, "exact": 0, "near": 0, "kept": 0}
+        )
+        counts[field] += amount
+
+    def __str__(self):
+        lines = []
+        for name, counts in self.components.items():
+            removed = counts["exact"] + counts["near"]
+            lines.append(
+                f"{name}: {counts['records']} records, {removed} removed "
+                f"({counts['exact']} exact, {counts['near']} near duplicates), "
+                f"{counts['kept']} kept"
+            )
+        return "\n".join(lines)
+
+
+def _scan(paths, near, hasher):
+    exact = []
+    lengths = []
+    components = []
+    signatures = []
+    pending = []
+    names = list(COMPONENTS)
+    for path in paths:
+        for prompt, response in iter_records(path):
+            exact.append(exact_hash(prompt, response))
+            lengths.append(len(prompt) + len(response))
+            name = component_of(prompt)
+            components.append(-1 if name is None else names.index(name))
+            if near:
+                pending.append(token_hashes(f"{prompt}\n{response}"))
+                if len(pending) >= SIGNATURE_CHUNK:
+                    signatures.append(hasher.signatures(pending))
+                    pending = []
+    if pending:
+        signatures.append(hasher.signatures(pending))
+    return exact, lengths, components, signatures
+
+
+def _near_pairs(np, signatures, bands, rows, threshold):
+    """Yield (record, record) pairs that share an LSH band and are similar."""
+    count = len(signatures)
+    # Records without shingles have all-ones signatures; never match them
+    usable = ~(signatures == 0xFFFFFFFF).all(axis=1)
+    rng = np.random.default_rng(0)
+    multipliers = rng.integers(1, 1 << 63, rows, dtype=np.uint64) | np.uint64(1)
+    for band in range(bands):
+        columns = signatures[:, band * rows : (band + 1) * rows].astype(np.uint64)
+        keys = (columns * multipliers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        group = np.repeat(starts, np.diff(np.r_[starts, count]))
+        members = order[group != np.arange(count)]
+        heads = order[group[group != np.arange(count)]]
+        keep = usable[members] & usable[heads]
+        members, heads = members[keep], heads[keep]
+        for first in range(0, len(members), VERIFY_CHUNK):
+            chunk_members = members[first : first + VERIFY_CHUNK]
+            chunk_heads = heads[first : first + VERIFY_CHUNK]
+            agreement = signatures[chunk_members] == signatures[chunk_heads]
+            similar = agreement.mean(axis=1) >= threshold
+            yield from zip(
+                chunk_members[similar].tolist(), chunk_heads[similar].tolist()
+            )
+
+
+def find_duplicates(
+    paths,
+    keep="first",
+    near=True,
+    threshold=0.8,
+    num_perm=64,
+    shingle_size=3,
+    seed=1,
+):
+    """Decide which records of ``paths`` to keep.
+
+    Returns a list of booleans, one per record in file order, and a
+    ``DedupReport``. ``keep`` chooses the record kept from each cluster: the
+    first or last in file order, or the longest or shortest (ties go to the
+    first). With ``near`` off only exact duplicates are removed.
+    """
+    if keep not in KEEP_POLICIES:
+        raise ValueError(f"unknown keep policy: {keep}")
+    hasher = None
+    if near:
+        hasher = MinHasher(num_perm, shingle_size, seed)
+    exact, lengths, components, signatures = _scan(paths, near, hasher)
+    count = len(exact)
+    clusters = _UnionFind(count)
+    first_seen = {}
+    for index, digest in enumerate(exact):
+        clusters.union(first_seen.setdefault(digest, index), index)
+    if near and count:
+        np = hasher.np
+        bands, rows = lsh_bands(num_perm, threshold)
+        signatures = np.concatenate(signatures)
+        for first, second in _near_pairs(np, signatures, bands, rows, threshold):
+            clusters.union(first, second)
+
+    roots = [clusters.find(index) for index in range(count)]
+    chosen = {}
+    for index, root in enumerate(roots):
+        best = chosen.get(root)
+        if best is None or _better(keep, index, best, lengths):
+            chosen[root] = index
+
+    names = list(COMPONENTS)
+    report = DedupReport()
+    kept = []
+    for index, root in enumerate(roots):
+        name = names[components[index]] if components[index] >= 0 else None
+        report.add(name, "records", 1)
+        winner = chosen[root]
+        kept.append(winner == index)
+        if winner == index:
+            report.add(name, "kept", 1)
+        elif exact[winner] == exact[index]:
+            report.add(name, "exact", 1)
+        else:
+            report.add(name, "near", 1)
+    return kept, report
+
+
+def _better(keep, index, best, lengths):
+    if keep == "last":
+        return True
+    if keep == "longest":
+        return lengths[index] > lengths[best]
+    if keep == "shortest":
+        return lengths[index] < lengths[best]
+    return False
+
+
+def dedup_records(
+    paths, output_file, formats=("csv",), metrics=None, options=None, **settings
+):
+    """Write the records of ``paths`` that ``find_duplicates`` keeps.
+
+    ``settings`` go to ``find_duplicates`` and ``options`` to
+    ``pipeline.formats.open_outputs``. Returns the paths written and the
+    report.
+    """
+    metrics = metrics or Metrics()
+    with metrics.stage("cluster"):
+        kept, report = find_duplicates(paths, **settings)
+    metrics.count("rows_in", len(kept))
+    outputs = open_outputs(output_file, formats, merged=True, **(options or {}))
+    kinds = [output.kind for output in outputs]
+    try:
+        with metrics.stage("write"):
+            records = (
+                {"Prompt": prompt, "Response": response}
+                for path in paths
+                for prompt, response in iter_records(path)
+            )
+            chunk = []
+            for record, keep in zip(records, kept):
+                if keep:
+                    chunk.append(record)
+                if len(chunk) >= SIGNATURE_CHUNK:
+                    _write(outputs, chunk, kinds)
+                    chunk = []
+            _write(outputs, chunk, kinds)
+    except BaseException:
+        discard_outputs(outputs)
+        raise
+    for output in outputs:
+        output.close()
+    paths = [path for output in outputs for path in output.paths]
+    metrics.count("rows_out", sum(kept))
+    metrics.count("bytes_written", sum(os.path.getsize(path) for path in paths))
+    return paths, report
+
+
+def _write(outputs, chunk, kinds):
+    rendered = render(chunk, kinds)
+    for output in outputs:
+        output.write(rendered[output.kind])
@@ -0,0 +1,516 @@
+import csv
+import json
+import os
+import time
+from collections import Counter, deque
+from threading import Lock
+
+from .batching import build_batch_prompt, parse_batch_response
+from .csv_io import read_csv, strip_bom
+from .csv_sink import CsvSink
+from .metrics import Metrics, count_tokens
+from .prefill import format_report, prefill
+from .structured import build_json_prompt, normalize_key, parse_json_response
+
+
+def add_enrich_arguments(parser):
+    """Add the options of the enrich command to an argument parser."""
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of LLM requests in flight at once (default: 4)",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="Rows buffered ahead of the writer before reading blocks "
+        "(default: twice the concurrency times the batch size)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Incomplete rows packed into one JSON-array LLM request (default: 1)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Request JSON output constrained to the missing fields instead of "
+        "free-text \"key: value\" lines",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=2,
+        help="With --json, re-ask for fields still missing up to this many "
+        "times per row (default: 2)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue a previous run from its checkpoint journal instead of "
+        "starting the output over",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=100,
+        help="Rows buffered before the output is fsynced and checkpointed "
+        "(default: 100)",
+    )
+    parser.add_argument(
+        "--flush-seconds",
+        type=float,
+        default=5.0,
+        help="Also checkpoint once this many seconds pass since the last one "
+        "(default: 5)",
+    )
+    parser.add_argument(
+        "--no-prefill",
+        action="store_true",
+        help="Send every gap to the LLM instead of filling derivable fields "
+        "with rules first",
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="SQLite file caching LLM responses across runs "
+        "(default: data/llm_cache.sqlite under the root)",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Evict least recently used responses beyond this size (default: 512)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM, without reading or writing the response cache",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report which gaps would go to the LLM and how many calls that "
+        "takes, without calling it or writing anything",
+    )
+
+
+class LazyChain:
+    """Stand-in for a chain that is only built when it is first invoked.
+
+    ``factory`` returns the real chain. Runs in which no row needs the LLM
+    never call it, so they skip its imports and connections.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.chain = None
+        self._lock = Lock()
+
+    def invoke(self, inputs, config=None):
+        if self.chain is None:
+            with self._lock:
+                if self.chain is None:
+                    self.chain = self.factory()
+        return self.chain.invoke(inputs, config)
+
+
+def missing_fields(row):
+    """Return the columns of the row that have no value."""
+    return [key for key, value in row.items() if not value]
+
+
+def parse_response(response):
+    """Parse a "key: value" LLM response into a dict of non-empty values.
+
+    Markdown emphasis and list bullets around keys and values are dropped.
+    """
+    values = {}
+    response_data = response.strip().split("\n")
+    for line in response_data:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip().lstrip("-").strip(" *`")
+            value = value.strip(" *`")
+            if value and key not in values:
+                values[key] = value
+    return values
+
+
+def fill_row(row, values):
+    """Fill the empty fields of the row, matching keys with ``normalize_key``."""
+    columns = {normalize_key(column): column for column in row}
+    for key, value in values.items():
+        column = columns.get(normalize_key(key))
+        if column is not None and not row[column]:
+            row[column] = value
+    return row
+
+
+def apply_response(row, response):
+    """Fill the empty fields of the row from a "key: value" LLM response."""
+    return fill_row(row, parse_response(response))
+
+
+class _Batch:
+    def __init__(self):
+        self.rows = []
+        self.future = None
+
+
+class EnrichmentEngine:
+    """Fill missing fields with concurrent LLM calls, yielding rows in input order.
+
+    Requests run on a thread pool of ``max_concurrency`` workers. At most
+    ``max_pending`` rows are held between reading and yielding, so a slow
+    consumer (or a slow LLM) stops the engine from reading further ahead.
+    Ollama only serves requests in parallel up to its ``OLLAMA_NUM_PARALLEL``
+    setting; extra concurrency beyond that just queues on the server.
+
+    With ``batch_size`` above one, up to that many incomplete rows with the
+    same set of missing fields share a single JSON-array request and the
+    answers are matched back by ``key_column``. Rows missing from the answer,
+    or every row of a batch whose answer does not parse, are retried with
+    their own single-row prompt.
+
+    With ``structured`` set, single-row requests ask for a JSON object holding
+    just the missing fields and are re-asked, up to ``max_retries`` times, for
+    whichever fields the answer still lacks.
+
+    Prompt formatting time, LLM latency and (estimated) tokens go to
+    ``metrics``.
+    """
+
+    def __init__(
+        self,
+        chain,
+        build_prompt,
+        max_concurrency=4,
+        max_pending=None,
+        batch_size=1,
+        key_column=None,
+        label="item",
+        structured=False,
+        max_retries=2,
+        metrics=None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if batch_size > 1 and key_column is None:
+            raise ValueError("batched prompts need a key_column")
+        self.chain = chain
+        self.build_prompt = build_prompt
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.key_column = key_column
+        self.label = label
+        self.structured = structured
+        self.max_retries = max_retries
+        self.metrics = metrics or Metrics()
+        self.max_pending = max(
+            max_pending or 2 * max_concurrency * batch_size,
+            max_concurrency,
+            batch_size,
+        )
+        self.llm_calls = 0
+        self.fallbacks = 0
+        self.retries = 0
+        self.parsed = 0
+        self.unparsed = 0
+        self.rows_completed = 0
+        self._lock = Lock()
+
+    def _invoke(self, prompt_text):
+        with self._lock:
+            self.llm_calls += 1
+        start = time.perf_counter()
+        response = self.chain.invoke({"Prompt": prompt_text, "text": ""})
+        self.metrics.observe("llm_latency", time.perf_counter() - start)
+        self.metrics.count("llm_calls")
+        self.metrics.count("prompt_tokens", count_tokens(prompt_text))
+        if isinstance(response, str):
+            self.metrics.count("completion_tokens", count_tokens(response))
+        return response
+
+    def _format(self, build, *args):
+        with self.metrics.timer("format_prompt"):
+            return build(*args)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _complete_one(self, row):
+        if not self.structured:
+            values = parse_response(self._invoke(self._format(self.build_prompt, row)))
+            self._count("parsed" if values else "unparsed")
+            return values
+        values = {}
+        wanted = missing_fields(row)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            prompt_text = self._format(
+                build_json_prompt, {**row, **values}, wanted, self.label
+            )
+            answer = parse_json_response(self._invoke(prompt_text), wanted)
+            self._count("unparsed" if answer is None else "parsed")
+            values.update(answer or {})
+            wanted = [field for field in wanted if field not in values]
+            if not wanted:
+                break
+        return values
+
+    def _complete(self, rows):
+        if len(rows) == 1:
+            return [self._complete_one(rows[0])]
+        prompt_text = self._format(
+            build_batch_prompt, rows, self.key_column, self.label
+        )
+        answers = parse_batch_response(self._invoke(prompt_text), self.key_column)
+        results = []
+        for row in rows:
+            values = answers.get(row[self.key_column])
+            if values is None:
+                with self._lock:
+                    self.fallbacks += 1
+                values = self._complete_one(row)
+            results.append(values)
+        return results
+
+    def _finish(self, executor, row, batch, index):
+        if batch is not None:
+            if batch.future is None:
+                batch.future = executor.submit(self._complete, batch.rows)
+            fill_row(row, batch.future.result()[index])
+            self.rows_completed += 1
+        return row
+
+    def stats(self):
+        responses = self.parsed + self.unparsed
+        return (
+            f"LLM calls: {self.llm_calls} for {self.rows_completed} rows "
+            f"({self.llm_calls / max(self.rows_completed, 1):.2f} per row), "
+            f"parse success {self.parsed / max(responses, 1):.1%}, "
+            f"{self.retries / max(self.rows_completed, 1):.2f} retries per row, "
+            f"{self.fallbacks} batch fallbacks"
+        )
+
+    def run(self, rows):
+        """Yield every row, enriched where it had missing fields, in input order."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        window = deque()
+        batches = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for row in rows:
+                missing = tuple(missing_fields(row))
+                if missing:
+                    batch = batches.get(missing)
+                    if batch is None or batch.future is not None:
+                        batch = batches[missing] = _Batch()
+                    window.append((row, batch, len(batch.rows)))
+                    batch.rows.append(row)
+                    if len(batch.rows) >= self.batch_size:
+                        batch.future = executor.submit(self._complete, batch.rows)
+                else:
+                    window.append((row, None, 0))
+                if len(window) >= self.max_pending:
+                    yield self._finish(executor, *window.popleft())
+            while window:
+                yield self._finish(executor, *window.popleft())
+
+
+class Checkpoint:
+    """Journal of the rows committed to an output CSV, keyed by primary key.
+
+    Every line of the journal is a JSON ``[keys, offset]`` pair written once
+    a batch of rows is synced to the output file, where ``offset`` is the
+    output size after the batch. The first entry has no keys and marks the
+    header. On resume the output is cut back to the last committed offset,
+    dropping rows that were written but not yet committed when the previous
+    run died.
+    """
+
+    def __init__(self, output_csv_path, journal_path=None):
+        self.output_csv_path = output_csv_path
+        self.journal_path = journal_path or output_csv_path + ".journal"
+        self._journal = None
+
+    def load(self, repair=True):
+        """Return a Counter of committed keys, or None if there is nothing to resume.
+
+        Unless ``repair`` is false, the output and journal are cut back to the
+        last committed entry.
+        """
+        if not (
+            os.path.exists(self.journal_path)
+            and os.path.exists(self.output_csv_path)
+        ):
+            return None
+        committed = Counter()
+        offset = None
+        journal_size = 0
+        with open(self.journal_path, "rb") as journal:
+            for line in journal:
+                try:
+                    keys, offset = json.loads(line)
+                except ValueError:
+                    break  # torn final entry from a crash mid-write
+                committed.update(keys)
+                journal_size += len(line)
+        if offset is None:
+            return None
+        if not repair:
+            return committed
+        with open(self.output_csv_path, "r+b") as csvfile:
+            csvfile.truncate(offset)
+        with open(self.journal_path, "r+b") as journal:
+            journal.truncate(journal_size)
+        self._journal = open(self.journal_path, "a")
+        return committed
+
+    def start(self, fieldnames):
+        """Truncate the output and journal and write the CSV header."""
+        with open(self.output_csv_path, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+        self._journal = open(self.journal_path, "w")
+        self.commit([], os.path.getsize(self.output_csv_path))
+
+    def commit(self, keys, offset):
+        """Record that the rows with these keys are durable up to ``offset``."""
+        self._journal.write(json.dumps([keys, offset]) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+def skip_committed(data, key_column, committed):
+    """Drop rows already in the output, counting duplicate keys individually."""
+    remaining = Counter(committed)
+    pending = []
+    for row in data:
+        if remaining[row[key_column]] > 0:
+            remaining[row[key_column]] -= 1
+        else:
+            pending.append(row)
+    return pending
+
+
+def plan_report(data, batch_size, label="item"):
+    """Describe the LLM work enriching ``data`` takes, grouped by missing fields."""
+    groups = Counter(tuple(missing_fields(row)) for row in data)
+    complete = groups.pop((), 0)
+    # Rows are batched per missing-field set, so each set needs its own calls
+    calls = sum(-(-count // batch_size) for count in groups.values())
+    lines = [
+        f"{len(data)} {label} rows: {complete} complete, "
+        f"{len(data) - complete} to enrich in about {calls} LLM calls"
+    ]
+    for fields, count in groups.most_common():
+        lines.append(f"{count:>8} missing {', '.join(fields)}")
+    return "\n".join(lines)
+
+
+def enrich_csv(
+    input_csv_path,
+    output_csv_path,
+    key_column,
+    chain,
+    build_prompt,
+    max_concurrency=4,
+    max_pending=None,
+    resume=False,
+    batch_size=1,
+    label="item",
+    structured=False,
+    max_retries=2,
+    rules=None,
+    flush_every=100,
+    flush_seconds=5.0,
+    progress=None,
+    dry_run=False,
+    metrics=None,
+):
+    """Enrich every row of the input CSV and write it to the output CSV.
+
+    Gaps the ``rules`` can derive are filled before any LLM call. With
+    ``resume`` set, rows whose key is already committed in the output's
+    checkpoint journal are skipped and the run continues appending after them.
+    Output is synced and checkpointed every ``flush_every`` rows or
+    ``flush_seconds``, whichever comes first. A ``dry_run`` only prints the
+    work that is left for the LLM, touching neither the chain nor the output.
+    The "read" and "enrich" stages, and the rows, calls and bytes they handle,
+    are recorded in ``metrics``.
+    """
+    metrics = metrics or Metrics()
+    with metrics.stage("read"):
+        data, fieldnames = read_csv(input_csv_path)
+        strip_bom(data)
+        if rules:
+            print(format_report(prefill(data, rules)))
+    metrics.count("rows_in", len(data))
+
+    checkpoint = Checkpoint(output_csv_path)
+    committed = checkpoint.load(repair=not dry_run) if resume else None
+    if dry_run:
+        if committed is not None:
+            data = skip_committed(data, key_column, committed)
+        print(plan_report(data, batch_size, label))
+        return
+    if committed is None:
+        checkpoint.start(fieldnames)
+    else:
+        data = skip_committed(data, key_column, committed)
+
+    engine = EnrichmentEngine(
+        chain,
+        build_prompt,
+        max_concurrency,
+        max_pending,
+        batch_size=batch_size,
+        key_column=key_column,
+        label=label,
+        structured=structured,
+        max_retries=max_retries,
+        metrics=metrics,
+    )
+    rows = engine.run(data)
+    if progress is not None:
+        rows = progress(rows, total=len(data), desc="Processing rows")
+    sink = CsvSink(
+        output_csv_path,
+        fieldnames,
+        flush_every=flush_every,
+        flush_seconds=flush_seconds,
+        on_sync=checkpoint.commit,
+    )
+    size = os.path.getsize(output_csv_path)
+    try:
+        with metrics.stage("enrich"), sink:
+            for row in rows:
+                with metrics.timer("write"):
+                    sink.write(row, key=row[key_column])
+    finally:
+        checkpoint.close()
+    metrics.count("rows_out", sink.rows_written)
+    metrics.count("bytes_written", os.path.getsize(output_csv_path) - size)
+
+    print(engine.stats())
+    if isinstance(chain, LazyChain):
+        chain = chain.chain
+    cache = getattr(chain, "cache", None)
+    if cache is not None:
+        metrics.count("cache_hits", cache.hits)
+        metrics.count("cache_misses", cache.misses)
+        print(cache.stats())
@@ -0,0 +1,294 @@
+import csv
+import glob
+import io
+import json
+import os
+from contextlib import contextmanager
+
+FIELDNAMES = ["Prompt", "Response"]
+FORMATS = ("csv", "parquet", "jsonl")
+# Component files keep csv.DictWriter's default "\r\n" records; the merged
+# file matches what merger.py's pandas to_csv wrote
+COMPONENT_LINETERMINATOR = "\r\n"
+MERGED_LINETERMINATOR = "\n"
+
+
+def render_csv(pairs, lineterminator):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=FIELDNAMES, lineterminator=lineterminator
+    )
+    writer.writerows(pairs)
+    return buffer.getvalue()
+
+
+def render_jsonl(pairs):
+    return [
+        (json.dumps(pair, ensure_ascii=False) + "\n").encode("utf-8")
+        for pair in pairs
+    ]
+
+
+def render_columns(pairs):
+    return tuple([pair[name] for pair in pairs] for name in FIELDNAMES)
+
+
+# What each kind of output expects to be handed for a chunk of records.
+# Rendering is kept separate from writing so worker processes can do it.
+RENDERERS = {
+    "csv": lambda pairs: render_csv(pairs, COMPONENT_LINETERMINATOR),
+    "merged_csv": lambda pairs: render_csv(pairs, MERGED_LINETERMINATOR),
+    "jsonl": render_jsonl,
+    "parquet": render_columns,
+}
+
+
+def render(pairs, kinds):
+    """Render prompt/response pairs once for every kind of output in ``kinds``."""
+    return {kind: RENDERERS[kind](pairs) for kind in kinds}
+
+
+class CsvOutput:
+    """Training records as a Prompt,Response CSV.
+
+    Like every output, it is written to a temporary file that only replaces
+    ``path`` on ``close``, so a failed run leaves the old file as it was.
+    """
+
+    def __init__(self, path, merged=False):
+        self.kind = "merged_csv" if merged else "csv"
+        if merged:
+            lineterminator = MERGED_LINETERMINATOR
+        else:
+            lineterminator = COMPONENT_LINETERMINATOR
+        self.paths = [path]
+        self._file = open(path + ".tmp", "w", newline="", encoding="utf-8")
+        self._file.write(",".join(FIELDNAMES) + lineterminator)
+
+    def write(self, text):
+        self._file.write(text)
+
+    def close(self):
+        self._file.close()
+        _replace(self.paths)
+
+    def discard(self):
+        self._file.close()
+        _remove_temporary(self.paths)
+
+
+class JsonlOutput:
+    """Training records as JSON lines, split into shards of at most ``shard_bytes``.
+
+    Shards are named ``<stem>-00000.jsonl``, ``<stem>-00001.jsonl`` and so on.
+    A record is never split, so a shard only grows past the bound when one
+    record is larger than it. Shards left over from an earlier, larger run are
+    removed on ``close``.
+    """
+
+    kind = "jsonl"
+
+    def __init__(self, stem, shard_bytes=256 << 20):
+        self.shard_bytes = shard_bytes
+        self.paths = []
+        self._stem = stem
+        self._file = None
+        self._size = 0
+        self._roll()
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+        path = f"{self._stem}-{len(self.paths):05d}.jsonl"
+        self._file = open(path + ".tmp", "wb")
+        self._size = 0
+        self.paths.append(path)
+
+    def write(self, lines):
+        for line in lines:
+            if self._size and self._size + len(line) > self.shard_bytes:
+                self._roll()
+            self._file.write(line)
+            self._size += len(line)
+
+    def close(self):
+        self._file.close()
+        for path in jsonl_shards(self._stem):
+            if path not in self.paths:
+                os.remove(path)
+        _replace(self.paths)
+
+    def discard(self):
+        self._file.close()
+        _remove_temporary(self.paths)
+
+
+class ParquetOutput:
+    """Training records as a Parquet file with fixed-size row groups.
+
+    Needs pyarrow, which is only imported when Parquet output is asked for.
+    """
+
+    kind = "parquet"
+
+    def __init__(self, path, compression="zstd", row_group_size=10000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.row_group_size = row_group_size
+        self.paths = [path]
+        self._pa = pa
+        self._schema = pa.schema([(name, pa.string()) for name in FIELDNAMES])
+        self._writer = pq.ParquetWriter(
+            path + ".tmp", self._schema, compression=compression
+        )
+        self._columns = tuple([] for _ in FIELDNAMES)
+
+    def write(self, columns):
+        for buffer, values in zip(self._columns, columns):
+            buffer.extend(values)
+        while len(self._columns[0]) >= self.row_group_size:
+            self._flush(self.row_group_size)
+
+    def _flush(self, count):
+        columns = zip(FIELDNAMES, self._columns)
+        table = self._pa.table(
+            {name: values[:count] for name, values in columns}, schema=self._schema
+        )
+        self._writer.write_table(table, row_group_size=count)
+        for values in self._columns:
+            del values[:count]
+
+    def close(self):
+        if self._columns[0]:
+            self._flush(len(self._columns[0]))
+        self._writer.close()
+        _replace(self.paths)
+
+    def discard(self):
+        self._writer.close()
+        _remove_temporary(self.paths)
+
+
+def _replace(paths):
+    for path in paths:
+        os.replace(path + ".tmp", path)
+
+
+def _remove_temporary(paths):
+    for path in paths:
+        try:
+            os.remove(path + ".tmp")
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def replacing(path, mode="w", **kwargs):
+    """Open ``path + ".tmp"`` for writing, and replace ``path`` with it when
+    the block finishes, or remove it if the block fails."""
+    with open(path + ".tmp", mode, **kwargs) as file:
+        try:
+            yield file
+        except BaseException:
+            file.close()
+            _remove_temporary([path])
+            raise
+    _replace([path])
+
+
+def open_outputs(
+    csv_path,
+    formats,
+    merged=False,
+    compression="zstd",
+    row_group_size=10000,
+    shard_bytes=256 << 20,
+):
+    """Open one output per format, named after ``csv_path``."""
+    stem = os.path.splitext(csv_path)[0]
+    outputs = []
+    try:
+        for name in formats:
+            if name == "csv":
+                outputs.append(CsvOutput(csv_path, merged=merged))
+            elif name == "parquet":
+                outputs.append(
+                    ParquetOutput(stem + ".parquet", compression, row_group_size)
+                )
+            elif name == "jsonl":
+                outputs.append(JsonlOutput(stem, shard_bytes))
+            else:
+                raise ValueError(f"unknown output format: {name}")
+    except BaseException:
+        discard_outputs(outputs)
+        raise
+    return outputs
+
+
+def discard_outputs(outputs):
+    """Close ``outputs`` without replacing the files they were opened for."""
+    for output in outputs:
+        output.discard()
+
+
+def jsonl_shards(stem):
+    pattern = f"{glob.escape(stem)}-{'[0-9]' * 5}.jsonl"
+    return sorted(glob.glob(pattern))
+
+
+def iter_records(path):
+    """Yield (prompt, response) tuples from a CSV, Parquet or JSONL file."""
+    extension = os.path.splitext(path)[1]
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(columns=FIELDNAMES):
+            yield from zip(*(column.to_pylist() for column in batch.columns))
+    elif extension == ".jsonl":
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                yield record["Prompt"], record["Response"]
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                yield row[0], row[1]
+
+
+def add_output_arguments(parser):
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        nargs="+",
+        choices=FORMATS,
+        default=["csv"],
+        help="Output formats to write (default: csv)",
+    )
+    parser.add_argument(
+        "--compression",
+        default="zstd",
+        help="Parquet compression codec (default: zstd)",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=10000,
+        help="Records per Parquet row group (default: 10000)",
+    )
+    parser.add_argument(
+        "--shard-mb",
+        type=float,
+        default=256,
+        help="Maximum size of a JSONL shard in MB (default: 256)",
+    )
+
+
+def output_options(args):
+    return {
+        "compression": args.compression,
+        "row_group_size": args.row_group_size,
+        "shard_bytes": int(args.shard_mb * (1 << 20)),
+    }
@@ -0,0 +1,385 @@
+import csv
+import hashlib
+import json
+import os
+import re
+
+from .components import COMPONENTS
+from .csv_io import CsvIndex
+from .formats import FIELDNAMES
+from .merge import merge_records
+from .training import generate_prompt_and_response
+
+MANIFEST_VERSION = 2
+COMPONENT_HEADER = ",".join(FIELDNAMES).encode() + b"\r\n"
+MERGED_HEADER = ",".join(FIELDNAMES).encode() + b"\n"
+# Records are only reused while this code, and every pipeline module it
+# imports, is unchanged; see _generator()
+GENERATOR_MODULES = ("components", "csv_io", "formats", "merge", "training")
+RELATIVE_IMPORT = re.compile(r"^\s*from \.(\w+) import", re.MULTILINE)
+COPY_BYTES = 1 << 20
+
+
+class _Records:
+    """File-like object that keeps every row a csv writer writes separately."""
+
+    def __init__(self):
+        self.rows = []
+
+    def write(self, text):
+        self.rows.append(text.encode("utf-8"))
+
+
+def render_records(pairs):
+    """Encode prompt/response pairs as component CSV records, one per pair."""
+    records = _Records()
+    writer = csv.DictWriter(records, fieldnames=FIELDNAMES)
+    for pair in pairs:
+        writer.writerow(pair)
+    return records.rows
+
+
+def row_hash(row):
+    return hashlib.sha1(json.dumps(list(row.items())).encode("utf-8")).hexdigest()
+
+
+def record_hash(record):
+    return hashlib.sha1(record).hexdigest()
+
+
+def generator_modules():
+    """Names of ``GENERATOR_MODULES`` and the pipeline modules they import,
+    also inside functions (like the optional NumPy tiers)."""
+    package = os.path.dirname(os.path.abspath(__file__))
+    found = set()
+    pending = list(GENERATOR_MODULES)
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        with open(os.path.join(package, name + ".py"), encoding="utf-8") as source:
+            pending.extend(RELATIVE_IMPORT.findall(source.read()))
+    return sorted(found)
+
+
+def _generator():
+    package = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for name in generator_modules():
+        digest.update(name.encode() + b"\0")
+        with open(os.path.join(package, name + ".py"), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_manifest(path, duplicates="last"):
+    """Load a manifest, or an empty one if it is missing or out of date."""
+    empty = {
+        "version": MANIFEST_VERSION,
+        "generator": _generator(),
+        "duplicates": duplicates,
+        "merged": None,
+        "components": {},
+    }
+    try:
+        with open(path) as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return empty
+    for field in ("version", "generator", "duplicates"):
+        if manifest.get(field) != empty[field]:
+            return empty
+    return manifest
+
+
+def _offsets(header_length, lengths):
+    offsets = []
+    offset = header_length
+    for length in lengths:
+        offsets.append(offset)
+        offset += length
+    return offsets
+
+
+def _write_pieces(path, header, pieces):
+    """Write ``header`` then each piece to ``path`` through a temporary file.
+
+    A piece is either bytes or a (source path, offset, length) range, and
+    ranges that continue each other are copied in one go.
+    """
+    temporary = path + ".tmp"
+    sources = {}
+    try:
+        with open(temporary, "wb") as output:
+            output.write(header)
+            pending = None
+            for piece in pieces:
+                if isinstance(piece, bytes):
+                    _copy(pending, sources, output)
+                    pending = None
+                    output.write(piece)
+                elif (
+                    pending is not None
+                    and pending[0] == piece[0]
+                    and pending[1] + pending[2] == piece[1]
+                ):
+                    pending = (pending[0], pending[1], pending[2] + piece[2])
+                else:
+                    _copy(pending, sources, output)
+                    pending = piece
+            _copy(pending, sources, output)
+    finally:
+        for source in sources.values():
+            source.close()
+    os.replace(temporary, path)
+
+
+def _copy(piece, sources, output):
+    if piece is None:
+        return
+    path, offset, length = piece
+    if path not in sources:
+        sources[path] = open(path, "rb")
+    source = sources[path]
+    source.seek(offset)
+    while length:
+        chunk = source.read(min(length, COPY_BYTES))
+        if not chunk:
+            raise ValueError(f"{path} is shorter than the manifest says")
+        output.write(chunk)
+        length -= len(chunk)
+
+
+class _Update:
+    """What changed in one component since the manifest was written."""
+
+    def __init__(self, name, old):
+        self.name = name
+        # Summaries (source and output stats, record count and bytes) and
+        # per-record details, as in the manifest, from before and after
+        self.old = old
+        self.old_detail = None
+        self.entry = old
+        self.detail = None
+        # Per record: the index of an identical record in the old output, or
+        # the new record's bytes. None when the catalog was not even read.
+        self.pieces = None
+        self.added = self.changed = self.deleted = 0
+        self.rewritten = False
+
+    def report(self):
+        if self.pieces is None:
+            reused = self.entry["count"]
+        else:
+            reused = sum(1 for piece in self.pieces if not isinstance(piece, bytes))
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "deleted": self.deleted,
+            "reused": reused,
+            "rewritten": self.rewritten,
+        }
+
+
+def _detail_path(manifest_path, name):
+    return f"{os.path.splitext(manifest_path)[0]}.{name}.json"
+
+
+def _load_detail(manifest_path, name):
+    try:
+        with open(_detail_path(manifest_path, name)) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _update_component(name, root, old, manifest_path, duplicates):
+    component = COMPONENTS[name]
+    source_path = component.complete_path(root)
+    output_path = component.training_path(root)
+    if old is not None and _stat(output_path) != old["output"]:
+        old = None
+    source = _stat(source_path)
+    update = _Update(name, old)
+    if old is not None and source == old["source"]:
+        return update
+
+    old_detail = _load_detail(manifest_path, name) if old is not None else None
+    if old_detail is None or len(old_detail["keys"]) != old["count"]:
+        update.old = old = old_detail = None
+    update.old_detail = old_detail
+    old_index = {}
+    if old_detail is not None:
+        old_index = {key: index for index, key in enumerate(old_detail["keys"])}
+
+    source_index = CsvIndex(source_path, component.key_column, duplicates)
+    if source_index.collisions:
+        print(source_index.describe_collisions())
+    keys = []
+    hashes = []
+    pieces = []
+    stale = {}
+    for key, row in source_index.items():
+        digest = row_hash(row)
+        keys.append(key)
+        hashes.append(digest)
+        index = old_index.get(key)
+        if index is not None and old_detail["rows"][index] == digest:
+            pieces.append(index)
+        else:
+            pieces.append(None)
+            stale[key] = row
+    records = iter(render_records(generate_prompt_and_response(component, stale)))
+
+    record_hashes = []
+    lengths = []
+    for position, key in enumerate(keys):
+        index = pieces[position]
+        if index is not None:
+            record_hashes.append(old_detail["records"][index])
+            lengths.append(old_detail["lengths"][index])
+            continue
+        record = next(records)
+        digest = record_hash(record)
+        index = old_index.get(key)
+        if index is None:
+            update.added += 1
+            pieces[position] = record
+        elif old_detail["records"][index] == digest:
+            # The row changed but not in a way the training record shows
+            pieces[position] = index
+        else:
+            update.changed += 1
+            pieces[position] = record
+        record_hashes.append(digest)
+        lengths.append(len(record))
+    if old_detail is not None:
+        update.deleted = len(set(old_detail["keys"]) - set(keys))
+
+    update.pieces = pieces
+    update.entry = {
+        "source": source,
+        "output": None,
+        "count": len(keys),
+        "bytes": sum(lengths),
+    }
+    update.detail = {
+        "keys": keys,
+        "rows": hashes,
+        "records": record_hashes,
+        "lengths": lengths,
+    }
+    return update
+
+
+def _component_pieces(update, path):
+    lengths = update.old_detail["lengths"] if update.old_detail else []
+    offsets = _offsets(len(COMPONENT_HEADER), lengths)
+    for piece in update.pieces:
+        if isinstance(piece, bytes):
+            yield piece
+        else:
+            yield (path, offsets[piece], lengths[piece])
+
+
+def _merged_pieces(updates, merged_path):
+    """Yield the records of the merged file, patching the existing one.
+
+    A merged record is the component record with "\\n" in place of its
+    "\\r\\n" terminator, so its length is one byte less.
+    """
+    base = len(MERGED_HEADER)
+    for update in updates:
+        old = update.old
+        if update.pieces is None:
+            yield (merged_path, base, old["bytes"] - old["count"])
+        else:
+            lengths = [length - 1 for length in update.old_detail["lengths"]]
+            offsets = _offsets(base, lengths)
+            for piece in update.pieces:
+                if isinstance(piece, bytes):
+                    yield piece[:-2] + b"\n"
+                else:
+                    yield (merged_path, offsets[piece], lengths[piece])
+        base += old["bytes"] - old["count"]
+
+
+def _dump(data, path):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def incremental_build(
+    root, names=None, merged_path=None, manifest_path=None, duplicates="last"
+):
+    """Bring the training data CSVs up to date with the complete catalogs.
+
+    A manifest (by default ``training_data/manifest.json``, with one
+    ``manifest.<component>.json`` per component) records a hash of every
+    source row and generated record, and the length of the record in the
+    output. Only rows that were added or changed since the manifest was
+    written are regenerated. Everything else is copied from the existing
+    outputs as byte ranges, and an output is not touched at all when none of
+    its records changed. Components whose catalog file is unchanged are not
+    even read. Outputs modified outside the manifest, or built by a different
+    version of the generator code or ``duplicates`` policy, are rebuilt from
+    scratch. The result is byte-identical to a full build. Returns a report
+    per component.
+    """
+    names = names or list(COMPONENTS)
+    if merged_path is not None and list(names) != list(COMPONENTS):
+        raise ValueError("the merged data needs every component, in order")
+    if manifest_path is None:
+        manifest_path = os.path.join(root, "training_data", "manifest.json")
+    manifest = load_manifest(manifest_path, duplicates)
+    entries = manifest["components"]
+
+    updates = [
+        _update_component(name, root, entries.get(name), manifest_path, duplicates)
+        for name in names
+    ]
+    for update in updates:
+        if update.pieces is None:
+            continue
+        path = COMPONENTS[update.name].training_path(root)
+        unchanged = update.old is not None and update.pieces == list(
+            range(update.old["count"])
+        )
+        if not unchanged:
+            _write_pieces(path, COMPONENT_HEADER, _component_pieces(update, path))
+            update.rewritten = True
+        update.entry["output"] = _stat(path)
+        _dump(update.detail, _detail_path(manifest_path, update.name))
+        entries[update.name] = update.entry
+
+    if merged_path is not None:
+        merged = manifest["merged"]
+        reuse = (
+            merged is not None
+            and merged["path"] == merged_path
+            and merged["output"] == _stat(merged_path)
+            and all(update.old is not None for update in updates)
+        )
+        if not reuse:
+            paths = [COMPONENTS[name].training_path(root) for name in names]
+            merge_records(paths, merged_path)
+        elif any(update.rewritten for update in updates):
+            pieces = _merged_pieces(updates, merged_path)
+            _write_pieces(merged_path, MERGED_HEADER, pieces)
+        manifest["merged"] = {"path": merged_path, "output": _stat(merged_path)}
+    elif any(update.rewritten for update in updates):
+        manifest["merged"] = None
+
+    _dump(manifest, manifest_path)
+    return {update.name: update.report() for update in updates}
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+
+class LLMCache:
+    """Disk-backed LLM response cache stored in SQLite.
+
+    Entries are addressed by a SHA-256 of the model name, the prompt template
+    and the rendered prompt inputs. Once the stored keys and responses exceed
+    ``max_bytes``, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        size, tick = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM responses"
+        ).fetchone()
+        self.size = size
+        self._tick = tick
+
+    @staticmethod
+    def make_key(model, template, inputs):
+        payload = json.dumps([model, template, inputs], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._tick += 1
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (self._tick, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, response):
+        size = len(key) + len(response.encode("utf-8"))
+        with self._lock:
+            self._tick += 1
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None:
+                self.size -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response, size, self._tick),
+            )
+            self.size += size
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if self.size <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                self.evictions += 1
+
+    def stats(self):
+        return (
+            f"LLM cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, {self.size} bytes"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedChain:
+    """Answer from the cache when possible, otherwise call the wrapped chain."""
+
+    def __init__(self, chain, cache, model, template):
+        self.chain = chain
+        self.cache = cache
+        self.model = model
+        self.template = template
+
+    def invoke(self, inputs, config=None):
+        key = self.cache.make_key(self.model, self.template, inputs)
+        response = self.cache.get(key)
+        if response is None:
+            response = self.chain.invoke(inputs)
+            self.cache.put(key, response)
+        return response
+
+
+def cached(chain, args, model, template):
+    """Wrap the chain in a CachedChain unless caching is turned off."""
+    if args.no_cache:
+        return chain
+    cache = LLMCache(args.cache, max_bytes=args.cache_size_mb * 1024 * 1024)
+    return CachedChain(chain, cache, model, template)
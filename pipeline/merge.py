@@ -0,0 +1,145 @@
+import csv
+import os
+import shutil
+
+from .formats import discard_outputs, iter_records, open_outputs, render
+from .metrics import Metrics
+
+BOM = b"\xef\xbb\xbf"
+CHUNK_BYTES = 1 << 20
+
+
+def read_header(file):
+    """Read and parse the header line of a CSV file opened in binary mode."""
+    line = file.readline()
+    if not line:
+        raise ValueError(f"{file.name} is empty")
+    if line.startswith(BOM):
+        line = line[len(BOM) :]
+    fields = next(csv.reader([line.decode("utf-8")]))
+    return line, fields
+
+
+def check_headers(file_list):
+    """Return the shared header of the CSV files, or raise ValueError."""
+    expected = None
+    for file_path in file_list:
+        with open(file_path, "rb") as file:
+            _, fields = read_header(file)
+        if expected is None:
+            expected = fields
+        elif fields != expected:
+            raise ValueError(
+                f"{file_path} has header {fields}, expected {expected} "
+                f"from {file_list[0]}"
+            )
+    return expected
+
+
+def merge_bytes(file_list, output_file):
+    """Concatenate the files' bytes after their headers.
+
+    Records are copied exactly as they are on disk, so the output keeps the
+    inputs' line endings and quoting.
+    """
+    with open(output_file, "wb") as output:
+        for index, file_path in enumerate(file_list):
+            with open(file_path, "rb") as file:
+                header, _ = read_header(file)
+                if index == 0:
+                    output.write(header)
+                start = file.tell()
+                shutil.copyfileobj(file, output, CHUNK_BYTES)
+                if file.tell() > start and not _ends_with_newline(file):
+                    output.write(b"\r\n" if header.endswith(b"\r\n") else b"\n")
+
+
+def _ends_with_newline(file):
+    file.seek(-1, 2)
+    return file.read(1) == b"\n"
+
+
+def merge_records(file_list, output_file):
+    """Re-write the files' records through the csv module, one row at a time.
+
+    The output uses "\\n" line endings and minimal quoting, which is what the
+    pandas-based merger wrote.
+    """
+    with open(output_file, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output, lineterminator="\n")
+        for index, file_path in enumerate(file_list):
+            with open(file_path, newline="", encoding="utf-8-sig") as file:
+                reader = csv.reader(file)
+                header = next(reader)
+                if index == 0:
+                    writer.writerow(header)
+                writer.writerows(reader)
+
+
+MODES = {"records": merge_records, "bytes": merge_bytes}
+
+
+def _count_bytes(metrics, file_list, paths):
+    metrics.count("bytes_in", sum(os.path.getsize(path) for path in file_list))
+    metrics.count("bytes_written", sum(os.path.getsize(path) for path in paths))
+
+
+def merge_csv_files(file_list, output_file, mode="records", metrics=None):
+    """Merge CSV files that share a header into one CSV file, streaming.
+
+    Every header is checked against the first file's before anything is
+    written, and the output only replaces ``output_file`` once it is complete.
+    Memory use does not depend on the size of the inputs.
+    """
+    metrics = metrics or Metrics()
+    check_headers(file_list)
+    temporary = output_file + ".tmp"
+    with metrics.stage("merge"):
+        try:
+            MODES[mode](file_list, temporary)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        os.replace(temporary, output_file)
+    _count_bytes(metrics, file_list, [output_file])
+    return output_file
+
+
+def export_records(
+    file_list, output_file, formats, chunk_rows=10000, metrics=None, **options
+):
+    """Stream the records of CSV files into merged Parquet and/or JSONL outputs.
+
+    Takes the same ``options`` as ``pipeline.formats.open_outputs`` and returns
+    the paths written.
+    """
+    metrics = metrics or Metrics()
+    check_headers(file_list)
+    outputs = open_outputs(output_file, formats, merged=True, **options)
+    kinds = [output.kind for output in outputs]
+    try:
+        with metrics.stage("export"):
+            chunk = []
+            for file_path in file_list:
+                for prompt, response in iter_records(file_path):
+                    chunk.append({"Prompt": prompt, "Response": response})
+                    if len(chunk) >= chunk_rows:
+                        _write(outputs, chunk, kinds, metrics)
+                        chunk = []
+            _write(outputs, chunk, kinds, metrics)
+    except BaseException:
+        discard_outputs(outputs)
+        raise
+    for output in outputs:
+        output.close()
+    paths = [path for output in outputs for path in output.paths]
+    _count_bytes(metrics, file_list, paths)
+    return paths
+
+
+def _write(outputs, chunk, kinds, metrics):
+    rendered = render(chunk, kinds)
+    for output in outputs:
+        output.write(rendered[output.kind])
+    metrics.count("rows_out", len(chunk))
@@ -0,0 +1,175 @@
+"""Timers, counters and latency samples for one pipeline run.
+
+The build, merge and enrich commands fill a ``Metrics`` with where the time
+went (reading, prompt formatting, LLM calls, rendering, writing) and how much
+work was done (rows in and out, LLM calls, tokens, cache hits, bytes
+written). ``--metrics`` prints it and can save it as JSON, and ``--profile``
+dumps a cProfile of every stage for ``python -m pstats``.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+PERCENTILES = (50, 90, 99)
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]+")
+
+
+def count_tokens(text):
+    """Rough BPE-like token count: words and runs of punctuation."""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(-(-len(ordered) * percent // 100), 1)
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """Collects named timers, counters and samples; safe to update from threads.
+
+    ``stage`` times a block and, with a ``profile_dir``, profiles it into
+    ``<profile_dir>/<stage>.prof``. Only the outermost stage is profiled, and
+    only on the thread that runs it. ``add_time`` adds to a timer from
+    anywhere, so timers updated by several threads can add up to more than
+    the wall-clock time.
+    """
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.started = time.time()
+        self.timers = {}
+        self.counters = {}
+        self.samples = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._depth = 0
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def observe(self, name, seconds):
+        """Record one duration, such as the latency of an LLM call."""
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    @contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile_dir is not None and self._depth == 0:
+            import cProfile
+
+            profiler = self._profiles.setdefault(name, cProfile.Profile())
+        self._depth += 1
+        try:
+            with self.timer(name):
+                if profiler is None:
+                    yield
+                else:
+                    profiler.enable()
+                    try:
+                        yield
+                    finally:
+                        profiler.disable()
+        finally:
+            self._depth -= 1
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+
+    def distribution(self, name):
+        ordered = sorted(self.samples.get(name, ()))
+        if not ordered:
+            return None
+        summary = {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered),
+            "max": ordered[-1],
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = percentile(ordered, percent)
+        return summary
+
+    def summary(self):
+        """Everything collected so far, as a JSON-serializable dict."""
+        seconds = time.perf_counter() - self._start
+        rows_out = self.counters.get("rows_out", 0)
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "seconds": seconds,
+            "rows_per_second": rows_out / seconds if seconds else None,
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+            "samples": {name: self.distribution(name) for name in self.samples},
+        }
+
+    def report(self):
+        summary = self.summary()
+        lines = [
+            f"Run: {summary['seconds']:.2f}s, "
+            f"{summary['rows_per_second'] or 0:,.0f} rows out per second"
+        ]
+        for name, seconds in summary["timers"].items():
+            lines.append(f"{seconds:>12.3f}s  {name}")
+        for name, value in summary["counters"].items():
+            lines.append(f"{value:>13,}  {name}")
+        for name, stats in summary["samples"].items():
+            percentiles = ", ".join(
+                f"p{percent} {stats[f'p{percent}'] * 1000:.1f}ms"
+                for percent in PERCENTILES
+            )
+            lines.append(
+                f"{stats['count']:>13,}  {name}: mean "
+                f"{stats['mean'] * 1000:.1f}ms, {percentiles}, "
+                f"max {stats['max'] * 1000:.1f}ms"
+            )
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="Print timings and counters when done, and save them as JSON to "
+        "PATH if one is given",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Save a cProfile dump of every stage to DIR/<stage>.prof",
+    )
+
+
+def finish(metrics, args):
+    """Print and save ``metrics`` as the ``--metrics`` option asks."""
+    if args.metrics is None:
+        return
+    print(metrics.report())
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
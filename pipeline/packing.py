@@ -0,0 +1,329 @@
+"""Token counts of training records, and packing them to cut padding.
+
+Records are tokenized once with a local tokenizer and their prompt and
+response token counts are saved in a side index next to the input
+(``merged_data.tokens.json``). The index is reused until an input file or
+the tokenizer changes. Nothing is downloaded: the built-in tokenizers are
+``words`` (runs of word characters and single punctuation marks, close to
+what BPE tokenizers produce for this catalog text) and ``bytes`` (UTF-8
+bytes). Any HuggingFace ``tokenizer.json`` on disk can be used with the
+``tokenizers`` package.
+
+A record takes its prompt and response tokens plus ``separator`` tokens
+(e.g. EOS). ``pack_sequences`` fits records into sequences of at most
+``max_length`` tokens, best fit decreasing. ``bucket_records`` instead
+pads each record up to the smallest length bucket it fits.
+"""
+
+import json
+import os
+import re
+from bisect import bisect_left, insort
+
+from .formats import iter_records, replacing
+from .metrics import Metrics
+
+INDEX_VERSION = 1
+TOKENIZE_CHUNK = 1000
+WORD = re.compile(r"\w+|[^\w\s]")
+
+
+class WordTokenizer:
+    name = "words"
+
+    def count(self, texts):
+        return [len(WORD.findall(text)) for text in texts]
+
+
+class ByteTokenizer:
+    name = "bytes"
+
+    def count(self, texts):
+        return [len(text.encode("utf-8")) for text in texts]
+
+
+class JsonTokenizer:
+    """A HuggingFace ``tokenizer.json``, loaded from disk."""
+
+    def __init__(self, path):
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            raise ValueError(
+                f"{path} needs the tokenizers package (pip install tokenizers)"
+            ) from None
+        stat = os.stat(path)
+        self.name = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        self._tokenizer = Tokenizer.from_file(path)
+
+    def count(self, texts):
+        encodings = self._tokenizer.encode_batch(texts, add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+
+TOKENIZERS = {"words": WordTokenizer, "bytes": ByteTokenizer}
+
+
+def load_tokenizer(spec):
+    """A built-in tokenizer by name, or a ``tokenizer.json`` by path.
+
+    Anything with a ``name`` and a ``count(texts)`` that returns one token
+    count per text can also be passed where a tokenizer is expected.
+    """
+    if spec in TOKENIZERS:
+        return TOKENIZERS[spec]()
+    if os.path.isfile(spec):
+        return JsonTokenizer(spec)
+    raise ValueError(
+        f"unknown tokenizer {spec!r}: use {', '.join(TOKENIZERS)} "
+        "or the path of a tokenizer.json"
+    )
+
+
+def _stat(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def default_index_path(paths):
+    return os.path.splitext(paths[0])[0] + ".tokens.json"
+
+
+class TokenIndex:
+    """Prompt and response token counts of every record, in file order."""
+
+    def __init__(self, tokenizer, sources, prompt, response):
+        self.tokenizer = tokenizer
+        self.sources = sources
+        self.prompt = prompt
+        self.response = response
+
+    def __len__(self):
+        return len(self.prompt)
+
+    @classmethod
+    def build(cls, paths, tokenizer):
+        prompt = []
+        response = []
+        pending = []
+
+        def flush():
+            prompt.extend(tokenizer.count([record[0] for record in pending]))
+            response.extend(tokenizer.count([record[1] for record in pending]))
+            pending.clear()
+
+        for path in paths:
+            for record in iter_records(path):
+                pending.append(record)
+                if len(pending) >= TOKENIZE_CHUNK:
+                    flush()
+        flush()
+        return cls(tokenizer.name, [_stat(path) for path in paths], prompt, response)
+
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "tokenizer": self.tokenizer,
+            "sources": self.sources,
+            "prompt": self.prompt,
+            "response": self.response,
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or return None if it is missing or unreadable."""
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["tokenizer"], data["sources"], data["prompt"], data["response"])
+
+    def is_current(self, paths, tokenizer):
+        """Whether the index counts ``paths`` as they are now with ``tokenizer``."""
+        return self.tokenizer == tokenizer.name and self.sources == [
+            _stat(path) for path in paths
+        ]
+
+    def lengths(self, separator=1):
+        return [
+            prompt + response + separator
+            for prompt, response in zip(self.prompt, self.response)
+        ]
+
+
+def load_token_index(paths, tokenizer, path=None, rebuild=False):
+    """The token index of ``paths``, saved to ``path`` (by default
+    ``<first input>.tokens.json``) and only rebuilt when it is out of date."""
+    path = path or default_index_path(paths)
+    index = None if rebuild else TokenIndex.load(path)
+    if index is None or not index.is_current(paths, tokenizer):
+        index = TokenIndex.build(paths, tokenizer)
+        index.save(path)
+    return index
+
+
+def pack_sequences(lengths, max_length):
+    """Group record indices into sequences of at most ``max_length`` tokens.
+
+    Best fit decreasing: the longest records are placed first, each into the
+    open sequence it leaves the least room in. A record longer than
+    ``max_length`` gets a sequence of its own.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True)
+    sequences = []
+    # Room left -> sequences with that much room, and the sorted room sizes
+    open_sequences = {}
+    rooms = []
+    for index in order:
+        length = lengths[index]
+        position = bisect_left(rooms, length)
+        if length >= max_length or position == len(rooms):
+            sequence = len(sequences)
+            sequences.append([index])
+            room = max_length - length
+        else:
+            room = rooms[position]
+            sequence = open_sequences[room].pop()
+            if not open_sequences[room]:
+                del open_sequences[room]
+                rooms.pop(position)
+            sequences[sequence].append(index)
+            room -= length
+        if room > 0:
+            if room not in open_sequences:
+                open_sequences[room] = []
+                insort(rooms, room)
+            open_sequences[room].append(sequence)
+    return sequences
+
+
+def default_buckets(max_length, smallest=64):
+    """Bucket sizes doubling up to ``max_length``."""
+    buckets = [max_length]
+    while buckets[0] // 2 >= smallest:
+        buckets.insert(0, buckets[0] // 2)
+    return buckets
+
+
+def bucket_records(lengths, buckets):
+    """The size of the smallest bucket each record fits, or its own length if
+    it fits none."""
+    buckets = sorted(buckets)
+    sizes = []
+    for length in lengths:
+        position = bisect_left(buckets, length)
+        sizes.append(buckets[position] if position < len(buckets) else length)
+    return sizes
+
+
+class PackingReport:
+    """Padding of the records one per ``max_length`` sequence, padded to the
+    longest record, and as packed or bucketed."""
+
+    def __init__(self, lengths, max_length, padded_lengths, layout):
+        self.records = len(lengths)
+        self.tokens = sum(lengths)
+        self.max_length = max_length
+        self.longest = max(lengths, default=0)
+        self.too_long = sum(length > max_length for length in lengths)
+        self.layout = layout
+        unpacked = sum(max(length, max_length) for length in lengths)
+        self.rows = [
+            ("unpacked", self.records, unpacked),
+            ("to longest", self.records, self.records * self.longest),
+            (layout, len(padded_lengths), sum(padded_lengths)),
+        ]
+
+    def padding(self, slots):
+        return 1 - self.tokens / slots if slots else 0.0
+
+    def __str__(self):
+        lines = [
+            f"{self.records:,} records, {self.tokens:,} tokens, longest "
+            f"{self.longest:,}, {self.too_long:,} longer than {self.max_length:,}"
+        ]
+        for name, sequences, slots in self.rows:
+            lines.append(
+                f"{name:>10}: {sequences:>9,} sequences, {slots:>12,} slots, "
+                f"{self.padding(slots):6.1%} padding"
+            )
+        return "\n".join(lines)
+
+
+def pack_records(
+    paths,
+    output_file,
+    tokenizer="words",
+    max_length=2048,
+    separator=1,
+    buckets=None,
+    index_path=None,
+    rebuild=False,
+    metrics=None,
+):
+    """Write the records of ``paths`` packed into sequences, or with
+    ``buckets`` sorted into length buckets, as JSON lines.
+
+    Packed lines are ``{"tokens": n, "records": [{"Prompt": ..., "Response":
+    ...}, ...]}`` and bucketed ones ``{"bucket": size, "tokens": n, "Prompt":
+    ..., "Response": ...}``, shortest bucket first. All records are held in
+    memory while writing, and ``output_file`` is only replaced once it is
+    complete. Returns the ``PackingReport``.
+    """
+    metrics = metrics or Metrics()
+    if isinstance(tokenizer, str):
+        tokenizer = load_tokenizer(tokenizer)
+    with metrics.stage("tokenize"):
+        index = load_token_index(paths, tokenizer, index_path, rebuild)
+    lengths = index.lengths(separator)
+    metrics.count("rows_in", len(lengths))
+    with metrics.stage("pack"):
+        if buckets:
+            sizes = bucket_records(lengths, buckets)
+            order = sorted(range(len(lengths)), key=sizes.__getitem__)
+            report = PackingReport(lengths, max_length, sizes, "bucketed")
+        else:
+            sequences = pack_sequences(lengths, max_length)
+            padded = [
+                max(max_length, sum(lengths[index] for index in sequence))
+                for sequence in sequences
+            ]
+            report = PackingReport(lengths, max_length, padded, "packed")
+    with metrics.stage("write"):
+        records = [record for path in paths for record in iter_records(path)]
+        if len(records) != len(lengths):
+            raise ValueError("the inputs changed while they were being packed")
+        with replacing(output_file, encoding="utf-8") as file:
+            if buckets:
+                lines = (
+                    {
+                        "bucket": sizes[index],
+                        "tokens": lengths[index],
+                        "Prompt": records[index][0],
+                        "Response": records[index][1],
+                    }
+                    for index in order
+                )
+            else:
+                lines = (
+                    {
+                        "tokens": sum(lengths[index] for index in sequence),
+                        "records": [
+                            {"Prompt": records[index][0], "Response": records[index][1]}
+                            for index in sequence
+                        ],
+                    }
+                    for sequence in sequences
+                )
+            for line in lines:
+                file.write(json.dumps(line, ensure_ascii=False) + "\n")
+    metrics.count("rows_out", len(records))
+    metrics.count("bytes_written", os.path.getsize(output_file))
+    return report
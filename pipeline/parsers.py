@@ -0,0 +1,103 @@
+"""Parsers for the free-form SSD capacity and read/write speed columns.
+
+The catalogs hold capacities like "120GB-1.92TB", "120-960GB",
+"1TB, 2TB, 4TB" or "Up to 4TB", and speeds like "3300/2700", "14000/?",
+"500+/400+", "1055" or "Read: up to 3200 MB/s, Write: up to 3000 MB/s".
+Each distinct string is parsed once and cached.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+CapacityRange = namedtuple("CapacityRange", ["min", "max"])
+ReadWrite = namedtuple("ReadWrite", ["read", "write"])
+
+GB_PER_TB = 1024
+MB_PER_GB = 1000
+
+NUMBER = r"(\d+(?:\.\d+)?)"
+CAPACITY = re.compile(NUMBER + r"\s*(GB|TB)?(?![a-z])", re.IGNORECASE)
+UP_TO = re.compile(r"\bup\s+to\b", re.IGNORECASE)
+SPEED_PAIR = re.compile(
+    NUMBER
+    + r"\+?\s*([MG]B/s)?\s*/\s*(?:"
+    + NUMBER
+    + r"\+?(?:\s*([MG]B/s))?|\?)",
+    re.IGNORECASE,
+)
+SPEED = re.compile(NUMBER + r"\+?\s*([MG]B/s)", re.IGNORECASE)
+BARE_SPEED = re.compile(r"\s*" + NUMBER + r"\+?\s*")
+CLAUSES = re.compile(r"[,;]|\band\b", re.IGNORECASE)
+READ = re.compile(r"\bread", re.IGNORECASE)
+WRITE = re.compile(r"\bwrite", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def parse_capacity_range(text):
+    """Smallest and largest capacity in GB, or None if there is none.
+
+    A number without a unit takes the unit of the next number that has one,
+    so "120-960GB" is 120 to 960 GB. "Up to" sizes have no minimum.
+    """
+    sizes = []
+    pending = []
+    for match in CAPACITY.finditer(text or ""):
+        value = float(match.group(1))
+        unit = match.group(2)
+        if unit is None:
+            pending.append(value)
+            continue
+        scale = GB_PER_TB if unit.upper() == "TB" else 1
+        sizes.extend(int(value * scale) for value in [*pending, value])
+        pending = []
+    if not sizes:
+        return None
+    if UP_TO.search(text):
+        return CapacityRange(None, max(sizes))
+    return CapacityRange(min(sizes), max(sizes))
+
+
+def _speed(value, unit):
+    value = float(value)
+    if unit and unit[0] in "gG":
+        value *= MB_PER_GB
+    return int(value)
+
+
+@lru_cache(maxsize=4096)
+def parse_read_write(text):
+    """Sequential read and write speeds in MB/s, either of them may be None.
+
+    A "read/write" pair wins, then speeds labelled read or write (the
+    largest of each), then a lone number, which is taken as the read speed.
+    A speed of a pair without a unit takes the other one's, so "7.4/6.8
+    GB/s" is 7400 and 6800 MB/s.
+    """
+    text = text or ""
+    pair = SPEED_PAIR.search(text)
+    if pair:
+        read, read_unit, write, write_unit = pair.groups()
+        return ReadWrite(
+            _speed(read, read_unit or write_unit),
+            write and _speed(write, write_unit or read_unit),
+        )
+
+    reads = []
+    writes = []
+    for clause in CLAUSES.split(text):
+        for position, match in enumerate(SPEED.finditer(clause)):
+            speed = _speed(*match.groups())
+            if WRITE.search(clause) and not READ.search(clause):
+                writes.append(speed)
+            elif READ.search(clause) and not WRITE.search(clause):
+                reads.append(speed)
+            else:
+                (writes if position or reads else reads).append(speed)
+    if reads or writes:
+        return ReadWrite(max(reads, default=None), max(writes, default=None))
+
+    bare = BARE_SPEED.fullmatch(text)
+    if bare:
+        return ReadWrite(int(float(bare.group(1))), None)
+    return ReadWrite(None, None)
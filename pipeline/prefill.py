@@ -0,0 +1,273 @@
+import re
+from collections import Counter, defaultdict
+
+MEMORY_TYPE_PATTERN = re.compile(r"\b(LPDDR\d|DDR\d)", re.IGNORECASE)
+CAPACITY_SUFFIX_PATTERN = re.compile(r"(\d+)\s*GB\s*$", re.IGNORECASE)
+# Socket counts ("2 x") and "Socket" in front of a socket, other names of a
+# socket, and values that name none, for normalize_socket()
+SOCKET_PREFIX = re.compile(r"^(?:\d+\s*X\s+)?(?:SOCKET\s*)?")
+SOCKET_ALIASES = {"STR4": "TR4", "LGA2011-V3": "LGA2011-3"}
+NO_SOCKET = {"", "UNKNOWN", "ONBOARDCPU", "N/A"}
+
+# Memory generation supported by each CPU socket, keyed by normalize_socket()
+SOCKET_MEMORY_TYPES = {
+    "AM3": "DDR3",
+    "AM3+": "DDR3",
+    "FM2+": "DDR3",
+    "G34": "DDR3",
+    "LGA1150": "DDR3",
+    "LGA1155": "DDR3",
+    "LGA1156": "DDR3",
+    "LGA1366": "DDR3",
+    "LGA2011": "DDR3",
+    "LGA2011-1": "DDR3",
+    "AM4": "DDR4",
+    "TR4": "DDR4",
+    "STRX4": "DDR4",
+    "SWRX8": "DDR4",
+    "SP3": "DDR4",
+    "LGA1151": "DDR4",
+    "LGA1200": "DDR4",
+    "LGA2011-3": "DDR4",
+    "LGA2066": "DDR4",
+    "LGA3647": "DDR4",
+    "LGA4189": "DDR4",
+    "AM5": "DDR5",
+}
+
+# Socket of the CPUs each desktop chipset was made for
+CHIPSET_SOCKETS = {
+    "AMD A320": "AM4",
+    "AMD B350": "AM4",
+    "AMD X370": "AM4",
+    "AMD B450": "AM4",
+    "AMD X470": "AM4",
+    "AMD A520": "AM4",
+    "AMD B550": "AM4",
+    "AMD X570": "AM4",
+    "AMD 760G": "AM3+",
+    "AMD 870": "AM3+",
+    "AMD 970": "AM3+",
+    "AMD 990X": "AM3+",
+    "AMD 990FX": "AM3+",
+    "AMD X399": "TR4",
+    "Intel H81": "LGA 1150",
+    "Intel B85": "LGA 1150",
+    "Intel H87": "LGA 1150",
+    "Intel Z87": "LGA 1150",
+    "Intel H97": "LGA 1150",
+    "Intel Z97": "LGA 1150",
+    "Intel H110": "LGA 1151",
+    "Intel B150": "LGA 1151",
+    "Intel H170": "LGA 1151",
+    "Intel Z170": "LGA 1151",
+    "Intel B250": "LGA 1151",
+    "Intel H270": "LGA 1151",
+    "Intel Z270": "LGA 1151",
+    "Intel H310": "LGA 1151",
+    "Intel B360": "LGA 1151",
+    "Intel H370": "LGA 1151",
+    "Intel Z370": "LGA 1151",
+    "Intel Z390": "LGA 1151",
+    "Intel H410": "LGA 1200",
+    "Intel B460": "LGA 1200",
+    "Intel Z490": "LGA 1200",
+    "Intel H510": "LGA 1200",
+    "Intel B560": "LGA 1200",
+    "Intel Z590": "LGA 1200",
+    "Intel X58": "LGA 1366",
+    "Intel X79": "LGA 2011",
+    "Intel X99": "LGA 2011-3",
+    "Intel X299": "LGA 2066",
+}
+
+
+def normalize_socket(socket):
+    """Reduce spellings like "FCLGA-3647", "LGA 3647", "2 x LGA3647" and
+    "Socket G34" to one key, or "" if there is no socket."""
+    socket = SOCKET_PREFIX.sub("", (socket or "").strip().upper())
+    socket = re.sub(r"^FC(?=[LB]GA)", "", socket)
+    socket = re.sub(r"\s+", "", socket)
+    socket = re.sub(r"^([A-Z]+)-(?=\d)", r"\1", socket)
+    socket = SOCKET_ALIASES.get(socket, socket)
+    return "" if socket in NO_SOCKET else socket
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Rule:
+    """Derive the value of one column from the other columns of a row."""
+
+    def __init__(self, name, target, derive):
+        self.name = name
+        self.target = target
+        self.derive = derive
+
+    def fit(self, rows):
+        """Learn anything the rule needs from the whole table."""
+
+
+class LookupRule(Rule):
+    """Copy ``target`` from rows sharing the same ``source`` value.
+
+    The lookup only learns source values that map to a single target value
+    in at least ``min_support`` rows of the table, so it only fills gaps the
+    data itself agrees on (an SSD controller fixes its channel layout, say).
+    """
+
+    def __init__(self, source, target, min_support=2):
+        super().__init__(f"{source} -> {target}", target, self._lookup)
+        self.source = source
+        self.min_support = min_support
+        self.table = {}
+
+    def fit(self, rows):
+        seen = defaultdict(Counter)
+        for row in rows:
+            if row.get(self.source) and row.get(self.target):
+                seen[row[self.source]][row[self.target]] += 1
+        self.table = {
+            source: next(iter(values))
+            for source, values in seen.items()
+            if len(values) == 1 and sum(values.values()) >= self.min_support
+        }
+
+    def _lookup(self, row):
+        return self.table.get(row.get(self.source))
+
+
+def memory_type_from_speed(speed_column):
+    def derive(row):
+        match = MEMORY_TYPE_PATTERN.search(row.get(speed_column, ""))
+        return match.group(1).upper() if match else None
+
+    return derive
+
+
+def memory_type_from_socket(socket_column):
+    def derive(row):
+        return SOCKET_MEMORY_TYPES.get(normalize_socket(row.get(socket_column, "")))
+
+    return derive
+
+
+def socket_from_chipset(row):
+    return CHIPSET_SOCKETS.get(row.get("Chipset", "").strip())
+
+
+def capacity_from_model(row):
+    match = CAPACITY_SUFFIX_PATTERN.search(row.get("model", ""))
+    return match.group(1) if match else None
+
+
+def ratio(numerator, denominator, scale=None, digits=2):
+    """Derive ``numerator / denominator`` (times ``scale``) from numeric columns."""
+
+    def derive(row):
+        top = to_float(row.get(numerator))
+        bottom = to_float(row.get(denominator))
+        factor = to_float(row.get(scale)) if scale else 1.0
+        if not top or not bottom or not factor:
+            return None
+        value = top / bottom * factor
+        return f"{value:.{digits}f}" if digits else str(round(value))
+
+    return derive
+
+
+def hmb_for_sata(row):
+    # Host Memory Buffer is an NVMe feature, SATA and USB drives never have it
+    interface = row.get("Interface", "")
+    if interface.startswith(("SATA", "USB")):
+        return "N/A"
+    return None
+
+
+CPU_RULES = [
+    Rule(
+        "MaxRAMSpeed -> MemoryType",
+        "MemoryType",
+        memory_type_from_speed("MaxRAMSpeed"),
+    ),
+    Rule("socket -> MemoryType", "MemoryType", memory_type_from_socket("socket")),
+    # PassMark value columns are mark / price, so either one gives the price
+    Rule(
+        "threadValue -> cpuValue",
+        "cpuValue",
+        ratio("cpuMark", "threadMark", "threadValue"),
+    ),
+    Rule(
+        "cpuValue -> threadValue",
+        "threadValue",
+        ratio("threadMark", "cpuMark", "cpuValue"),
+    ),
+    Rule("cpuMark / TDP -> powerPerf", "powerPerf", ratio("cpuMark", "TDP")),
+    Rule(
+        "cpuMark / powerPerf -> TDP",
+        "TDP",
+        ratio("cpuMark", "powerPerf", digits=0),
+    ),
+]
+
+MOTHERBOARD_RULES = [
+    Rule("Chipset -> Socket", "Socket", socket_from_chipset),
+    Rule(
+        "MaxRAMSpeed -> MemoryType",
+        "MemoryType",
+        memory_type_from_speed("MaxRAMSpeed"),
+    ),
+    Rule("Socket -> MemoryType", "MemoryType", memory_type_from_socket("Socket")),
+]
+
+RAM_RULES = [
+    Rule("model suffix -> Capacity (GB)", "Capacity (GB)", capacity_from_model),
+]
+
+SSD_RULES = [
+    LookupRule("Controller", "Interface"),
+    LookupRule("Controller", "Configuration"),
+    LookupRule("Controller", "DRAM"),
+    LookupRule("Controller", "HMB"),
+    LookupRule("Controller", "NANDType"),
+    Rule("Interface -> HMB", "HMB", hmb_for_sata),
+]
+
+
+def prefill(rows, rules):
+    """Fill gaps with deterministic rules before any row reaches the LLM.
+
+    Each rule is fitted on the whole table and then run down its target
+    column in one pass. Returns ``{rule name: (fields filled, calls saved)}``,
+    where a call is saved by the rule that filled the last gap of a row.
+    """
+    incomplete = [row for row in rows if any(not value for value in row.values())]
+    filled = Counter()
+    last_rule = {}
+    for rule in rules:
+        rule.fit(rows)
+        for index, row in enumerate(incomplete):
+            if row.get(rule.target, None) != "":
+                continue
+            value = rule.derive(row)
+            if value:
+                row[rule.target] = value
+                filled[rule.name] += 1
+                last_rule[index] = rule.name
+    saved = Counter(
+        last_rule[index]
+        for index, row in enumerate(incomplete)
+        if index in last_rule and all(row.values())
+    )
+    return {rule.name: (filled[rule.name], saved[rule.name]) for rule in rules}
+
+
+def format_report(report):
+    lines = ["Rule pre-fill:"]
+    for name, (fields, calls) in report.items():
+        lines.append(f"  {name}: {fields} fields filled, {calls} LLM calls saved")
+    return "\n".join(lines)
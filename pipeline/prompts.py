@@ -0,0 +1,79 @@
+from functools import lru_cache
+
+FORMAT_MARKER = "Please fill in the missing values in this format:"
+
+# Fields whose value is easier to get right once another field is known. The
+# missing fields of a prompt are listed so these prerequisites come first.
+CPU_DEPENDENCIES = {
+    "SupportedChipsets": ["socket"],
+    "MemoryType": ["MaxRAMSpeed"],
+    "cpuValue": ["cpuMark"],
+    "threadValue": ["threadMark"],
+    "powerPerf": ["TDP"],
+}
+MOTHERBOARD_DEPENDENCIES = {
+    "Socket": ["Chipset"],
+    "MemoryType": ["MaxRAMSpeed"],
+    "SupportedFormFactors": ["SupportedStorageInterfaces"],
+}
+RAM_DEPENDENCIES = {
+    "DRAM Configuration": ["Form Factor"],
+}
+SSD_DEPENDENCIES = {
+    "Configuration": ["Controller"],
+    "HMB": ["DRAM"],
+    "NANDType": ["NAND Brand"],
+    "Layers": ["NAND Brand", "NANDType"],
+    "Categories": ["Interface", "R/W"],
+}
+
+
+def schedule_fields(missing, dependencies):
+    """Order missing fields so each one follows the missing fields it depends on."""
+    ordered = []
+    visiting = set()
+
+    def visit(field):
+        if field in ordered or field in visiting:
+            return
+        visiting.add(field)
+        for prerequisite in dependencies.get(field, ()):
+            if prerequisite in missing:
+                visit(prerequisite)
+        visiting.discard(field)
+        ordered.append(field)
+
+    for field in missing:
+        visit(field)
+    return ordered
+
+
+def missing_field_prompt(label, dependencies=None):
+    """Return a ``build_prompt(row)`` that asks only for the row's empty columns.
+
+    The known columns are given once as context and the answer format lists
+    just the missing ones. Rows with the same columns and the same gaps share
+    one cached template, which keeps their prompts (and cache keys) uniform.
+    """
+    dependencies = dependencies or {}
+
+    @lru_cache(maxsize=None)
+    def template(columns, missing):
+        known = [column for column in columns if column not in missing]
+        context = "\n".join(f"        {column}: {{}}" for column in known)
+        answer = "\n".join(
+            f"        {field}:" for field in schedule_fields(missing, dependencies)
+        )
+        header = (
+            f"Given the following {label} data:\n{context}\n\n"
+            f"        {FORMAT_MARKER}\n\n{answer}\n"
+        )
+        return known, header
+
+    def build_prompt(row):
+        columns = tuple(row)
+        missing = tuple(column for column in columns if not row[column])
+        known, header = template(columns, missing)
+        return header.format(*(row[column] for column in known))
+
+    return build_prompt
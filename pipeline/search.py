@@ -0,0 +1,516 @@
+"""Search the complete catalogs by text, field value and numeric range.
+
+A query is a comma-separated list of clauses, e.g. for CPUs
+"AMD, socket AM5, cpuMark > 40000":
+
+    cpuMark > 40000   a numeric range (<, <=, >, >= or =)
+    socket AM5        every word must be in that column of the row
+    AMD               free text, ranked with BM25 over all columns
+
+Clauses are ANDed; the words of free text are ORed and rank the results.
+A query without free text lists its matches in catalog order.
+
+Per component the index keeps the rows, every word's rows with their BM25
+weight (highest first), every column's words with their rows, and each
+numeric field's values sorted with their rows, so a query only touches the
+rows it can match. Numeric fields are read from the catalog columns: CPU
+``cpuMark``, ``threadMark``, ``TDP``, ``powerPerf`` and ``cores``, RAM
+``speed`` and ``Capacity (GB)`` (or just ``capacity``), and SSD ``read`` and
+``write`` from ``R/W`` and the largest ``capacity`` in GB of ``Capacities``.
+
+The index is saved (by default as ``data/search_index.bin``) as a JSON
+header with the rows and words, followed by the raw row numbers, weights and
+values as arrays, so loading it is mostly copying bytes. It is only rebuilt
+when a catalog changes.
+"""
+
+import heapq
+import json
+import math
+import operator
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+from itertools import islice
+
+from .components import COMPONENTS
+from .csv_io import CsvIndex
+from .parsers import parse_capacity_range, parse_read_write
+
+INDEX_VERSION = 2
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+WORD = re.compile(r"\w+")
+RANGE = re.compile(
+    r"^(?P<field>.+?)\s*(?P<op><=|>=|<|>|=)\s*(?P<value>-?\d+(?:\.\d+)?)$"
+)
+PARENTHESES = re.compile(r"\s*\([^)]*\)")
+# Rows filtered at a time when only the first few matches are needed
+CHUNK_ROWS = 256
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+}
+
+Query = namedtuple("Query", ["terms", "fields", "ranges"])
+Hit = namedtuple("Hit", ["name", "score", "row"])
+
+
+def words(text):
+    return WORD.findall((text or "").lower())
+
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _column(name):
+    return lambda row: _number(row.get(name))
+
+
+def _capacity(row):
+    capacity = parse_capacity_range(row.get("Capacities"))
+    return capacity and capacity.max
+
+
+NUMBERS = {
+    "cpu": {
+        name: _column(name)
+        for name in ("cpuMark", "threadMark", "TDP", "powerPerf", "cores")
+    },
+    "ram": {name: _column(name) for name in ("speed", "Capacity (GB)")},
+    "motherboard": {},
+    "ssd": {
+        "read": lambda row: parse_read_write(row.get("R/W")).read,
+        "write": lambda row: parse_read_write(row.get("R/W")).write,
+        "capacity": _capacity,
+    },
+}
+# Other names a numeric field can be queried by
+NUMBER_ALIASES = {"ssd": {"r/w": "read", "capacities": "capacity"}}
+
+
+def _aliases(names):
+    """Lowercased names, and without a parenthesized unit, to the names."""
+    aliases = {}
+    for name in names:
+        aliases.setdefault(name.lower(), name)
+        aliases.setdefault(PARENTHESES.sub("", name).lower(), name)
+    return aliases
+
+
+def _weights(rows):
+    """BM25 weight of every word in every row: ``{word: {row: weight}}``."""
+    counts = [Counter(words(" ".join(v for v in row if v))) for row in rows]
+    lengths = [sum(count.values()) for count in counts]
+    average = sum(lengths) / len(lengths) if lengths else 0.0
+    frequencies = Counter(word for count in counts for word in count)
+    weights = {}
+    for doc, (count, length) in enumerate(zip(counts, lengths)):
+        norm = K1 * (1 - B + B * length / average)
+        for word, frequency in count.items():
+            rows_with = frequencies[word]
+            idf = math.log(1 + (len(rows) - rows_with + 0.5) / (rows_with + 0.5))
+            weight = idf * frequency * (K1 + 1) / (frequency + norm)
+            weights.setdefault(word, {})[doc] = weight
+    return weights
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def default_index_path(root):
+    return os.path.join(root, "data", "search_index.bin")
+
+
+class Postings:
+    """Rows per word, as one array of row numbers sliced at ``starts``.
+
+    The rows of ``words[i]`` are ``docs[starts[i]:starts[i + 1]]``, with
+    their ``weights`` if there are any.
+    """
+
+    def __init__(self, words, starts, docs, weights=None):
+        self.words = words
+        self.starts = starts
+        self.docs = docs
+        self.weights = weights
+        self._index = {word: index for index, word in enumerate(words)}
+        self._sets = {}
+
+    @classmethod
+    def from_lists(cls, lists, weights=None):
+        """From ``{word: rows}`` and, optionally, ``{word: weights}``."""
+        starts = array("I", [0])
+        docs = array("I")
+        for word, rows in lists.items():
+            docs.extend(rows)
+            starts.append(len(docs))
+        if weights is not None:
+            weights = array("f", (w for word in lists for w in weights[word]))
+        return cls(list(lists), starts, docs, weights)
+
+    def __contains__(self, word):
+        return word in self._index
+
+    def _slice(self, word):
+        index = self._index.get(word)
+        if index is None:
+            return slice(0, 0)
+        return slice(self.starts[index], self.starts[index + 1])
+
+    def get(self, word):
+        """Rows of ``word``, an empty array if there are none."""
+        return self.docs[self._slice(word)]
+
+    def rows(self, word):
+        """Rows of ``word`` as a set, kept for the next query."""
+        rows = self._sets.get(word)
+        if rows is None:
+            rows = self._sets[word] = frozenset(self.get(word))
+        return rows
+
+    def weighted(self, word):
+        """Rows of ``word`` and their weights."""
+        rows = self._slice(word)
+        return self.docs[rows], self.weights[rows]
+
+    def arrays(self):
+        if self.weights is None:
+            return [self.starts, self.docs]
+        return [self.starts, self.docs, self.weights]
+
+
+class Catalog:
+    """The search structures of one component's catalog.
+
+    ``terms`` holds every word's rows ordered by BM25 weight, highest first,
+    ``fields[column]`` the rows of every word of a column in row order, and
+    ``numbers[field]`` a numeric field's values, ascending, and their rows.
+    """
+
+    def __init__(self, name, columns, rows, terms, fields, numbers):
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.terms = terms
+        self.fields = fields
+        self.numbers = numbers
+        key = columns.index(COMPONENTS[name].key_column)
+        self.names = [row[key] for row in rows]
+        # Every row's value of each numeric field, for checking candidates.
+        # A missing value is NaN, which fails every comparison.
+        self.values = {}
+        for field, (values, docs) in numbers.items():
+            by_row = self.values[field] = [math.nan] * len(rows)
+            for value, doc in zip(values, docs):
+                by_row[doc] = value
+        self.field_aliases = _aliases(columns)
+        self.number_aliases = _aliases(numbers)
+        self.number_aliases.update(NUMBER_ALIASES.get(name, {}))
+
+    @classmethod
+    def build(cls, name, columns, rows):
+        fields = {column: {} for column in columns}
+        for doc, row in enumerate(rows):
+            for column, value in zip(columns, row):
+                for word in dict.fromkeys(words(value)):
+                    fields[column].setdefault(word, []).append(doc)
+        terms = {}
+        weights = {}
+        for word, by_doc in _weights(rows).items():
+            ordered = sorted(by_doc.items(), key=lambda item: (-item[1], item[0]))
+            terms[word] = [doc for doc, _ in ordered]
+            weights[word] = [weight for _, weight in ordered]
+        numbers = {}
+        for field, read in NUMBERS[name].items():
+            pairs = []
+            for doc, row in enumerate(rows):
+                value = read(dict(zip(columns, row)))
+                if value is not None:
+                    pairs.append((value, doc))
+            pairs.sort()
+            numbers[field] = (
+                array("d", [value for value, _ in pairs]),
+                array("I", [doc for _, doc in pairs]),
+            )
+        return cls(
+            name,
+            columns,
+            rows,
+            Postings.from_lists(terms, weights),
+            {column: Postings.from_lists(lists) for column, lists in fields.items()},
+            numbers,
+        )
+
+    def header(self):
+        """What the saved index holds besides the arrays."""
+        return {
+            "columns": self.columns,
+            "rows": self.rows,
+            "terms": self.terms.words,
+            "fields": {column: p.words for column, p in self.fields.items()},
+            "numbers": list(self.numbers),
+        }
+
+    def arrays(self):
+        """The catalog's arrays, in the order ``from_arrays`` reads them."""
+        arrays = self.terms.arrays()
+        for postings in self.fields.values():
+            arrays.extend(postings.arrays())
+        for values, docs in self.numbers.values():
+            arrays.extend([values, docs])
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, name, header, arrays):
+        """Rebuild a catalog from its ``header`` and an iterator of arrays."""
+        terms = Postings(header["terms"], next(arrays), next(arrays), next(arrays))
+        fields = {
+            column: Postings(words, next(arrays), next(arrays))
+            for column, words in header["fields"].items()
+        }
+        numbers = {field: (next(arrays), next(arrays)) for field in header["numbers"]}
+        return cls(name, header["columns"], header["rows"], terms, fields, numbers)
+
+    def parse(self, text):
+        """The ``Query`` for a comma-separated query string."""
+        terms = []
+        fields = []
+        ranges = []
+        for clause in text.split(","):
+            clause = clause.strip()
+            if not clause:
+                continue
+            match = RANGE.match(clause)
+            if match:
+                field = self.number_aliases.get(match["field"].lower())
+                if field is None:
+                    raise ValueError(
+                        f"{match['field']!r} is not a numeric {self.name} field: "
+                        f"use {', '.join(self.numbers) or 'none'}"
+                    )
+                ranges.append((field, match["op"], float(match["value"])))
+                continue
+            parts = clause.split()
+            for size in range(len(parts) - 1, 0, -1):
+                column = self.field_aliases.get(" ".join(parts[:size]).lower())
+                if column is not None:
+                    fields.append((column, " ".join(parts[size:])))
+                    break
+            else:
+                terms.extend(words(clause))
+        return Query(list(dict.fromkeys(terms)), fields, ranges)
+
+    def _range_rows(self, field, op, value):
+        values, docs = self.numbers[field]
+        start, end = 0, len(values)
+        if op in (">=", "="):
+            start = bisect_left(values, value)
+        elif op == ">":
+            start = bisect_right(values, value)
+        if op in ("<=", "="):
+            end = bisect_right(values, value)
+        elif op == "<":
+            end = bisect_left(values, value)
+        return docs[start:end]
+
+    def _matches(self, query, limit=None):
+        """The first ``limit`` rows, or all of them, that pass the field and
+        range clauses, in row order."""
+        # (rows of the clause, how to check a row against it) per clause
+        clauses = []
+        for column, value in query.fields:
+            column = self.field_aliases.get(column.lower(), column)
+            if column not in self.fields:
+                raise ValueError(f"no {self.name} column {column!r}")
+            postings = self.fields[column]
+            for word in words(value):
+                clauses.append((postings.get(word), ("word", postings, word)))
+        for field, op, value in query.ranges:
+            if field not in self.numbers:
+                raise ValueError(f"no numeric {self.name} field {field!r}")
+            check = ("range", self.values[field], OPERATORS[op], value)
+            clauses.append((self._range_rows(field, op, value), check))
+        if not clauses:
+            return range(len(self.rows))[:limit]
+        # Filter the rows of the clause with the fewest
+        clauses.sort(key=lambda clause: len(clause[0]))
+        rows, check = clauses[0]
+        if check[0] == "word":
+            clauses.pop(0)
+        elif len(rows) * 4 < len(self.rows):
+            clauses.pop(0)
+            rows = sorted(rows)
+        else:
+            # Sorting most of the catalog costs more than checking it in order
+            rows = range(len(self.rows))
+        filters = []
+        for _, check in clauses:
+            if check[0] == "word":
+                filters.append(check[1].rows(check[2]))
+            else:
+                filters.append(check[1:])
+        step = len(rows) if limit is None else max(limit, CHUNK_ROWS)
+        matches = []
+        for start in range(0, len(rows), max(step, 1)):
+            chunk = rows[start : start + step]
+            for check in filters:
+                if isinstance(check, frozenset):
+                    chunk = [doc for doc in chunk if doc in check]
+                else:
+                    values, compare, value = check
+                    chunk = [doc for doc in chunk if compare(values[doc], value)]
+            matches.extend(chunk)
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches[:limit]
+
+    def search(self, query, limit=10):
+        """The best ``limit`` rows for a query string or ``Query``."""
+        if isinstance(query, str):
+            query = self.parse(query)
+        candidates = None
+        if query.terms and (query.fields or query.ranges):
+            candidates = set(self._matches(query))
+        if query.terms:
+            postings = [self.terms.weighted(t) for t in query.terms if t in self.terms]
+            if len(postings) == 1:
+                # Already ordered by weight
+                docs, weights = postings[0]
+                ranked = islice(
+                    (
+                        (doc, weight)
+                        for doc, weight in zip(docs, weights)
+                        if candidates is None or doc in candidates
+                    ),
+                    limit,
+                )
+            else:
+                scores = {}
+                for docs, weights in postings:
+                    for doc, weight in zip(docs, weights):
+                        if candidates is None or doc in candidates:
+                            scores[doc] = scores.get(doc, 0.0) + weight
+                ranked = heapq.nsmallest(
+                    limit, scores.items(), key=lambda item: (-item[1], item[0])
+                )
+        else:
+            ranked = ((doc, 0.0) for doc in self._matches(query, limit))
+        return [
+            Hit(self.names[doc], score, dict(zip(self.columns, self.rows[doc])))
+            for doc, score in ranked
+        ]
+
+
+class SearchIndex:
+    """A ``Catalog`` per component, and the catalog files it was built from."""
+
+    def __init__(self, catalogs, sources=None, duplicates="last"):
+        self.catalogs = catalogs
+        self.sources = sources or {}
+        self.duplicates = duplicates
+
+    @classmethod
+    def build(cls, root, duplicates="last"):
+        """Read the complete catalogs under ``root`` and index them."""
+        catalogs = {}
+        sources = {}
+        for name, component in COMPONENTS.items():
+            path = component.complete_path(root)
+            sources[name] = _stat(path)
+            with CsvIndex(path, component.key_column, duplicates) as index:
+                columns = index.fieldnames
+                rows = [
+                    [row.get(column) for column in columns] for _, row in index.items()
+                ]
+            catalogs[name] = Catalog.build(name, columns, rows)
+        return cls(catalogs, sources, duplicates)
+
+    def save(self, path):
+        """Write a JSON header line followed by the raw bytes of every array."""
+        arrays = [a for catalog in self.catalogs.values() for a in catalog.arrays()]
+        header = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "duplicates": self.duplicates,
+            "sources": self.sources,
+            "catalogs": {
+                name: catalog.header() for name, catalog in self.catalogs.items()
+            },
+            "arrays": [[a.typecode, len(a)] for a in arrays],
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+            file.write(b"\n")
+            for a in arrays:
+                a.tofile(file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or return None if it is missing or unreadable."""
+        try:
+            with open(path, "rb") as file:
+                header = json.loads(file.readline())
+                data = file.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        if header.get("version") != INDEX_VERSION:
+            return None
+        arrays = []
+        offset = 0
+        for typecode, length in header["arrays"]:
+            a = array(typecode)
+            end = offset + length * a.itemsize
+            a.frombytes(data[offset:end])
+            if header["byteorder"] != sys.byteorder:
+                a.byteswap()
+            arrays.append(a)
+            offset = end
+        if offset != len(data):
+            return None
+        arrays = iter(arrays)
+        catalogs = {
+            name: Catalog.from_arrays(name, catalog, arrays)
+            for name, catalog in header["catalogs"].items()
+        }
+        return cls(catalogs, header["sources"], header["duplicates"])
+
+    def is_current(self, root, duplicates="last"):
+        """Whether the index was built from the catalogs now under ``root``."""
+        return self.duplicates == duplicates and all(
+            self.sources.get(name) == _stat(component.complete_path(root))
+            for name, component in COMPONENTS.items()
+        )
+
+    def search(self, component, query, limit=10):
+        """The best ``limit`` ``Hit``s of ``component`` rows for ``query``."""
+        return self.catalogs[component].search(query, limit)
+
+
+def load_search_index(root, path=None, duplicates="last", rebuild=False):
+    """The search index of the catalogs under ``root``, saved to ``path`` and
+    only rebuilt when a catalog changed since, or when ``rebuild`` is set."""
+    path = path or default_index_path(root)
+    index = None if rebuild else SearchIndex.load(path)
+    if index is None or not index.is_current(root, duplicates):
+        index = SearchIndex.build(root, duplicates)
+        index.save(path)
+    return index
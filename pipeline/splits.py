@@ -0,0 +1,260 @@
+"""Deterministic train/val/test splits of training records, in shards.
+
+Records are stratified by component and tier (read back from the prompt
+template, e.g. "cpu/high"), and every stratum is split on its own. Its
+records are ordered by a 64-bit blake2b hash of ``seed`` and their prompt
+and response, and the split ratios are turned into record quotas with
+largest-remainder rounding. A stratum of at least three records gets at
+least one record in each evaluation split with a nonzero ratio. Walking the
+records in hash order, each goes to the first of val, test and train with
+room left in its quota. Identical records share a hash and are placed
+together, so they always land in the same split, and the same input always
+gives the same splits.
+
+Records are read twice: once to hash them and once to write them. Each
+split is written as ``shards`` files of about equal size: a record goes to
+the split's shard with the fewest bytes so far. Only the stratum and hash of
+every record and a chunk of records per shard are held in memory.
+"""
+
+import glob
+import hashlib
+import heapq
+import os
+import re
+from functools import lru_cache
+
+from .components import COMPONENTS
+from .dedup import PLACEHOLDER
+from .formats import discard_outputs, iter_records, open_outputs, render
+from .metrics import Metrics
+from .tiers import TIERS
+
+SPLITS = ("train", "val", "test")
+# Splits take records in this order along a stratum's hashes
+EVAL_SPLITS = ("val", "test")
+MIN_EVAL_STRATUM = 3
+WRITE_CHUNK = 1000
+
+
+@lru_cache(maxsize=None)
+def _stratum_patterns():
+    patterns = []
+    tier = "(?P<tier>" + "|".join(TIERS) + ")"
+    for name, component in COMPONENTS.items():
+        parts = PLACEHOLDER.split(component.prompt)
+        fields = PLACEHOLDER.findall(component.prompt)
+        pattern = re.escape(parts[0])
+        for field, part in zip(fields, parts[1:]):
+            pattern += (tier if field == "{tier}" else ".*?") + re.escape(part)
+        patterns.append((name, re.compile(pattern, re.DOTALL)))
+    return patterns
+
+
+def stratum_of(prompt):
+    """``"<component>/<tier>"`` of a prompt rendered from a component's
+    template, or ``"unknown"``."""
+    for name, pattern in _stratum_patterns():
+        match = pattern.fullmatch(prompt)
+        if match:
+            return f"{name}/{match.group('tier')}"
+    return "unknown"
+
+
+def split_point(prompt, response, seed=0):
+    """Where a record falls in [0, 1)."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{seed}\0".encode("utf-8"))
+    digest.update(prompt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(response.encode("utf-8"))
+    return int.from_bytes(digest.digest(), "big") / (1 << 64)
+
+
+def check_ratios(ratios):
+    """Normalize train, val and test ratios to add up to 1."""
+    if len(ratios) != len(SPLITS):
+        raise ValueError(f"give {len(SPLITS)} ratios: {', '.join(SPLITS)}")
+    if any(ratio < 0 for ratio in ratios) or not sum(ratios):
+        raise ValueError("split ratios must be non-negative and not all zero")
+    total = sum(ratios)
+    return [ratio / total for ratio in ratios]
+
+
+class SplitReport:
+    """Records per stratum and split."""
+
+    def __init__(self):
+        self.strata = {}
+
+    def counts(self, stratum):
+        return self.strata.setdefault(stratum, dict.fromkeys(SPLITS, 0))
+
+    def add(self, stratum, split):
+        self.counts(stratum)[split] += 1
+
+    def __str__(self):
+        lines = []
+        for stratum, counts in sorted(self.strata.items()):
+            total = sum(counts.values())
+            splits = ", ".join(
+                f"{split} {count} ({count / total:.1%})"
+                for split, count in counts.items()
+            )
+            lines.append(f"{stratum}: {total} records, {splits}")
+        return "\n".join(lines)
+
+
+def quotas(count, ratios):
+    """Records of a stratum of ``count`` records per split.
+
+    Largest-remainder rounding of ``count`` times each ratio, then every
+    evaluation split with a nonzero ratio gets at least one record, taken
+    from the largest split, if the stratum has ``MIN_EVAL_STRATUM`` or more.
+    """
+    exact = {split: count * ratio for split, ratio in ratios.items()}
+    result = {split: int(value) for split, value in exact.items()}
+    remainders = sorted(SPLITS, key=lambda split: result[split] - exact[split])
+    for split in remainders[: count - sum(result.values())]:
+        result[split] += 1
+    if count >= MIN_EVAL_STRATUM:
+        for split in EVAL_SPLITS:
+            if ratios[split] and not result[split]:
+                largest = max(SPLITS, key=result.__getitem__)
+                result[largest] -= 1
+                result[split] += 1
+    return result
+
+
+def assign_splits(points, ratios):
+    """Split of every distinct point of one stratum's records.
+
+    ``points`` maps each distinct point to its number of records. Taking the
+    points from lowest to highest, each goes to the first of val, test and
+    train whose quota still has room for all of its records, or to the last
+    split in use, so a group of identical records never overfills val or
+    test.
+    """
+    room = quotas(sum(points.values()), ratios)
+    order = [split for split in (*EVAL_SPLITS, "train") if room[split]]
+    assigned = {}
+    for point in sorted(points):
+        count = points[point]
+        split = next((split for split in order if room[split] >= count), order[-1])
+        assigned[point] = split
+        room[split] -= count
+    return assigned
+
+
+def shard_path(output_dir, split, shard, shards):
+    return os.path.join(output_dir, f"{split}-{shard:05d}-of-{shards:05d}.csv")
+
+
+def split_records(
+    paths,
+    output_dir,
+    ratios=(0.8, 0.1, 0.1),
+    shards=1,
+    seed=0,
+    formats=("csv",),
+    metrics=None,
+    options=None,
+):
+    """Write the records of ``paths`` to ``<split>-<shard>-of-<shards>`` files
+    under ``output_dir``, in their original order within each shard.
+
+    ``options`` go to ``pipeline.formats.open_outputs``. Splits with a zero
+    ratio get no files. Returns the paths written and a ``SplitReport``.
+    """
+    ratios = dict(zip(SPLITS, check_ratios(ratios)))
+    if shards < 1:
+        raise ValueError("need at least one shard per split")
+    metrics = metrics or Metrics()
+    with metrics.stage("hash"):
+        # Stratum and point of every record, and each stratum's points
+        records = []
+        strata = {}
+        for path in paths:
+            for prompt, response in iter_records(path):
+                stratum = stratum_of(prompt)
+                point = split_point(prompt, response, seed)
+                records.append((stratum, point))
+                points = strata.setdefault(stratum, {})
+                points[point] = points.get(point, 0) + 1
+        assigned = {
+            stratum: assign_splits(points, ratios)
+            for stratum, points in strata.items()
+        }
+    in_use = [split for split in SPLITS if ratios[split]]
+    os.makedirs(output_dir, exist_ok=True)
+    # Per split: one output list per shard, and a heap of (bytes, shard)
+    outputs = {}
+    sizes = {}
+    pending = {}
+    report = SplitReport()
+    try:
+        for split in in_use:
+            outputs[split] = []
+            for shard in range(shards):
+                path = shard_path(output_dir, split, shard, shards)
+                outputs[split].append(
+                    open_outputs(path, formats, merged=True, **(options or {}))
+                )
+            sizes[split] = [(0, shard) for shard in range(shards)]
+            pending[split] = [[] for _ in range(shards)]
+        with metrics.stage("split"):
+            pairs = (pair for path in paths for pair in iter_records(path))
+            for (prompt, response), (stratum, point) in zip(pairs, records):
+                split = assigned[stratum][point]
+                report.add(stratum, split)
+                size, shard = sizes[split][0]
+                size += len(prompt.encode("utf-8"))
+                size += len(response.encode("utf-8"))
+                heapq.heapreplace(sizes[split], (size, shard))
+                chunk = pending[split][shard]
+                chunk.append({"Prompt": prompt, "Response": response})
+                if len(chunk) >= WRITE_CHUNK:
+                    _write(outputs[split][shard], chunk, metrics)
+                    chunk.clear()
+            for split, chunks in pending.items():
+                for shard, chunk in enumerate(chunks):
+                    _write(outputs[split][shard], chunk, metrics)
+    except BaseException:
+        for shard_outputs in outputs.values():
+            for shard in shard_outputs:
+                discard_outputs(shard)
+        raise
+    for shard_outputs in outputs.values():
+        for shard in shard_outputs:
+            for output in shard:
+                output.close()
+    written = [
+        path
+        for shard_outputs in outputs.values()
+        for shard in shard_outputs
+        for output in shard
+        for path in output.paths
+    ]
+    _remove_stale(output_dir, written)
+    metrics.count(
+        "rows_in", sum(sum(counts.values()) for counts in report.strata.values())
+    )
+    metrics.count("bytes_written", sum(os.path.getsize(path) for path in written))
+    return written, report
+
+
+def _remove_stale(output_dir, written):
+    """Remove shards of an earlier run with other shard counts or formats."""
+    for split in SPLITS:
+        pattern = f"{split}-{'[0-9]' * 5}-of-{'[0-9]' * 5}*"
+        for path in glob.glob(os.path.join(glob.escape(output_dir), pattern)):
+            if path not in written:
+                os.remove(path)
+
+
+def _write(outputs, chunk, metrics):
+    kinds = [output.kind for output in outputs]
+    rendered = render(chunk, kinds)
+    for output in outputs:
+        output.write(rendered[output.kind])
+    metrics.count("rows_out", len(chunk))
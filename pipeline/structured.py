@@ -0,0 +1,50 @@
+import json
+import re
+
+MISSING_KEYS_LABEL = "Missing keys:"
+
+
+def normalize_key(key):
+    """Compare field names ignoring case, spacing and punctuation."""
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def build_json_prompt(row, fields, label):
+    """Ask for the given fields of the row as a JSON object and nothing else."""
+    record = json.dumps(row, ensure_ascii=False)
+    return (
+        f"Fill in the missing values of this {label} record. Reply with only a "
+        "JSON object whose keys are exactly the missing keys listed below, "
+        "each mapped to its correct value as a string.\n"
+        f"{MISSING_KEYS_LABEL} {json.dumps(fields, ensure_ascii=False)}\n"
+        f"Record:\n{record}"
+    )
+
+
+def parse_json_response(response, fields):
+    """Return the requested fields found in a JSON-object response.
+
+    Text around the outermost braces (markdown fences, chatter) is ignored and
+    keys are matched with ``normalize_key``. Returns None when the response
+    holds no JSON object at all, and only non-empty values otherwise.
+    """
+    start = response.find("{")
+    end = response.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        obj = json.loads(response[start : end + 1])
+    except ValueError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    wanted = {normalize_key(field): field for field in fields}
+    values = {}
+    for key, value in obj.items():
+        field = wanted.get(normalize_key(key))
+        if field is None or value is None or isinstance(value, (dict, list)):
+            continue
+        value = str(value).strip()
+        if value:
+            values[field] = value
+    return values
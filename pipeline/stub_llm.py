@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+from .batching import RECORDS
+from .metrics import count_tokens
+from .prompts import FORMAT_MARKER
+from .structured import MISSING_KEYS_LABEL
+
+
+class StubChain:
+    """Local stand-in for the ``prompt | llm | StrOutputParser()`` chain.
+
+    Single-row prompts are answered by echoing their "key: value" format
+    block with every empty value replaced by ``fill_value``, or for JSON
+    prompts with an object mapping each missing key to ``fill_value``.
+    Batched prompts ending in a ``{"records": [...]}`` object get back one
+    holding each record's first (key) field and its filled-in empty fields.
+    ``drop_every`` leaves every n-th record out of a batch answer, and the
+    last missing key out of every n-th JSON answer, to exercise fallbacks and
+    retries.
+
+    Each call sleeps ``latency`` plus ``token_latency`` per generated token,
+    so the enrichment scripts can be exercised and benchmarked without Ollama.
+    """
+
+    def __init__(
+        self, latency=0.0, token_latency=0.0, fill_value="stub", drop_every=0
+    ):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.fill_value = fill_value
+        self.drop_every = drop_every
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, inputs, config=None):
+        prompt_text = inputs["Prompt"]
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        if MISSING_KEYS_LABEL in prompt_text:
+            response = self._answer_json(prompt_text, call_number)
+        elif prompt_text.rstrip().endswith("]}"):
+            response = self._answer_batch(prompt_text)
+        else:
+            response = self._answer_format(prompt_text)
+        completion_tokens = count_tokens(response)
+        with self._lock:
+            self.prompt_tokens += count_tokens(prompt_text)
+            self.completion_tokens += completion_tokens
+        delay = self.latency + self.token_latency * completion_tokens
+        if delay:
+            time.sleep(delay)
+        return response
+
+    def _answer_format(self, prompt_text):
+        if FORMAT_MARKER in prompt_text:
+            prompt_text = prompt_text.split(FORMAT_MARKER, 1)[1]
+        lines = []
+        for line in prompt_text.strip().split("\n"):
+            if ":" not in line:
+                continue
+            key, value = line.split(":", 1)
+            lines.append(f"{key.strip()}: {value.strip() or self.fill_value}")
+        return "\n".join(lines)
+
+    def _answer_json(self, prompt_text, call_number):
+        line = prompt_text.split(MISSING_KEYS_LABEL, 1)[1].split("\n", 1)[0]
+        fields = json.loads(line)
+        if self.drop_every and call_number % self.drop_every == 0:
+            fields = fields[:-1]
+        return json.dumps({field: self.fill_value for field in fields})
+
+    def _answer_batch(self, prompt_text):
+        start = prompt_text.index(f'\n{{"{RECORDS}": [')
+        records = json.loads(prompt_text[start:])[RECORDS]
+        answers = []
+        for number, record in enumerate(records, 1):
+            if self.drop_every and number % self.drop_every == 0:
+                continue
+            key, key_value = next(iter(record.items()))
+            answer = {key: key_value}
+            for field, field_value in record.items():
+                if not field_value:
+                    answer[field] = self.fill_value
+            answers.append(answer)
+        return json.dumps({RECORDS: answers})
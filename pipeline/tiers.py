@@ -0,0 +1,95 @@
+from .parsers import parse_capacity_range, parse_read_write
+
+TIERS = ("low", "mid", "high")
+# Lower bounds of the mid and high tiers. RAM and SSDs need both values to
+# reach a tier's bound: (speed, capacity in GB) and (capacity in GB, MB/s).
+CPU_MARK_THRESHOLDS = (60000, 80000)
+RAM_THRESHOLDS = ((4000, 16), (6000, 32))
+SSD_THRESHOLDS = ((1000, 1500), (2000, 3500))
+# Assumed ranges based on typical values: a motherboard is in the tier of
+# the highest pattern found in its Max RAM Speed
+MOTHERBOARD_PATTERNS = (("DDR4-3200", "DDR4-2933"), ("DDR5", "DDR4-3600"))
+
+
+def determine_power_range(cpu_mark, thresholds=CPU_MARK_THRESHOLDS):
+    """Determine the power range based on CPU Mark."""
+    if cpu_mark >= thresholds[1]:
+        return "high"
+    elif cpu_mark >= thresholds[0]:
+        return "mid"
+    else:
+        return "low"
+
+
+def determine_motherboard_power_range(max_ram_speed, patterns=MOTHERBOARD_PATTERNS):
+    """Determine the power range based on Max RAM Speed."""
+    if any(pattern in max_ram_speed for pattern in patterns[1]):
+        return "high"
+    elif any(pattern in max_ram_speed for pattern in patterns[0]):
+        return "mid"
+    else:
+        return "low"
+
+
+def determine_speed_and_capacity(speed, capacity, thresholds=RAM_THRESHOLDS):
+    """Determine the speed and capacity range."""
+    (mid_speed, mid_capacity), (high_speed, high_capacity) = thresholds
+    if int(speed) >= high_speed and int(capacity) >= high_capacity:
+        return "high"
+    elif int(speed) >= mid_speed and int(capacity) >= mid_capacity:
+        return "mid"
+    else:
+        return "low"
+
+
+def parse_capacity(capacity_str):
+    """Largest capacity in GB of an SSD line, 0 if there is none."""
+    capacity = parse_capacity_range(capacity_str)
+    return capacity.max if capacity else 0
+
+
+def parse_rw_speed(rw_speed_str):
+    """Sequential read speed in MB/s, 0 if it is unknown."""
+    return parse_read_write(rw_speed_str).read or 0
+
+
+def determine_capacity_and_speed(capacities, rw_speed, thresholds=SSD_THRESHOLDS):
+    """Determine the capacity and speed range based on SSD data."""
+    capacities = parse_capacity(capacities)
+    rw_speed = parse_rw_speed(rw_speed)
+
+    (mid_capacity, mid_speed), (high_capacity, high_speed) = thresholds
+    if capacities >= high_capacity and rw_speed >= high_speed:
+        return "high"
+    elif capacities >= mid_capacity and rw_speed >= mid_speed:
+        return "mid"
+    else:
+        return "low"
+
+
+def cpu_tier(cpu_info):
+    cpu_mark = int(cpu_info.get("cpuMark", 0))  # Default to 0 if missing
+    return determine_power_range(cpu_mark)
+
+
+def motherboard_tier(mb_info):
+    return determine_motherboard_power_range(mb_info["MaxRAMSpeed"])
+
+
+def ram_tier(ram_info):
+    return determine_speed_and_capacity(ram_info["speed"], ram_info["Capacity (GB)"])
+
+
+def ssd_tier(ssd_info):
+    return determine_capacity_and_speed(ssd_info["Capacities"], ssd_info["R/W"])
+
+
+def tier_column(component, rows):
+    """Classify a whole table of rows, with NumPy when it is installed."""
+    try:
+        from .batch_tiers import BATCH_TIERS
+    except ImportError:
+        BATCH_TIERS = {}
+    if component.name in BATCH_TIERS:
+        return BATCH_TIERS[component.name](rows)
+    return [component.tier(row) for row in rows]
@@ -0,0 +1,45 @@
+from .csv_io import load_csv_to_dict, write_training_csv
+from .tiers import tier_column
+
+
+def row_context(component, key, info, tier):
+    """The values a row's prompt and response are rendered from."""
+    context = dict(info)
+    context[component.key_column] = key
+    # Assuming the company is the first word of the key column
+    context["company"] = key.split(" ")[0]
+    context["tier"] = tier
+    return context
+
+
+def describe(component, context):
+    """Markdown-compatible description of a row, used as the response."""
+    description = "\n\n".join(
+        f"**{label}:** {context.get(field, 'N/A')}"
+        for label, field in component.description
+    )
+    return description + "\n"
+
+
+def generate_prompt_and_response(component, data):
+    """Generate prompt and response pairs for every row of a component."""
+    prompts_responses = []
+    tiers = tier_column(component, list(data.values()))
+
+    for (key, info), tier in zip(data.items(), tiers):
+        context = row_context(component, key, info, tier)
+        response = describe(component, context)
+        prompt = component.prompt.format_map(context)
+
+        prompts_responses.append({"Prompt": prompt, "Response": response})
+
+    return prompts_responses
+
+
+def build_training_data(component, root):
+    """Turn a component's complete catalog into its training data CSV."""
+    data = load_csv_to_dict(component.complete_path(root), component.key_column)
+    training_data = generate_prompt_and_response(component, data)
+    output_path = component.training_path(root)
+    write_training_csv(output_path, training_data)
+    return output_path
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from pipeline.augment import PROMPT_PATTERNS, PromptLibrary, article
+from pipeline.components import COMPONENTS
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("SATA/AHCI", "a SATA/AHCI"),
+        ("SATA III", "a SATA III"),
+        ("x4 PCIe 4.0", "an x4 PCIe 4.0"),
+        ("x2", "an x2"),
+        ("mSATA", "an mSATA"),
+        ("M.2", "an M.2"),
+        ("NVMe", "an NVMe"),
+        ("AMD", "an AMD"),
+        ("Intel", "an Intel"),
+        ("USB-C", "a USB-C"),
+        ("PCIe 4.0", "a PCIe 4.0"),
+        ("U.2", "a U.2"),
+        ('2.5"', 'a 2.5"'),
+        ("Samsung", "a Samsung"),
+        ("high", "a high"),
+    ],
+)
+def test_article(value, expected):
+    assert article(value) == expected
+
+
+def test_prompts_skip_templates_with_empty_fields():
+    component = COMPONENTS["cpu"]
+    library = PromptLibrary(component, PROMPT_PATTERNS["cpu"])
+    context = {
+        component.key_column: "AMD Ryzen 5 5600",
+        "company": "AMD",
+        "tier": "mid",
+        "cores": None,
+        "socket": "",
+    }
+    prompts = library.prompts(context, len(library), random.Random(0))
+    assert prompts[0] == component.prompt.format_map(context)
+    assert len(prompts) > 1
+    for prompt in prompts:
+        assert "None" not in prompt
+        assert "cores" not in prompt
+        assert "socket" not in prompt
+        assert " a AMD" not in prompt
@@ -0,0 +1,108 @@
+import os
+import re
+
+import pytest
+
+from pipeline.csv_io import read_csv
+from pipeline.parsers import parse_capacity_range, parse_read_write
+
+# Values taken from the SSD catalogs and what they must parse to
+CAPACITIES = {
+    "120GB-1.92TB": (120, 1966),
+    "500GB-4TB": (500, 4096),
+    "120-960GB": (120, 960),
+    "1TB": (1024, 1024),
+    "1TB, 2TB, 4TB (Please note that these capacities might vary": (1024, 4096),
+    "256GB/512GB/1TB (please note that the actual capacities may vary": (256, 1024),
+    "256GB, 512GB, 1024GB (1TB)": (256, 1024),
+    "Up to 4TB": (None, 4096),
+    "Up to 2048GB (2TB)": (None, 2048),
+    "Up to 16TB (varies by model)": (None, 16384),
+    "M.2 screws (affiliate link)": None,
+    "Various (not specified)": None,
+    "": None,
+}
+SPEEDS = {
+    "3300/2700": (3300, 2700),
+    "14000/?": (14000, None),
+    "500+/400+": (500, 400),
+    "1055": (1055, None),
+    "Up to 5000/3000 MB/s read/write": (5000, 3000),
+    "Up to 1000/800 MB/s (Read/Write)": (1000, 800),
+    "7.4 GB/s / 6.8 GB/s": (7400, 6800),
+    "7.4/6.8 GB/s": (7400, 6800),
+    "Up to 7.45GB/s / 6.9GB/s read/write": (7450, 6900),
+    "3500 MB/s / 3.3 GB/s": (3500, 3300),
+    "up to 7000 MB/s read, 6500 MB/s write": (7000, 6500),
+    "Read: 550 MB/s, Write: 450 MB/s": (550, 450),
+    "Read (max): 3400 MB/s, Write (max): 2000 MB/s": (3400, 2000),
+    "Up to 5000 MB/s read and 4800 MB/s write": (5000, 4800),
+    "Sequential Read: up to 3200 MB/s, Sequential Write: up to 2000 MB/s": (
+        3200,
+        2000,
+    ),
+    "Up to 500MB/s read, up to 400MB/s write (SATA); "
+    "up to 3500MB/s read, up to 3000MB/s write (PCIe)": (3500, 3000),
+    "Read: up to [insert value] MB/s, Write: up to [insert value] MB/s": (
+        None,
+        None,
+    ),
+    "MLC (Multi-Level Cell)": (None, None),
+    "Read/Write": (None, None),
+    "": (None, None),
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOGS = [
+    "data/ssd_complete.csv",
+    "raw_data/ssd.csv",
+    "test/data/ssd_complete.csv",
+]
+# Values that do not hold a capacity or speed at all
+NO_VALUE = re.compile(
+    r"^$|^read.?write|\bnot?\b|various|\[insert|database|website|table|filter|"
+    r"screw|MLC",
+    re.IGNORECASE,
+)
+
+
+@pytest.mark.parametrize("text, expected", CAPACITIES.items())
+def test_capacity_range(text, expected):
+    result = parse_capacity_range(text)
+    assert (result and tuple(result)) == expected
+
+
+@pytest.mark.parametrize("text, expected", SPEEDS.items())
+def test_read_write(text, expected):
+    assert tuple(parse_read_write(text)) == expected
+
+
+@pytest.mark.parametrize("path", CATALOGS)
+def test_catalog_values_parse(path):
+    rows, _ = read_csv(os.path.join(ROOT, path))
+    missed = set()
+    for row in rows:
+        capacity = parse_capacity_range(row["Capacities"])
+        speed = parse_read_write(row["R/W"])
+        if capacity is None and not NO_VALUE.search(row["Capacities"]):
+            missed.add(row["Capacities"])
+        if speed.read is None and not NO_VALUE.search(row["R/W"]):
+            missed.add(row["R/W"])
+        if capacity and capacity.min is not None:
+            assert capacity.min <= capacity.max, row["Capacities"]
+    assert not missed, f"could not parse {sorted(missed)}"
+
+
+@pytest.mark.parametrize("path", CATALOGS)
+def test_columns_match_values(path):
+    batch_tiers = pytest.importorskip("pipeline.batch_tiers")
+    rows, _ = read_csv(os.path.join(ROOT, path))
+    for column, parse, columns in (
+        ("Capacities", parse_capacity_range, batch_tiers.capacity_range_columns),
+        ("R/W", parse_read_write, batch_tiers.read_write_columns),
+    ):
+        values = [row[column] for row in rows]
+        low, high = columns(values)
+        for value, first, second in zip(values, low.tolist(), high.tolist()):
+            expected = parse(value) or (None, None)
+            result = tuple(None if x != x else int(x) for x in (first, second))
+            assert result == tuple(expected), value